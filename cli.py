@@ -0,0 +1,245 @@
+"""Headless runner for the fetch -> rewrite -> score -> publish pipeline.
+
+Reads a site config file (the same fields as Site Management: wp_url,
+wp_username, wp_password, feed_urls, plus optional language, limit and
+post_status per site) and prints one JSON object per line as work
+progresses. Stages run concurrently over bounded queues (see
+utils.pipeline), so publishing starts while feeds are still downloading.
+It can run from cron and be piped into log tooling:
+
+    python cli.py --config sites.json --rewrite-workers 16 >> nightly.jsonl
+
+A 'metrics' event with per-call timings and token counts is printed
+before 'finished'; --metrics-file also writes them in Prometheus text
+format (e.g. for node_exporter's textfile collector).
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, TextIO
+
+from utils.article_store import ArticleStore
+from utils.content_generator import KEYWORD_MODES, ContentGenerator
+from utils.feed_cache import FeedCache
+from utils.feed_parser import FeedParser
+from utils.instrumentation import METRICS
+from utils.media_index import MediaIndex
+from utils.near_duplicates import NearDuplicateIndex
+from utils.pipeline import Pipeline
+from utils.post_ledger import PostLedger
+from utils.response_cache import ResponseCache
+from utils.seo_optimizer import SEOOptimizer
+from utils.site_config import load_sites
+from utils.wordpress_registry import WordPressClientRegistry
+
+
+class ProgressWriter:
+    """Writes progress events as JSON lines; safe to call from worker threads"""
+
+    def __init__(self, stream: TextIO = sys.stdout):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: str, **fields) -> None:
+        line = json.dumps({'ts': round(time.time(), 3), 'event': event, **fields}, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+class Services:
+    """The pipeline's components, created once per run and shared by all sites"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.feed_parser = FeedParser(cache=FeedCache())
+        self.seo_optimizer = SEOOptimizer()
+        # Every rewrite worker shares this generator's RPM/TPM limiter and 429 backoff
+        self.content_generator = ContentGenerator(
+            max_concurrency=args.rewrite_workers,
+            requests_per_minute=args.requests_per_minute,
+            tokens_per_minute=args.tokens_per_minute,
+            keyword_mode=args.keyword_mode,
+            seo_optimizer=self.seo_optimizer,
+            cache=ResponseCache()
+        )
+        self.near_duplicates = NearDuplicateIndex()
+        self.article_store = ArticleStore()
+        self.wordpress_clients = WordPressClientRegistry(
+            pool_size=max(args.publish_workers, 1),
+            media_index=MediaIndex(),
+            ledger=PostLedger()
+        )
+
+
+class SitePipeline:
+    """Streams every site's feeds through fetch -> dedupe -> rewrite -> score -> publish.
+
+    Items carry their site name through the stages; per-site settings
+    (language, limit, post_status) are looked up as each item passes.
+    """
+
+    def __init__(self, services: Services, sites: Dict[str, Dict], args: argparse.Namespace, emit: ProgressWriter):
+        self.services = services
+        self.sites = sites
+        self.args = args
+        self.emit = emit
+        self._lock = threading.Lock()
+        self.counts = {
+            site: {'fetched': 0, 'selected': 0, 'duplicates': 0, 'rewritten': 0, 'published': 0, 'failed': 0}
+            for site in sites
+        }
+
+        self.pipeline = Pipeline(queue_size=args.queue_size)
+        self.pipeline.add_stage('fetch', self.fetch, workers=args.fetch_workers, expand=True)
+        # One worker, so articles within the run are compared against each other in order
+        self.pipeline.add_stage('dedupe', self.dedupe)
+        self.pipeline.add_stage('rewrite', self.rewrite, workers=args.rewrite_workers)
+        self.pipeline.add_stage('score', self.score)
+        if not args.no_publish:
+            self.pipeline.add_stage('publish', self.publish, workers=args.publish_workers)
+
+    def setting(self, site: str, name: str):
+        return self.sites[site].get(name, getattr(self.args, name))
+
+    def count(self, site: str, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[site][name] += amount
+
+    def fetch(self, item: Dict) -> List[Dict]:
+        entries = self.services.feed_parser.parse_feed(item['feed'])
+        self.count(item['site'], 'fetched', len(entries))
+        self.emit('feed_fetched', site=item['site'], feed=item['feed'], entries=len(entries))
+        return [{'site': item['site'], 'entry': entry} for entry in entries]
+
+    def dedupe(self, item: Dict) -> Optional[Dict]:
+        site = item['site']
+        with self._lock:
+            if self.counts[site]['selected'] >= self.setting(site, 'limit'):
+                return None
+        unique, duplicates = self.services.near_duplicates.deduplicate([item['entry']], site=site)
+        if duplicates:
+            self.count(site, 'duplicates')
+            return None
+        self.count(site, 'selected')
+        return item
+
+    def rewrite(self, item: Dict) -> Dict:
+        entry = item['entry']
+        source = {'title': entry['title'], 'content': entry['content'], 'link': entry.get('link', '')}
+        if self.setting(item['site'], 'language') == 'Hindi':
+            generated = self.services.content_generator.generate_hindi_content(source)
+        else:
+            generated = self.services.content_generator.generate_content(source)
+        article = json.loads(generated) if isinstance(generated, str) else generated
+        article['source_link'] = entry.get('link', '')
+        article['word_count'] = len(article.get('content', '').split())
+        self.services.near_duplicates.mark_generated(entry, item['site'])
+        return dict(item, article=article)
+
+    def score(self, item: Dict) -> Dict:
+        site, article = item['site'], item['article']
+        keyword = self.services.seo_optimizer.article_focus_keyword(article)
+        metrics = self.services.seo_optimizer.analyze_content(
+            article, [keyword] if keyword else None, language=self.setting(site, 'language')
+        )
+        article['id'] = self.services.article_store.add(article, site=site)
+        self.count(site, 'rewritten')
+        self.emit('rewritten', site=site, article_id=article['id'], title=article.get('title', ''),
+                  word_count=metrics.get('word_count'), readability=metrics.get('readability_score'))
+        return item
+
+    def publish(self, item: Dict) -> Dict:
+        site, article = item['site'], item['article']
+        api = self.services.wordpress_clients.get_for_config(self.sites[site], verify=True)
+        if api is None:
+            self.emit('publish_skipped', site=site, article_id=article['id'],
+                      reason="WordPress credentials not configured")
+            return item
+        post = api.create_post(article, status=self.setting(site, 'post_status'))
+        self.services.article_store.update_status(article['id'], 'posted', post.get('id'))
+        self.count(site, 'published')
+        self.emit('published', site=site, article_id=article['id'], post_id=post.get('id'),
+                  unchanged=post.get('unchanged', False))
+        return item
+
+    def on_error(self, stage: str, item: Dict, error: Exception) -> None:
+        self.count(item['site'], 'failed')
+        fields = {'site': item['site'], 'error': str(error)}
+        if stage == 'fetch':
+            fields['feed'] = item['feed']
+        elif 'article' in item and 'id' in item['article']:
+            fields['article_id'] = item['article']['id']
+        else:
+            fields['source'] = item['entry'].get('link', '')
+        self.emit(f"{stage}_error", **fields)
+
+    def run(self) -> Dict[str, Dict]:
+        """Run all sites to completion and return per-site counts"""
+        feeds = (
+            {'site': site, 'feed': feed_url}
+            for site, config in self.sites.items()
+            for feed_url in dict.fromkeys(config.get('feed_urls', []))
+            if feed_url
+        )
+        for _ in self.pipeline.run(feeds, on_error=self.on_error):
+            pass
+        return self.counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fetch, rewrite, score and publish articles without the web UI")
+    parser.add_argument('--config', required=True, help="JSON file with the sites to process")
+    parser.add_argument('--site', action='append', dest='sites', help="only process this site (repeatable)")
+    parser.add_argument('--limit', type=int, default=10, help="articles per site unless the site sets 'limit'")
+    parser.add_argument('--language', default='English', choices=['English', 'Hindi', 'Spanish'],
+                        help="target language unless the site sets 'language'")
+    parser.add_argument('--post-status', default='draft', help="WordPress status for new posts")
+    parser.add_argument('--keyword-mode', default='inline', choices=KEYWORD_MODES,
+                        help="how focus keywords are chosen")
+    parser.add_argument('--fetch-workers', type=int, default=8, help="concurrent feed downloads")
+    parser.add_argument('--rewrite-workers', type=int, default=8, help="concurrent rewrite requests")
+    parser.add_argument('--requests-per-minute', type=int, default=500, help="OpenAI request budget")
+    parser.add_argument('--tokens-per-minute', type=int, default=30000, help="OpenAI token budget")
+    parser.add_argument('--publish-workers', type=int, default=8, help="concurrent WordPress requests")
+    parser.add_argument('--queue-size', type=int, default=32, help="items buffered between stages")
+    parser.add_argument('--no-publish', action='store_true', help="store articles without publishing them")
+    parser.add_argument('--metrics-file', help="write Prometheus-style timings and counters here when done")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    emit = ProgressWriter()
+
+    try:
+        sites = load_sites(args.config, args.sites)
+    except (OSError, ValueError) as e:
+        emit('error', error=f"Error loading site config: {str(e)}")
+        return 2
+
+    started = time.time()
+    services = Services(args)
+    for site in sites:
+        emit('site_started', site=site)
+    counts = SitePipeline(services, sites, args, emit).run()
+
+    totals = {'fetched': 0, 'selected': 0, 'duplicates': 0, 'rewritten': 0, 'published': 0, 'failed': 0}
+    for site, site_counts in counts.items():
+        emit('site_finished', site=site, **site_counts)
+        for key, value in site_counts.items():
+            totals[key] += value
+
+    if METRICS.enabled:
+        emit('metrics', **METRICS.snapshot())
+        if args.metrics_file:
+            with open(args.metrics_file, 'w', encoding='utf-8') as f:
+                f.write(METRICS.to_prometheus())
+
+    emit('finished', seconds=round(time.time() - started, 1), sites=len(sites), **totals)
+    return 1 if totals['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
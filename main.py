@@ -1,7 +1,25 @@
+import time
+
+# Measured from the top of each script run, for the render budget check at the end
+_run_started = time.perf_counter()
+
 import streamlit as st
 import json
+import logging
+import queue
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from utils.feed_parser import FeedParser
+from utils.feed_cache import FeedCache
+from utils.feed_scheduler import FeedScheduler
+from utils.response_cache import ResponseCache
+from utils.job_queue import JobQueue
+from utils.article_store import ArticleStore
+from utils.media_index import MediaIndex
+from utils.post_ledger import PostLedger
+from utils.job_worker import BATCH_POLL_SECONDS, ensure_worker_running, is_worker_running
+from utils.site_config import SITES_CONFIG_ENV, env_key, resolve_credentials
+from utils.instrumentation import METRICS
 import os
 import signal
 import sys
@@ -20,39 +38,116 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Import after configuration
-from utils.content_generator import ContentGenerator
-from utils.wordpress_api import WordPressAPI
-from utils.seo_optimizer import SEOOptimizer
-from utils.trend_analyzer import TrendAnalyzer
+# A fresh session's Home page should render within this many seconds; the
+# accessors below import heavy modules (openai, pandas, numpy, textblob) and
+# build services only when a page first needs them, so Home never pays for it
+HOME_RENDER_BUDGET_SECONDS = 0.15
+
+# Shared services are built once per process, on first use, and reused by
+# every session, so opening the app (or the Home page) constructs nothing
+@st.cache_resource
+def get_feed_parser() -> FeedParser:
+    return FeedParser(cache=FeedCache())
+
+
+@st.cache_resource
+def get_feed_scheduler() -> FeedScheduler:
+    return FeedScheduler(get_feed_parser())
+
+
+@st.cache_resource
+def get_near_duplicates():
+    from utils.near_duplicates import NearDuplicateIndex
+    return NearDuplicateIndex()
+
+
+@st.cache_resource
+def get_seo_optimizer():
+    from utils.seo_optimizer import SEOOptimizer
+    return SEOOptimizer()
+
+
+@st.cache_resource
+def get_shared_content_generator():
+    from utils.content_generator import ContentGenerator
+    return ContentGenerator(seo_optimizer=get_seo_optimizer(), cache=ResponseCache())
+
+
+def get_content_generator():
+    """The shared generator with this session's settings applied"""
+    return get_shared_content_generator().with_options(keyword_mode=st.session_state.keyword_mode)
 
-# Initialize session state
+
+@st.cache_resource
+def get_trend_analyzer():
+    from utils.trend_analyzer import TrendAnalyzer
+    return TrendAnalyzer()
+
+
+@st.cache_resource
+def get_wordpress_clients():
+    from utils.wordpress_registry import WordPressClientRegistry
+    return WordPressClientRegistry(media_index=MediaIndex(), ledger=PostLedger())
+
+
+@st.cache_resource
+def get_article_store() -> ArticleStore:
+    return ArticleStore()
+
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+
+# Initialize session state (plain values only; services come from the accessors above)
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
-if 'feed_parser' not in st.session_state:
-    st.session_state.feed_parser = FeedParser()
-if 'content_generator' not in st.session_state:
-    st.session_state.content_generator = ContentGenerator()
-if 'seo_optimizer' not in st.session_state:
-    st.session_state.seo_optimizer = SEOOptimizer()
-if 'trend_analyzer' not in st.session_state:
-    st.session_state.trend_analyzer = TrendAnalyzer()
-if 'wordpress_api' not in st.session_state:
-    st.session_state.wordpress_api = None
-if 'feed_cache' not in st.session_state:
-    st.session_state.feed_cache = {}
-if 'content_cache' not in st.session_state:
-    st.session_state.content_cache = {}
 if 'site_config' not in st.session_state:
     st.session_state.site_config = {}
-if 'generated_articles' not in st.session_state:
-    st.session_state.generated_articles = []
+if 'keyword_mode' not in st.session_state:
+    st.session_state.keyword_mode = 'inline'
+
+
+def get_wordpress_api(config: dict, verify: bool = False):
+    """Return the cached WordPress client for a site config, or None if it isn't configured.
+
+    Credentials are only checked when ``verify`` is set, and then at most
+    once per registry TTL, so switching sites makes no network calls.
+    """
+    return get_wordpress_clients().get_for_config(config, verify=verify)
+
+
+def drop_near_duplicates(articles: list, site: str) -> list:
+    """Drop articles that near-duplicate each other or one already fetched/generated for the site"""
+    unique, duplicates = get_near_duplicates().deduplicate(articles, site=site)
+    if duplicates:
+        st.info(f"Dropped {len(duplicates)} near-duplicate articles.")
+    return unique
+
+
+def to_generated_article(generated, source: dict = None) -> dict:
+    """Turn a ContentGenerator JSON response into a generated article record (stored by ArticleStore)"""
+    if isinstance(generated, str):
+        generated = json.loads(generated)
+
+    return {
+        'title': generated['title'],
+        'content': generated['content'],
+        'status': 'draft',
+        'meta_description': generated['meta_description'],
+        'keywords': generated['keywords'],
+        'slug': generated['slug'],
+        # Identifies the article in the post ledger, so republishing updates its own post
+        'source_link': (source or {}).get('link', ''),
+        'word_count': len(generated['content'].split())
+    }
 
 # Streamlit handles process management internally
 
 # Navigation
 st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to", ["Home", "Site Management", "Bulk Article Generator"])
+page = st.sidebar.radio("Go to", ["Home", "Site Management", "Bulk Article Generator", "Background Jobs"])
 st.session_state.page = page.lower()
 
 if st.session_state.page == "home":
@@ -96,6 +191,8 @@ elif st.session_state.page == "site management":
             col1, col2 = st.columns(2)
             with col1:
                 if st.form_submit_button("Update"):
+                    if site.get('wp_url'):
+                        get_wordpress_clients().invalidate(site['wp_url'])
                     st.session_state.site_config[st.session_state.selected_site].update({
                         'wp_url': wp_url,
                         'wp_username': wp_username,
@@ -141,9 +238,21 @@ elif st.session_state.page == "bulk article generator":
                 custom_feed = st.text_input("Enter RSS Feed URL")
                 selected_feeds = [custom_feed] if custom_feed else []
 
+            # Keep this site's feeds polled on adaptive intervals and pool new entries.
+            # The scheduler is shared by every session, so a session only (un)schedules
+            # the selected site and never stops the poller other sessions rely on
+            scheduler = get_feed_scheduler()
+            scheduled = selected_site in scheduler.scheduled_sites()
+            if st.checkbox("Keep feeds fresh in the background", value=scheduled, key=f"keep_fresh_{selected_site}"):
+                scheduler.sync_sites({selected_site: config})
+                scheduler.start()
+                st.caption(f"{scheduler.pending_count(selected_site)} new pooled articles for {selected_site}")
+            elif scheduled:
+                scheduler.remove_sites([selected_site])
+
         elif source_type == "Google Trends":
-            category = st.selectbox("Category", st.session_state.trend_analyzer.get_categories())
-            trend_keywords = st.session_state.trend_analyzer.get_trending_topics(category)
+            category = st.selectbox("Category", get_trend_analyzer().get_categories())
+            trend_keywords = get_trend_analyzer().get_trending_topics(category)
             selected_topics = st.multiselect("Select Trending Topics", trend_keywords)
 
         else:  # Custom Topics
@@ -158,49 +267,93 @@ elif st.session_state.page == "bulk article generator":
             articles_per_topic = st.number_input("Articles per Topic", min_value=1, value=1)
             min_words = st.number_input("Minimum Words", min_value=300, value=600)
             include_images = st.checkbox("Include AI-generated Images", value=True)
+            keyword_source = st.selectbox(
+                "Focus Keyword Source",
+                ["Chosen by model (single call)", "Local noun-phrase extraction", "Separate analysis call"]
+            )
+            st.session_state.keyword_mode = {
+                "Chosen by model (single call)": 'inline',
+                "Local noun-phrase extraction": 'local',
+                "Separate analysis call": 'separate'
+            }[keyword_source]
 
         # Date selection
         today = datetime.date.today()
         start_date = st.date_input("Start Date", today - datetime.timedelta(days=7))
         end_date = st.date_input("End Date", today)
 
-        if 'fetched_articles' not in st.session_state:
-            st.session_state.fetched_articles = []
+        # Fetched articles live in the article store; the session only keeps their ids
+        if 'fetched_article_ids' not in st.session_state:
+            st.session_state.fetched_article_ids = []
 
         # Article fetch count control
         num_articles = st.number_input("Number of articles to fetch", min_value=1, max_value=50, value=2)
 
+        if source_type == "RSS Feeds" and selected_feeds and st.button("Run in Background"):
+            # Hand the whole fetch -> rewrite -> score (-> publish) flow to the worker pool.
+            # Jobs carry only the site name and URL; the worker looks up the credentials itself
+            publish = resolve_credentials(selected_site, config.get('wp_url', '')) is not None
+            job_id = get_job_queue().submit('fetch', {
+                'feed_urls': selected_feeds,
+                'limit': num_articles,
+                'language': target_language,
+                'site': selected_site,
+                'wp_url': config.get('wp_url', ''),
+                'publish': publish,
+                'post_status': 'draft'
+            })
+            ensure_worker_running()
+            st.success(f"Queued background job #{job_id}. Track it on the Background Jobs page.")
+            if not publish:
+                st.info(
+                    f"Background articles are stored but not published: set WP_USERNAME_{env_key(selected_site)} "
+                    f"and WP_PASSWORD_{env_key(selected_site)}, or list the site in the file named by "
+                    f"${SITES_CONFIG_ENV}, to let the worker publish them."
+                )
+
+        if (source_type == "RSS Feeds" and get_feed_scheduler().pending_count(selected_site)
+                and st.button("Load New Pooled Articles")):
+            # Entries the scheduler found since they were last taken, each handed out once
+            st.session_state.fetched_article_ids = get_article_store().add_many(
+                drop_near_duplicates(get_feed_scheduler().take_new(selected_site, limit=num_articles), selected_site),
+                site=selected_site, kind='source'
+            )
+            st.success(f"Loaded {len(st.session_state.fetched_article_ids)} new articles from the feed pool.")
+
         if st.button("Fetch Articles"):
             with st.spinner("Fetching articles..."):
                 try:
                     # Clear previous fetched articles
-                    st.session_state.fetched_articles = []
+                    st.session_state.fetched_article_ids = []
                     
                     # Fetch articles from selected feeds
                     if source_type == "RSS Feeds":
                         fetched = []
-                        for feed_url in selected_feeds:
-                            entries = st.session_state.feed_parser.parse_feed(feed_url)
-                            fetched.extend(entries)
-                            
+                        results = get_feed_parser().parse_feeds(selected_feeds)
+                        for feed_url, result in results.items():
+                            if result['error']:
+                                st.warning(f"Skipped {feed_url}: {result['error']}")
+                            fetched.extend(result['entries'])
+
                         # Only keep the requested number of articles
-                        st.session_state.fetched_articles = fetched[:num_articles]
-                        st.success(f"Fetched {len(st.session_state.fetched_articles)} articles successfully!")
+                        st.session_state.fetched_article_ids = get_article_store().add_many(
+                            drop_near_duplicates(fetched, selected_site)[:num_articles],
+                            site=selected_site, kind='source'
+                        )
+                        st.success(f"Fetched {len(st.session_state.fetched_article_ids)} articles successfully!")
                 except Exception as e:
                     st.error(f"Error fetching articles: {str(e)}")
 
         # Display fetched articles for selection
-        if st.session_state.fetched_articles:
+        if st.session_state.fetched_article_ids:
             st.subheader("Select Articles to Rewrite")
             selected_articles = []
 
-            # Remove duplicates based on title
-            seen_titles = set()
-            unique_articles = []
-            for article in st.session_state.fetched_articles[:num_articles]:
-                if article['title'] not in seen_titles:
-                    seen_titles.add(article['title'])
-                    unique_articles.append(article)
+            # Near-duplicates were already dropped when the articles were fetched
+            unique_articles = get_article_store().get_many(st.session_state.fetched_article_ids[:num_articles])
+
+            # Score every listed article in one vectorized pass
+            seo_scores = get_seo_optimizer().analyze_batch(unique_articles)
 
             for idx, article in enumerate(unique_articles):
                 col1, col2 = st.columns([0.1, 0.9])
@@ -217,7 +370,7 @@ elif st.session_state.page == "bulk article generator":
 
                         # Check SEO optimization
                         is_seo_optimized = (
-                            article['word_count'] >= 600 and
+                            seo_scores['word_count'].iat[idx] >= get_seo_optimizer().min_word_count and
                             'keywords' in article and
                             'meta_description' in article
                         )
@@ -227,67 +380,273 @@ elif st.session_state.page == "bulk article generator":
 
                         # Add WordPress publish button
                         if st.button("Publish to WordPress", key=f"publish_{article['id']}_{article['title'][:20]}"):
-                            if 'wordpress_api' in st.session_state and st.session_state.wordpress_api:
-                                try:
-                                    response = st.session_state.wordpress_api.create_post(article)
+                            try:
+                                wordpress_api = get_wordpress_api(config, verify=True)
+                                if wordpress_api is None:
+                                    st.warning("Please configure WordPress site in Site Management first")
+                                else:
+                                    response = wordpress_api.create_post(article)
                                     st.success(f"Published to WordPress! Post ID: {response['id']}")
-                                except Exception as e:
-                                    st.error(f"Failed to publish: {str(e)}")
-                            else:
-                                st.warning("Please configure WordPress site in Site Management first")
+                            except Exception as e:
+                                st.error(f"Failed to publish: {str(e)}")
 
             if selected_articles and st.button("Rewrite Selected Articles"):
-                with st.spinner("Generating optimized articles..."):
+                try:
+                    new_articles = []
+                    sources = [
+                        {'title': article['title'], 'content': article['content']}
+                        for article in selected_articles
+                    ]
+                    # Worker threads have no Streamlit context, so they only touch
+                    # the generator and report back through the queue. Each stream
+                    # waits on the generator's shared RPM/TPM limiter and 429 backoff
+                    content_generator = get_content_generator()
+                    events = queue.Queue()
+
+                    def stream_article(index: int, source: dict):
+                        try:
+                            for event in content_generator.stream_content(source):
+                                events.put((index, event))
+                        except Exception as e:
+                            events.put((index, {'type': 'error', 'error': str(e)}))
+
+                    placeholders = [st.empty() for _ in selected_articles]
+                    for placeholder, article in zip(placeholders, selected_articles):
+                        placeholder.info(f"⏳ Waiting: {article['title']}")
+
+                    with ThreadPoolExecutor(max_workers=content_generator.max_concurrency) as executor:
+                        for index, source in enumerate(sources):
+                            executor.submit(stream_article, index, source)
+
+                        # Render each article as its fields arrive
+                        titles = {}
+                        finished = 0
+                        while finished < len(sources):
+                            index, event = events.get()
+                            article = selected_articles[index]
+
+                            if event['type'] == 'field' and event['name'] == 'title':
+                                titles[index] = event['value']
+                                placeholders[index].info(f"✍️ {event['value']}")
+                            elif event['type'] == 'partial' and event['name'] == 'content':
+                                with placeholders[index].container():
+                                    st.markdown(f"**✍️ {titles.get(index, article['title'])}**")
+                                    st.caption(f"{len(event['value'].split())} words so far")
+                                    st.text(event['value'][-1500:])
+                            elif event['type'] == 'done':
+                                finished += 1
+                                try:
+                                    new_article = to_generated_article(event['content'], article)
+                                except Exception as e:
+                                    placeholders[index].warning(f"Skipped '{article['title']}': {str(e)}")
+                                    continue
+                                new_article['id'] = get_article_store().add(new_article, site=selected_site)
+                                get_near_duplicates().mark_generated(article, selected_site)
+                                new_articles.append(new_article)
+                                placeholders[index].success(
+                                    f"✅ {new_article['title']} ({new_article['word_count']} words)"
+                                )
+                            elif event['type'] == 'error':
+                                finished += 1
+                                placeholders[index].warning(f"Skipped '{article['title']}': {event['error']}")
+
+                    st.success(f"Generated {len(new_articles)} optimized articles successfully!")
+                except Exception as e:
+                    st.error(f"Error generating articles: {str(e)}")
+
+            if selected_articles and st.button("Queue Selected Articles as Overnight Batch"):
+                with st.spinner("Submitting batch job..."):
                     try:
-                        new_articles = []
-                        for article in selected_articles:
-                            # Generate optimized content using ContentGenerator
-                            generated = st.session_state.content_generator.generate_content({
-                                'title': article['title'],
-                                'content': article['content']
-                            })
-
-                            if isinstance(generated, str):
-                                generated = json.loads(generated)
-
-                            new_article = {
-                                'id': len(st.session_state.generated_articles) + 1,
-                                'title': generated['title'],
-                                'content': generated['content'],
-                                'status': 'draft',
-                                'meta_description': generated['meta_description'],
-                                'keywords': generated['keywords'],
-                                'slug': generated['slug'],
-                                'word_count': len(generated['content'].split()),
-                                'date': datetime.date.today()
-                            }
-                            new_articles.append(new_article)
-
-                        st.session_state.generated_articles.extend(new_articles)
-                        st.success(f"Generated {len(new_articles)} optimized articles successfully!")
+                        sources = [
+                            {'title': article['title'], 'content': article['content']}
+                            for article in selected_articles
+                        ]
+                        batch_path = os.path.join(
+                            '.cache', 'batches', f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+                        )
+                        cache_keys = get_content_generator().write_batch_file(sources, batch_path)
+                        batch_id = get_content_generator().submit_batch(batch_path, {'site': selected_site})
+                        # Kept in the job queue, not the session, so a closed tab doesn't lose a
+                        # paid-for batch; the worker imports the results once it finishes
+                        get_job_queue().submit('batch', {
+                            'batch_id': batch_id,
+                            'site': selected_site,
+                            'cache_keys': cache_keys,
+                            'titles': [article['title'] for article in selected_articles]
+                        }, max_attempts=5, delay=BATCH_POLL_SECONDS)
+                        ensure_worker_running()
+                        st.success(f"Submitted batch {batch_id} with {len(sources)} articles.")
                     except Exception as e:
-                        st.error(f"Error generating articles: {str(e)}")
+                        st.error(f"Error submitting batch: {str(e)}")
+
+        # Display overnight batch jobs for this site
+        batch_jobs = [
+            job for job in get_job_queue().list_jobs(kind='batch')
+            if job['payload'].get('site') == selected_site
+        ]
+        if batch_jobs:
+            st.header("Batch Jobs")
+            for job in batch_jobs:
+                payload = job['payload']
+                with st.expander(f"{payload['batch_id']} - {len(payload['titles'])} articles ({payload['site']})"):
+                    if job['status'] == 'succeeded':
+                        st.write(f"Status: imported {job['result']['imported']} articles "
+                                 f"(batch {job['result']['batch_status']})")
+                        for title, error in job['result']['errors'].items():
+                            st.warning(f"Skipped '{title}': {error}")
+                        continue
+                    if job['status'] == 'failed':
+                        st.error(f"Import failed: {job['error']}")
+                        continue
+
+                    st.caption("The background worker imports the results once the batch finishes.")
+                    if st.button("Check Status", key=f"batch_{job['id']}"):
+                        try:
+                            st.write(f"Status: {get_content_generator().get_batch_status(payload['batch_id']).status}")
+                        except Exception as e:
+                            st.error(f"Error checking batch: {str(e)}")
 
         # Display Generated Articles
-        if st.session_state.generated_articles:
+        article_store = get_article_store()
+        total_articles = article_store.count(site=selected_site, start_date=start_date, end_date=end_date)
+        if total_articles or article_store.count(site=selected_site):
             st.header("Generated Articles")
 
-            # Filter articles by date
-            filtered_articles = [
-                article for article in st.session_state.generated_articles 
-                if start_date <= article['date'] <= end_date
-            ]
-
-            if not filtered_articles:
+            if not total_articles:
                 st.info("No articles found for the selected date range.")
             else:
-                for article in filtered_articles:
+                draft_count = article_store.count(
+                    site=selected_site, status='draft', start_date=start_date, end_date=end_date
+                )
+                if draft_count and st.button(f"Publish {draft_count} Drafts to WordPress"):
+                    with st.spinner("Publishing to WordPress..."):
+                        try:
+                            wordpress_api = get_wordpress_api(config, verify=True)
+                            if wordpress_api is None:
+                                st.warning("Please configure WordPress site in Site Management first")
+                            else:
+                                drafts = article_store.query(
+                                    site=selected_site, status='draft', start_date=start_date, end_date=end_date,
+                                    limit=None
+                                )
+                                results = wordpress_api.create_posts(drafts)
+                                for article, result in zip(drafts, results):
+                                    if result['success']:
+                                        article_store.update_status(article['id'], 'posted', result['post'].get('id'))
+                                    else:
+                                        st.warning(f"Failed to publish '{article['title']}': {result['error']}")
+                                published = sum(1 for result in results if result['success'])
+                                st.success(f"Published {published} of {len(drafts)} drafts to WordPress.")
+                        except Exception as e:
+                            st.error(f"Failed to publish: {str(e)}")
+
+                # Only the requested page of the date range is loaded
+                page_size = 20
+                page_count = (total_articles + page_size - 1) // page_size
+                page_number = st.number_input(
+                    f"Page (of {page_count}, {total_articles} articles)", min_value=1, max_value=page_count, value=1
+                )
+                page_articles = article_store.query(
+                    site=selected_site, start_date=start_date, end_date=end_date,
+                    limit=page_size, offset=(page_number - 1) * page_size
+                )
+
+                for article in page_articles:
                     with st.expander(f"{article['title']} - {article['date']}"):
                         st.write(f"Status: {article['status']}")
                         st.write(f"Word Count: {article['word_count']}")
                         st.write(f"Date: {article['date']}")
                         st.text_area("Content", article['content'], height=200)
 
-                        if st.button("Delete", key=f"delete_{article['id']}_{article['title'][:20]}"):
-                            st.session_state.generated_articles.remove(article)
-                            st.rerun()
\ No newline at end of file
+                        if st.button("Delete", key=f"delete_{article['id']}"):
+                            article_store.delete(article['id'])
+                            st.rerun()
+
+elif st.session_state.page == "background jobs":
+    st.title("Background Jobs")
+
+    job_queue = get_job_queue()
+    worker_running = is_worker_running()
+    st.write(f"Workers: {'🟢 running' if worker_running else '🔴 stopped'}")
+    if not worker_running and st.button("Start Workers"):
+        ensure_worker_running()
+        st.rerun()
+
+    counts = job_queue.counts()
+    cols = st.columns(len(counts))
+    for col, (state, count) in zip(cols, counts.items()):
+        col.metric(state.capitalize(), count)
+
+    status_filter = st.selectbox("Status", ["All", "queued", "running", "succeeded", "failed"])
+    jobs = job_queue.list_jobs(status=None if status_filter == "All" else status_filter, limit=200)
+    if not jobs:
+        st.info("No jobs yet. Use 'Run in Background' on the Bulk Article Generator page.")
+    else:
+        st.dataframe([
+            {
+                'id': job['id'],
+                'kind': job['kind'],
+                'status': job['status'],
+                'attempts': f"{job['attempts']}/{job['max_attempts']}",
+                'parent': job['parent_id'],
+                'updated': datetime.datetime.fromtimestamp(job['updated_at']).strftime('%Y-%m-%d %H:%M:%S'),
+                'error': job['error'] or ''
+            }
+            for job in jobs
+        ], use_container_width=True)
+
+        failed = [job for job in jobs if job['status'] == 'failed']
+        if failed and st.button(f"Retry {len(failed)} Failed Jobs"):
+            for job in failed:
+                job_queue.retry(job['id'])
+            st.rerun()
+
+    if st.button("Refresh"):
+        st.rerun()
+
+# Timings and counters recorded by this process (the background worker keeps its own)
+with st.sidebar.expander("Pipeline Stats"):
+    # Behind a checkbox: an expander runs its body even when collapsed, and
+    # st.dataframe imports pandas, which would put it on every Home render
+    if not METRICS.enabled:
+        st.caption("Metrics are disabled (METRICS_ENABLED=0).")
+    elif st.checkbox("Show stats", key="show_pipeline_stats"):
+        snapshot = METRICS.snapshot()
+        if not snapshot['timers'] and not snapshot['counters']:
+            st.caption("Nothing recorded yet.")
+        else:
+            st.caption(f"Since {datetime.datetime.fromtimestamp(snapshot['since']).strftime('%Y-%m-%d %H:%M:%S')}")
+            if snapshot['timers']:
+                st.dataframe([
+                    {
+                        'Timer': timer['name'] + ''.join(f" {value}" for value in timer['labels'].values()),
+                        'Calls': timer['count'],
+                        'Errors': timer['errors'],
+                        'Avg ms': round(timer['avg_seconds'] * 1000, 1),
+                        'Max ms': round(timer['max_seconds'] * 1000, 1),
+                        'Total s': round(timer['total_seconds'], 2)
+                    }
+                    for timer in snapshot['timers']
+                ], hide_index=True)
+            if snapshot['counters']:
+                st.dataframe([
+                    {
+                        'Counter': counter['name'] + ''.join(f" {value}" for value in counter['labels'].values()),
+                        'Value': counter['value']
+                    }
+                    for counter in snapshot['counters']
+                ], hide_index=True)
+            st.download_button("Download (Prometheus)", METRICS.to_prometheus(),
+                               file_name="metrics.prom", mime="text/plain")
+            st.download_button("Download (JSON)", json.dumps(snapshot, indent=2),
+                               file_name="metrics.json", mime="application/json")
+            if st.button("Reset Stats"):
+                METRICS.reset()
+                st.rerun()
+
+# Check the render budget (only meaningful for Home, which should build nothing)
+render_seconds = time.perf_counter() - _run_started
+METRICS.observe('page_render', render_seconds, page=st.session_state.page)
+if st.session_state.page == "home" and render_seconds > HOME_RENDER_BUDGET_SECONDS:
+    logging.getLogger(__name__).warning("Home page render took %.0f ms, over the %.0f ms budget",
+                                        render_seconds * 1000, HOME_RENDER_BUDGET_SECONDS * 1000)
@@ -0,0 +1,129 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubOpenAI:
+    """A local stand-in for the OpenAI chat, files and batches endpoints.
+
+    Requests are recorded for assertions. Tests set ``completion_content``
+    and ``usage`` for chat completions (the first ``rate_limited`` of them
+    get a 429), and ``batch_status`` plus the ``outputs`` / ``errors`` JSONL
+    records a finished batch returns.
+    """
+
+    def __init__(self):
+        self.completions = []
+        self.completion_content = '{"title": "Stub"}'
+        self.usage = {'prompt_tokens': 10, 'completion_tokens': 20, 'total_tokens': 30}
+        self.rate_limited = 0
+        self.uploads = []
+        self.batch_requests = []
+        self.batch_status = 'completed'
+        self.outputs = []
+        self.errors = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> 'StubOpenAI':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def batch(self) -> dict:
+        request = self.batch_requests[-1] if self.batch_requests else {}
+        return {
+            'id': 'batch_1',
+            'object': 'batch',
+            'endpoint': request.get('endpoint', '/v1/chat/completions'),
+            'input_file_id': request.get('input_file_id', 'file-in'),
+            'completion_window': request.get('completion_window', '24h'),
+            'status': self.batch_status,
+            'created_at': 0,
+            'output_file_id': 'file-out' if self.outputs else None,
+            'error_file_id': 'file-err' if self.errors else None,
+            'metadata': request.get('metadata'),
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body, content_type='application/json', status=200, headers=None):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, content, usage):
+                # Server-sent events: the content in a few chunks, then a usage-only chunk
+                base = {'id': 'chatcmpl-1', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4o'}
+                size = max(1, len(content) // 3)
+                chunks = [dict(base, choices=[{'index': 0, 'delta': {'content': content[start:start + size]},
+                                               'finish_reason': None}])
+                          for start in range(0, len(content), size)]
+                chunks.append(dict(base, choices=[], usage=usage))
+                data = ''.join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+                self._send(data.encode('utf-8'), 'text/event-stream')
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path == '/v1/chat/completions':
+                    stub.completions.append(json.loads(body))
+                    if stub.rate_limited:
+                        stub.rate_limited -= 1
+                        self._send({'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                              'code': 'rate_limit_exceeded'}},
+                                   status=429, headers={'retry-after-ms': '10'})
+                        return
+                    if stub.completions[-1].get('stream'):
+                        self._stream(stub.completion_content, stub.usage)
+                        return
+                    self._send({'id': 'chatcmpl-1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o',
+                                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {
+                                    'role': 'assistant', 'content': stub.completion_content}}],
+                                'usage': stub.usage})
+                elif self.path == '/v1/files':
+                    stub.uploads.append(body)
+                    self._send({'id': 'file-in', 'object': 'file', 'bytes': len(body), 'created_at': 0,
+                                'filename': 'batch.jsonl', 'purpose': 'batch', 'status': 'processed'})
+                elif self.path == '/v1/batches':
+                    stub.batch_requests.append(json.loads(body))
+                    self._send(stub.batch())
+                else:
+                    self.send_error(404)
+
+            def do_GET(self):
+                if self.path == '/v1/batches/batch_1':
+                    self._send(stub.batch())
+                elif self.path == '/v1/files/file-out/content':
+                    self._send(''.join(json.dumps(record) + '\n' for record in stub.outputs).encode('utf-8'),
+                               'application/octet-stream')
+                elif self.path == '/v1/files/file-err/content':
+                    self._send(''.join(json.dumps(record) + '\n' for record in stub.errors).encode('utf-8'),
+                               'application/octet-stream')
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+
+@pytest.fixture
+def stub_openai(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    stub = StubOpenAI().start()
+    yield stub
+    stub.stop()
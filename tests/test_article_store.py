@@ -0,0 +1,77 @@
+import datetime
+
+from utils.article_store import ArticleStore
+
+DAY = datetime.date(2026, 3, 1)
+
+
+def article(number):
+    return {'title': f"Article {number}", 'content': f"<p>Body of article {number}.</p>", 'slug': f"article-{number}"}
+
+
+def test_ids_stay_stable_after_deletes(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite3'))
+    first, second, third = store.add_many([article(1), article(2), article(3)])
+
+    store.delete(second)
+    store.delete(third)
+    fourth = store.add(article(4))
+
+    assert store.get(first)['title'] == 'Article 1'
+    assert store.get(second) is None
+    # Deleted ids are never handed out again, so old references can't point at new articles
+    assert fourth not in (first, second, third)
+    assert store.get(fourth)['title'] == 'Article 4'
+
+
+def test_adding_stored_content_returns_the_existing_id(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite3'))
+    article_id = store.add(article(1), site='https://a.example')
+
+    assert store.add(dict(article(1), status='published'), site='https://a.example') == article_id
+    assert store.count() == 1
+    assert store.get(article_id)['status'] == 'draft'
+
+    # Another site or kind is a separate article
+    other_site = store.add(article(1), site='https://b.example')
+    source = store.add(article(1), site='https://a.example', kind='source')
+    assert len({article_id, other_site, source}) == 3
+    assert store.count() == 2
+    assert store.count(kind='source') == 1
+
+
+def test_query_pages_through_filtered_articles_newest_first(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite3'))
+    for number in range(10):
+        store.add(article(number), site='https://a.example', date=DAY + datetime.timedelta(days=number),
+                  status='published' if number % 2 else 'draft')
+    store.add(article(99), site='https://b.example', date=DAY)
+
+    pages = [store.query(site='https://a.example', limit=4, offset=offset) for offset in (0, 4, 8)]
+    assert [[item['title'] for item in page] for page in pages] == [
+        ['Article 9', 'Article 8', 'Article 7', 'Article 6'],
+        ['Article 5', 'Article 4', 'Article 3', 'Article 2'],
+        ['Article 1', 'Article 0'],
+    ]
+    assert store.count(site='https://a.example') == 10
+    assert store.count() == 11
+    assert len(store.query(limit=None)) == 11
+
+    window = {'start_date': DAY + datetime.timedelta(days=2), 'end_date': DAY + datetime.timedelta(days=5)}
+    assert [item['title'] for item in store.query(**window)] == ['Article 5', 'Article 4', 'Article 3', 'Article 2']
+    assert store.count(**window) == 4
+    assert [item['title'] for item in store.query(status='published', **window)] == ['Article 5', 'Article 3']
+    assert store.count(status='draft', **window) == 2
+    assert store.query(status='draft', site='https://b.example')[0]['date'] == DAY
+
+
+def test_get_many_keeps_the_requested_order(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite3'))
+    ids = store.add_many([article(number) for number in range(5)])
+    store.delete(ids[1])
+
+    requested = [ids[3], ids[0], ids[1], ids[4], ids[3]]
+    assert [item['title'] for item in store.get_many(requested)] == [
+        'Article 3', 'Article 0', 'Article 4', 'Article 3'
+    ]
+    assert store.get_many([]) == []
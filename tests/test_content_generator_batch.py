@@ -0,0 +1,88 @@
+import json
+
+from utils.content_generator import ContentGenerator
+from utils.response_cache import ResponseCache
+
+SOURCES = [
+    {'title': 'First story', 'content': '<p>Something happened today in the city.</p>'},
+    {'title': 'Second story', 'content': '<p>Something else happened somewhere else.</p>'},
+]
+
+
+def make_generator(stub, tmp_path, keyword_mode='inline'):
+    return ContentGenerator(keyword_mode=keyword_mode, base_url=stub.base_url,
+                            cache=ResponseCache(str(tmp_path / 'responses.sqlite3')))
+
+
+def output_record(custom_id, content):
+    return {'custom_id': custom_id, 'response': {'status_code': 200, 'body': {
+        'choices': [{'message': {'role': 'assistant', 'content': content}}]
+    }}}
+
+
+def test_write_batch_file_writes_one_request_per_source(stub_openai, tmp_path):
+    generator = make_generator(stub_openai, tmp_path)
+    path = tmp_path / 'batches' / 'batch.jsonl'
+
+    cache_keys = generator.write_batch_file(SOURCES, str(path))
+
+    requests = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [request['custom_id'] for request in requests] == ['article-0', 'article-1']
+    assert all(request['url'] == '/v1/chat/completions' for request in requests)
+    assert all(request['body']['response_format'] == {'type': 'json_object'} for request in requests)
+    assert 'Something happened today' in requests[0]['body']['messages'][0]['content']
+    assert cache_keys == {f"article-{index}": generator._cache_key(source) for index, source in enumerate(SOURCES)}
+
+
+def test_write_batch_file_keys_separate_mode_as_inline(stub_openai, tmp_path):
+    generator = make_generator(stub_openai, tmp_path, keyword_mode='separate')
+
+    cache_keys = generator.write_batch_file(SOURCES, str(tmp_path / 'batch.jsonl'))
+
+    inline = generator.with_options(keyword_mode='inline')
+    assert cache_keys['article-0'] == inline._cache_key(SOURCES[0])
+    assert cache_keys['article-0'] != generator._cache_key(SOURCES[0])
+
+
+def test_submit_batch_uploads_file_and_creates_batch(stub_openai, tmp_path):
+    generator = make_generator(stub_openai, tmp_path)
+    path = tmp_path / 'batch.jsonl'
+    generator.write_batch_file(SOURCES, str(path))
+
+    batch_id = generator.submit_batch(str(path), {'site': 'example'})
+
+    assert batch_id == 'batch_1'
+    assert b'"custom_id": "article-1"' in stub_openai.uploads[0]
+    request = stub_openai.batch_requests[0]
+    assert request['input_file_id'] == 'file-in'
+    assert request['endpoint'] == '/v1/chat/completions'
+    assert request['completion_window'] == '24h'
+    assert request['metadata'] == {'site': 'example'}
+
+
+def test_get_batch_results_maps_outputs_errors_and_missing(stub_openai, tmp_path):
+    generator = make_generator(stub_openai, tmp_path)
+    cache_keys = generator.write_batch_file(SOURCES + [{'title': 'Third', 'content': 'Never run'}],
+                                            str(tmp_path / 'batch.jsonl'))
+    stub_openai.outputs = [output_record('article-0', '{"title": "Rewritten"}')]
+    stub_openai.errors = [{'custom_id': 'article-1', 'error': {'message': 'Rate limited'}}]
+    stub_openai.batch_status = 'expired'
+
+    batch = generator.get_batch_status('batch_1')
+    results = generator.get_batch_results(batch, cache_keys)
+
+    assert results['article-0'] == {'content': '{"title": "Rewritten"}', 'error': None}
+    assert 'Rate limited' in results['article-1']['error']
+    assert results['article-2'] == {'content': None, 'error': 'No result (batch expired)'}
+    # Successful responses are cached for the synchronous path
+    assert generator.generate_content(SOURCES[0]) == '{"title": "Rewritten"}'
+
+
+def test_run_batch_returns_results_aligned_with_sources(stub_openai, tmp_path):
+    generator = make_generator(stub_openai, tmp_path)
+    stub_openai.outputs = [output_record('article-1', '{"title": "Second"}'),
+                           output_record('article-0', '{"title": "First"}')]
+
+    results = generator.run_batch(SOURCES, str(tmp_path / 'batch.jsonl'), poll_interval=0)
+
+    assert [result['content'] for result in results] == ['{"title": "First"}', '{"title": "Second"}']
@@ -0,0 +1,61 @@
+import pytest
+from openai import RateLimitError
+
+from utils.content_generator import KEYWORD_MAX_TOKENS, ContentGenerator
+
+SOURCE = {'title': 'A story', 'content': '<p>Something happened today in the city.</p>'}
+
+
+def make_generator(stub, **kwargs):
+    return ContentGenerator(base_url=stub.base_url, **kwargs)
+
+
+def test_sync_calls_retry_429s_through_the_shared_limiter(stub_openai):
+    stub_openai.rate_limited = 2
+    generator = make_generator(stub_openai, max_retries=3)
+
+    assert generator.generate_content(SOURCE) == '{"title": "Stub"}'
+    assert len(stub_openai.completions) == 3
+
+
+def test_sync_calls_give_up_after_max_retries(stub_openai):
+    stub_openai.rate_limited = 5
+    generator = make_generator(stub_openai, max_retries=1)
+
+    with pytest.raises(RateLimitError):
+        generator._create_completion('generate', [{"role": "user", "content": "hi"}])
+    assert len(stub_openai.completions) == 2
+
+
+def test_sync_calls_draw_on_the_request_budget(stub_openai):
+    generator = make_generator(stub_openai, requests_per_minute=2)
+
+    generator.generate_content(SOURCE)
+    generator.generate_hindi_content(SOURCE)
+
+    assert generator.rate_limiter.reserve() > 0
+
+
+def test_short_calls_reserve_their_max_tokens_and_settle_with_usage(stub_openai):
+    generator = make_generator(stub_openai, keyword_mode='separate', tokens_per_minute=3000)
+
+    generator._resolve_keywords(SOURCE)
+
+    request = stub_openai.completions[0]
+    assert request['max_tokens'] == KEYWORD_MAX_TOKENS
+    # Only the reported 30 tokens stay charged, not the 2000 reserved for an article
+    assert generator.rate_limiter.reserve(2960) == 0
+
+
+def test_streams_retry_429s_and_settle_with_usage(stub_openai):
+    stub_openai.rate_limited = 1
+    stub_openai.completion_content = '{"title": "Streamed", "content": "Body"}'
+    generator = make_generator(stub_openai, tokens_per_minute=3000)
+
+    events = list(generator.stream_content(SOURCE))
+
+    assert events[-1] == {'type': 'done', 'content': '{"title": "Streamed", "content": "Body"}'}
+    assert {'type': 'field', 'name': 'title', 'value': 'Streamed'} in events
+    assert len(stub_openai.completions) == 2
+    assert stub_openai.completions[-1]['stream_options'] == {'include_usage': True}
+    assert generator.rate_limiter.reserve(2960) == 0
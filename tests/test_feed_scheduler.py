@@ -0,0 +1,112 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.feed_cache import FeedCache
+from utils.feed_parser import FeedParser
+from utils.feed_scheduler import FeedScheduler
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Example</title><link>https://example.com</link><description>Example</description>
+<item><title>First</title><link>https://example.com/1</link><guid>https://example.com/1</guid><description>One</description></item>
+<item><title>Second</title><link>https://example.com/2</link><guid>https://example.com/2</guid><description>Two</description></item>
+</channel></rss>"""
+
+
+class RSSServer:
+    """Serves one RSS feed with an ETag, answering matching conditional requests with 304"""
+
+    def __init__(self):
+        self.not_modified = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.headers.get('If-None-Match') == '"v1"':
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml')
+                self.send_header('ETag', '"v1"')
+                self.send_header('Content-Length', str(len(RSS)))
+                self.end_headers()
+                self.wfile.write(RSS)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/feed.xml"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def rss_server():
+    server = RSSServer()
+    yield server
+    server.stop()
+
+
+class StubFeedParser:
+    def is_valid_url(self, url):
+        return url.startswith('https://')
+
+    def fetch_feed(self, url):
+        return {'entries': [{'guid': f"{url}#1", 'title': 'Entry', 'link': f"{url}/1"}],
+                'changed': True, 'min_interval': None}
+
+
+def scheduled(scheduler):
+    return {feed['url']: feed['site'] for feed in scheduler.feed_status()}
+
+
+def test_sync_sites_only_touches_the_sites_passed_in(tmp_path):
+    scheduler = FeedScheduler(StubFeedParser(), path=str(tmp_path / 'scheduler.sqlite3'))
+    scheduler.sync_sites({'a': {'feed_urls': ['https://a.example/feed']},
+                          'b': {'feed_urls': ['https://b.example/feed', 'https://b.example/old']}})
+
+    # Another session that only knows site b drops b's removed feed, not a's
+    scheduler.sync_sites({'b': {'feed_urls': ['https://b.example/feed']}})
+
+    assert scheduled(scheduler) == {'https://a.example/feed': 'a', 'https://b.example/feed': 'b'}
+
+
+def test_polled_entries_are_handed_out_once_per_site(tmp_path):
+    scheduler = FeedScheduler(StubFeedParser(), path=str(tmp_path / 'scheduler.sqlite3'))
+    scheduler.sync_sites({'a': {'feed_urls': ['https://a.example/feed']}})
+
+    scheduler.poll_due()
+
+    assert scheduler.pending_count('a') == 1
+    assert [entry['title'] for entry in scheduler.take_new('a')] == ['Entry']
+    assert scheduler.take_new('a') == []
+
+
+def test_remove_sites_leaves_other_sites_scheduled(tmp_path):
+    scheduler = FeedScheduler(StubFeedParser(), path=str(tmp_path / 'scheduler.sqlite3'))
+    scheduler.sync_sites({'a': {'feed_urls': ['https://a.example/feed']},
+                          'b': {'feed_urls': ['https://b.example/feed']}})
+
+    scheduler.remove_sites(['a'])
+
+    assert scheduler.scheduled_sites() == ['b']
+
+
+def test_entries_fetched_elsewhere_are_pooled_after_a_not_modified_poll(tmp_path, rss_server):
+    parser = FeedParser(cache=FeedCache(str(tmp_path / 'feeds')))
+    scheduler = FeedScheduler(parser, path=str(tmp_path / 'scheduler.sqlite3'))
+    scheduler.sync_sites({'a': {'feed_urls': [rss_server.url]}})
+
+    # Another fetch of the feed (the UI, the worker, the CLI) refreshes the shared validators
+    assert len(parser.parse_feed(rss_server.url)) == 2
+    scheduler.poll_due()
+
+    assert rss_server.not_modified == 1
+    assert sorted(entry['title'] for entry in scheduler.take_new('a')) == ['First', 'Second']
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+
+# Rendered in a fresh interpreter, since the test session may already have
+# imported the heavy modules the Home page must not load
+RENDER_HOME = """
+import json, socket, sys
+from streamlit.testing.v1 import AppTest
+from utils.instrumentation import METRICS
+
+# Record outbound connections instead of making them
+connections = []
+def connect(sock, address):
+    connections.append(repr(address))
+    raise OSError('network disabled')
+socket.socket.connect = connect
+
+app = AppTest.from_file(sys.argv[1], default_timeout=60)
+exceptions = []
+for _ in range(3):  # a fresh session, then reruns once metrics exist
+    app.run()
+    exceptions += [exception.value for exception in app.exception]
+print(json.dumps({
+    'exceptions': exceptions,
+    'renders': [timer['count'] for timer in METRICS.snapshot()['timers']
+                if timer['name'] == 'page_render' and timer['labels'] == {'page': 'home'}],
+    'modules': [name for name in HEAVY_MODULES if name in sys.modules],
+    'connections': connections,
+}))
+"""
+
+# Modules only the generation and analysis pages need
+HEAVY_MODULES = ('openai', 'pandas', 'numpy', 'textblob', 'nltk', 'tiktoken', 'bs4')
+
+
+def test_home_page_renders_without_heavy_imports_or_network(tmp_path):
+    # Timings vary too much between machines to assert on; what keeps the
+    # Home page fast is that it loads no heavy modules and makes no requests
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    script = RENDER_HOME.replace('HEAVY_MODULES', repr(HEAVY_MODULES))
+    completed = subprocess.run([sys.executable, '-c', script, MAIN], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert result['exceptions'] == []
+    assert result['modules'] == []
+    assert result['connections'] == []
+    # Every run was timed, so the sidebar stats have something to show
+    assert result['renders'] == [3]
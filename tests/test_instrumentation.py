@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from utils import content_generator
+from utils.content_generator import ContentGenerator
+from utils.instrumentation import METRICS, Metrics
+
+
+def timer(snapshot, name, **labels):
+    return next(timer for timer in snapshot['timers'] if timer['name'] == name and timer['labels'] == labels)
+
+
+def test_spans_count_calls_errors_and_durations():
+    metrics = Metrics(enabled=True)
+
+    with metrics.span('call', op='a'):
+        time.sleep(0.01)
+    with pytest.raises(ValueError):
+        with metrics.span('call', op='a'):
+            raise ValueError
+
+    recorded = timer(metrics.snapshot(), 'call', op='a')
+    assert recorded['count'] == 2
+    assert recorded['errors'] == 1
+    assert recorded['max_seconds'] >= 0.01
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+
+    with metrics.span('call'):
+        pass
+    metrics.increment('things', 3)
+
+    assert metrics.snapshot()['timers'] == []
+    assert metrics.to_prometheus() == ''
+
+
+def test_prometheus_text_escapes_labels():
+    metrics = Metrics(enabled=True)
+    metrics.increment('tokens', 5, operation='say "hi"')
+    metrics.observe('request', 0.5, operation='generate')
+
+    text = metrics.to_prometheus(prefix='app')
+
+    assert 'app_tokens_total{operation="say \\"hi\\""} 5' in text
+    assert '# TYPE app_request_seconds summary' in text
+    assert 'app_request_seconds_count{operation="generate"} 1' in text
+
+
+class ConsumerClock:
+    """Stands in for the time module; the clock only moves when the test advances it"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def perf_counter(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def test_stream_timings_exclude_consumer_time(stub_openai, monkeypatch):
+    METRICS.reset()
+    stub_openai.completion_content = '{"title": "Streamed", "content": "A body long enough to chunk"}'
+    generator = ContentGenerator(base_url=stub_openai.base_url)
+    clock = ConsumerClock()
+    monkeypatch.setattr(content_generator, 'time', clock)
+
+    # Spans and consumed events, in the order they happen
+    log = []
+    observe = METRICS.observe
+
+    def record(name, seconds, error=False, **labels):
+        log.append((name, seconds))
+        observe(name, seconds, error=error, **labels)
+
+    monkeypatch.setattr(METRICS, 'observe', record)
+
+    for event in generator.stream_content({'title': 'A story', 'content': 'Something happened.'}):
+        log.append(event['type'])
+        clock.now += 10  # the consumer is slow; none of this may be timed
+
+    spans = [entry for entry in log if isinstance(entry, tuple) and entry[0].startswith('openai_')]
+    events = [entry for entry in log if isinstance(entry, str)]
+    assert spans == [('openai_stream_first_token', 0.0), ('openai_request', 0.0)]
+    # First token is timed before the consumer sees anything, the request before 'done'
+    assert log.index(spans[0]) < log.index(events[0])
+    assert log.index(spans[1]) == log.index('done') - 1
+    assert events.count('token') > 1
+
+    snapshot = METRICS.snapshot()
+    assert timer(snapshot, 'openai_request', operation='stream')['count'] == 1
+    assert timer(snapshot, 'openai_stream_first_token', operation='stream')['count'] == 1
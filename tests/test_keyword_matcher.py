@@ -0,0 +1,64 @@
+import re
+
+import pytest
+
+from utils.keyword_matcher import KeywordMatcher, phrase_pattern, tokenize
+
+
+def test_overlapping_phrases_are_all_counted():
+    matcher = KeywordMatcher(['coffee', 'coffee beans', 'beans', 'roast coffee beans daily', 'beans daily'])
+
+    counts = matcher.count('We roast coffee beans daily. Coffee beans, then more beans.')
+
+    assert counts == {'coffee': 2, 'coffee beans': 2, 'beans': 3, 'roast coffee beans daily': 1, 'beans daily': 1}
+
+
+def test_phrases_sharing_a_prefix_follow_failure_links():
+    # After "new york city" fails on "hall", matching resumes inside "york city hall"
+    matcher = KeywordMatcher(['new york city tour', 'york city hall', 'city'])
+
+    assert matcher.count('new york city hall') == {'new york city tour': 0, 'york city hall': 1, 'city': 1}
+
+
+def test_matches_respect_word_boundaries():
+    matcher = KeywordMatcher(['cat', 'in', 'e-mail'])
+
+    counts = matcher.count('Concatenate in cats, a cat-flap; in-line cat. e-mail email')
+
+    # Punctuation separates words, so "cat-flap" and "in-line" contain matches
+    assert counts == {'cat': 2, 'in': 2, 'e-mail': 1}
+
+
+def test_matching_is_case_folded_and_unicode_normalized():
+    matcher = KeywordMatcher(['Straße', 'café', 'ÉTÉ'])
+
+    # "STRASSE" case-folds to "strasse"; "CAFE\u0301" is "CAFÉ" with a combining accent
+    counts = matcher.count('STRASSE und strasse, CAFE\u0301 or cafe, e\u0301te\u0301')
+
+    assert counts == {'Straße': 2, 'café': 1, 'ÉTÉ': 1}
+
+
+def test_hindi_words_keep_their_vowel_signs():
+    # Matras (ि ी ु), anusvara (ं) and virama (्) are combining marks, not \w
+    assert tokenize('नमस्ते दुनिया! हिंदी में लिखें।') == ['नमस्ते', 'दुनिया', 'हिंदी', 'में', 'लिखें']
+
+    matcher = KeywordMatcher(['भारत', 'भारतीय खाना', 'खाना'])
+    counts = matcher.count('भारत में भारतीय खाना, खाना और भारतीयता')
+
+    # "भारतीय" and "भारतीयता" contain "भारत" but are different words
+    assert counts == {'भारत': 1, 'भारतीय खाना': 1, 'खाना': 2}
+
+
+def test_keywords_without_words_are_never_matched():
+    matcher = KeywordMatcher(['', '!!', 'ok'])
+
+    assert matcher.count('!! ok !!') == {'!!': 0, 'ok': 1}
+    assert phrase_pattern('!!') == ''
+
+
+@pytest.mark.parametrize('keyword', ['coffee beans', 'Straße', 'भारतीय खाना', 'c++'])
+def test_phrase_pattern_counts_like_the_matcher(keyword):
+    text = 'Coffee beans, coffee beans STRASSE भारतीय खाना c c++ beans coffee'
+    joined = ' '.join(tokenize(text))
+
+    assert len(re.findall(phrase_pattern(keyword), joined)) == KeywordMatcher([keyword]).count(text)[keyword]
@@ -0,0 +1,42 @@
+import random
+
+from utils.near_duplicates import NearDuplicateIndex
+
+WORDS = [f"word{index}" for index in range(5000)]
+
+
+def article(title, words):
+    return {'title': title, 'link': f"https://example.com/{title}", 'content': ' '.join(words)}
+
+
+def test_default_banding_makes_pairs_at_the_threshold_candidates(tmp_path):
+    # threshold=0 returns every LSH candidate, so this measures the banding alone
+    index = NearDuplicateIndex(path=str(tmp_path / 'index.sqlite3'), threshold=0.0, shingle_size=1)
+    generator = random.Random(7)
+    found = 0
+    for pair in range(50):
+        # 140 words shared out of 200 in either article: Jaccard similarity 0.7
+        words = generator.sample(WORDS, 200)
+        shared, first_only, second_only = words[:140], words[140:170], words[170:]
+        index.add(article(f"original-{pair}", shared + first_only))
+        found += any(match['title'] == f"original-{pair}"
+                     for match in index.query(article(f"copy-{pair}", shared + second_only)))
+    assert found >= 48
+
+
+
+def test_articles_are_only_duplicates_within_a_site(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / 'index.sqlite3'))
+    story = article('story', WORDS[:300])
+    copy = article('copy', WORDS[:290] + WORDS[1000:1010])
+
+    index.deduplicate([story], site='a')
+    index.mark_generated(story, 'a')
+
+    # Once generated for site a, the story and a near copy of it are duplicates there...
+    unique, duplicates = index.deduplicate([story, copy], site='a')
+    assert unique == [] and [duplicate['title'] for duplicate in duplicates] == ['story', 'copy']
+
+    # ...but still new to site b, where only the copy duplicates the story
+    unique, duplicates = index.deduplicate([story, copy], site='b')
+    assert unique == [story] and [duplicate['title'] for duplicate in duplicates] == ['copy']
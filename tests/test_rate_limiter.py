@@ -0,0 +1,55 @@
+import asyncio
+
+from utils.rate_limiter import RateLimiter, retry_delay_from_headers
+
+
+def test_reserve_reports_wait_once_token_budget_is_spent():
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=600)
+
+    assert limiter.reserve(500) == 0
+    # 400 tokens short at 10 tokens per second
+    assert 39 < limiter.reserve(500) <= 40
+
+
+def test_reconcile_returns_unused_reservation():
+    limiter = RateLimiter(tokens_per_minute=3000)
+
+    for _ in range(3):
+        assert limiter.reserve(1000) == 0
+    assert limiter.reserve(1000) > 0
+
+    limiter.reconcile(1000, 50)
+    assert limiter.reserve(900) == 0
+
+
+def test_reconcile_charges_overrun():
+    limiter = RateLimiter(tokens_per_minute=1000)
+
+    assert limiter.reserve(100) == 0
+    limiter.reconcile(100, 600)
+
+    assert limiter.reserve(500) > 0
+
+
+def test_sync_and_async_callers_share_the_request_budget():
+    limiter = RateLimiter(requests_per_minute=2)
+
+    limiter.acquire()
+    asyncio.run(limiter.aacquire())
+
+    assert limiter.reserve() > 0
+
+
+def test_pause_blocks_every_caller():
+    limiter = RateLimiter(requests_per_minute=100)
+
+    limiter.pause(5)
+
+    assert 4 < limiter.reserve() <= 5
+
+
+def test_retry_delay_prefers_retry_after_ms_then_reset_headers():
+    assert retry_delay_from_headers({'retry-after-ms': '250', 'retry-after': '9'}, default=1) == 0.25
+    assert retry_delay_from_headers({'x-ratelimit-reset-requests': '1.5s',
+                                     'x-ratelimit-reset-tokens': '6m0s'}, default=1) == 360
+    assert retry_delay_from_headers(None, default=4) == 4
@@ -0,0 +1,71 @@
+import pytest
+
+from utils.readability import DEFAULT_PROFILES, ReadabilityEngine, detect_language
+
+HINDI = 'नमस्ते दुनिया। आम क्षेत्र।'
+SPANISH = 'El poeta tiene un día en el país.'
+
+
+@pytest.mark.parametrize('word, aksharas', [
+    ('नमस्ते', 3),   # न-मस्-ते: स carries a virama and joins the next akshara
+    ('दुनिया', 3),   # दु-नि-या: matras don't add aksharas
+    ('आम', 2),       # independent vowel आ plus म
+    ('क्षेत्र', 2),    # क्षे-त्र: two conjuncts
+    ('ज़्यादा', 2),    # nukta before the virama: ज़्या-दा
+    ('हिंदी', 2),     # the anusvara isn't an akshara of its own
+])
+def test_hindi_counts_devanagari_aksharas(word, aksharas):
+    assert ReadabilityEngine().count_syllables(word, 'hi') == aksharas
+
+
+@pytest.mark.parametrize('word, syllables', [
+    ('tiene', 2),    # tie-ne: unaccented weak vowel, a diphthong
+    ('cuidado', 3),  # cui-da-do
+    ('poeta', 3),    # po-e-ta: two strong vowels
+    ('leer', 2),     # le-er
+    ('día', 2),      # dí-a: accented weak vowel
+    ('país', 2),     # pa-ís
+    ('aéreo', 4),    # a-é-re-o
+])
+def test_spanish_counts_hiatus_as_two_syllables(word, syllables):
+    assert ReadabilityEngine().count_syllables(word, 'es') == syllables
+
+
+def test_hindi_score_uses_the_rescaled_syllable_weight():
+    engine = ReadabilityEngine()
+
+    assert DEFAULT_PROFILES['hi'].syllable_weight == 47.0
+    assert engine.count_sentences(HINDI, 'hi') == 2
+    assert engine.count_syllables(HINDI, 'hi') == 3 + 3 + 2 + 2
+    # 206.835 - 1.015 * (4 words / 2 sentences) - 47.0 * (10 aksharas / 4 words)
+    assert engine.score(HINDI, 'hindi') == pytest.approx(87.305)
+    assert engine.score(HINDI) == pytest.approx(87.305)
+
+
+def test_spanish_score_is_szigriszt_pazos():
+    engine = ReadabilityEngine()
+
+    assert engine.count_syllables(SPANISH, 'es') == 1 + 3 + 2 + 1 + 2 + 1 + 1 + 2
+    # 206.835 - 1.0 * (8 words / 1 sentence) - 62.3 * (13 syllables / 8 words)
+    assert engine.score(SPANISH, 'español') == pytest.approx(97.5975)
+    assert engine.score(SPANISH) == pytest.approx(97.5975)
+
+
+def test_language_detection():
+    assert detect_language(HINDI) == 'hi'
+    assert detect_language(SPANISH) == 'es'
+    assert detect_language('The cat sat on the mat and it was happy.') == 'en'
+
+
+def test_chunked_counting_matches_whole_text():
+    text = ' '.join([HINDI] * 50)
+    whole = ReadabilityEngine()
+    chunked = ReadabilityEngine(chunk_size=64)
+
+    assert chunked.count_syllables(text, 'hi') == whole.count_syllables(text, 'hi') == 500
+    assert chunked.count_sentences(text, 'hi') == whole.count_sentences(text, 'hi') == 100
+
+
+def test_unknown_language_is_rejected():
+    with pytest.raises(ValueError):
+        ReadabilityEngine().score('Bonjour tout le monde.', 'french')
@@ -0,0 +1,57 @@
+from utils.seo_document import SEODocument
+from utils.seo_optimizer import SEOOptimizer
+
+ARTICLE = """
+<h2 class="lead" id="why">Why Coffee Beans Matter</h2>
+<p>Fresh <em>coffee</em> beans make better coffee.</p>
+<script>var tracking = "not part of the article";</script>
+<style>.lead { font-weight: bold; }</style>
+<!-- draft: remember to add a recipe -->
+<H3>Grinding</H3>
+<p>Grind just before brewing &amp; drink it hot.</p>
+<h5>Footnote heading</h5>
+<img src="/beans.jpg" alt="Roasted coffee beans">
+<p><a href="https://example.com/roasting">Roasting guide</a> and <a href="/brewing">brewing</a>.</p>
+"""
+
+
+def analyze(html, keywords):
+    return SEOOptimizer().analyze_document(SEODocument(html), title='Coffee beans', keywords=keywords)
+
+
+def test_words_are_the_visible_text_only():
+    document = SEODocument(ARTICLE)
+
+    # Script, style, comments, tag attributes and alt text are not words
+    assert document.words == [
+        'Why', 'Coffee', 'Beans', 'Matter', 'Fresh', 'coffee', 'beans', 'make', 'better', 'coffee.',
+        'Grinding', 'Grind', 'just', 'before', 'brewing', '&', 'drink', 'it', 'hot.', 'Footnote', 'heading',
+        'Roasting', 'guide', 'and', 'brewing.'
+    ]
+    assert analyze(ARTICLE, ['coffee'])['word_count'] == 25
+    assert analyze(ARTICLE, ['coffee'])['keyword_density']['coffee'] == 3 / 25
+
+
+def test_headings_are_found_with_attributes_and_any_case():
+    document = SEODocument(ARTICLE)
+
+    assert document.headings == [(2, 'Why Coffee Beans Matter'), (3, 'Grinding'), (5, 'Footnote heading')]
+    assert document.heading_texts(2, 4) == ['Why Coffee Beans Matter', 'Grinding']
+    content = analyze(ARTICLE, ['coffee beans'])['content_analysis']
+    assert content['has_subheadings'] and content['has_keyword_in_subheading']
+    assert not analyze(ARTICLE, ['footnote'])['content_analysis']['has_keyword_in_subheading']
+
+
+def test_alt_text_check():
+    assert analyze(ARTICLE, ['Coffee Beans'])['content_analysis']['has_keyword_in_alt']
+    assert not analyze(ARTICLE, ['grinder'])['content_analysis']['has_keyword_in_alt']
+    assert not analyze('<p>Text</p><img src="/a.jpg">', ['coffee'])['content_analysis']['has_keyword_in_alt']
+
+
+def test_alt_text_check_without_a_focus_keyword(monkeypatch):
+    monkeypatch.setattr(SEOOptimizer, 'extract_focus_keyword', lambda self, text: '')
+
+    # No keyword to look for: any alt text counts, a missing alt attribute doesn't
+    assert analyze('<p>Text</p><img src="/a.jpg" alt="">', None)['content_analysis']['has_keyword_in_alt']
+    assert not analyze('<p>Text</p><img src="/a.jpg">', None)['content_analysis']['has_keyword_in_alt']
+    assert analyze('<p>Text</p><img src="/a.jpg">', None)['content_analysis']['has_images']
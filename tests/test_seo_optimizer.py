@@ -0,0 +1,68 @@
+import pytest
+
+from utils.seo_optimizer import SEOOptimizer
+
+ARTICLES = [
+    {
+        'title': '10 Proven Coffee Tips',
+        'content': (
+            '<h2 class="intro">Why coffee beans matter</h2>'
+            '<p>Good <b>coff</b>ee starts with fresh coffee beans. Grind them just before brewing!</p>'
+            '<!-- editor note: add more coffee here -->'
+            '<script>var coffee = "coffee beans";</script><style>p { color: brown; }</style>'
+            '<p>Tom&nbsp;&amp;&nbsp;Jerry drink coffee &lt;daily&gt;. Is 2 &lt; 3? Yes.</p>'
+            '<img src="/cup.png" alt="A cup of coffee">'
+            '<p>Read <a data-href="http://tracker.example" href="/guides/coffee">our guide</a> and '
+            '<a href="https://example.com/beans">this source</a>.</p>'
+        )
+    },
+    {
+        'title': 'Top10 brewing mistakes',
+        'content': (
+            '<h1>Brewing</h1><h5>Small print</h5>'
+            '<div>Water too hot burns coffee<br>Water too cold under-extracts it</div>'
+            '<a href="//cdn.example/file">cdn</a> <a href="HTTP://EXAMPLE.COM">shouting</a>'
+        )
+    },
+    {
+        'title': '१० कॉफ़ी सुझाव',
+        'content': '<p>कॉफ़ी बीन्स ताज़ा होनी चाहिए। अच्छी कॉफ़ी के लिए पानी का तापमान सही रखें।</p>'
+    },
+    {
+        'title': 'Plain text article',
+        'content': 'No markup here at all.\n\nJust two paragraphs about coffee and tea.'
+    },
+]
+
+KEYWORDS = ['coffee', 'coffee beans', 'कॉफ़ी']
+
+
+@pytest.mark.parametrize('index', range(len(ARTICLES)))
+def test_analyze_batch_agrees_with_analyze_content(index):
+    optimizer = SEOOptimizer()
+    article = ARTICLES[index]
+
+    single = optimizer.analyze_content(article, keywords=KEYWORDS)
+    row = optimizer.analyze_batch(ARTICLES, keywords=KEYWORDS).iloc[index]
+
+    assert row['word_count'] == single['word_count']
+    assert row['readability_score'] == pytest.approx(single['readability_score'])
+    assert row['keyword_density'] == pytest.approx(single['keyword_density']['coffee'])
+    for keyword in KEYWORDS:
+        assert row[f'density_{keyword}'] == pytest.approx(single['keyword_density'][keyword])
+    assert row['title_has_keyword'] == single['title_analysis']['has_keyword']
+    assert row['title_has_number'] == single['title_analysis']['has_number']
+    assert row['title_has_power_word'] == single['title_analysis']['has_power_word']
+    assert row['title_has_sentiment'] == single['title_analysis']['has_sentiment']
+    for check in ('has_subheadings', 'has_images', 'has_external_links', 'has_internal_links'):
+        assert row[check] == single['content_analysis'][check], check
+
+
+def test_analyze_batch_counts_phrases_as_whole_overlapping_tokens():
+    optimizer = SEOOptimizer()
+    article = {'title': 'Beans', 'content': '<p>Coffee beans, coffee-beans and coffeebeans. Ha ha ha.</p>'}
+
+    row = optimizer.analyze_batch([article], keywords=['coffee beans', 'ha ha']).iloc[0]
+
+    assert row['keyword_count'] == 2
+    assert row['density_ha ha'] * row['word_count'] == pytest.approx(2)
@@ -0,0 +1,20 @@
+import pytest
+
+from utils import text_preprocessor
+from utils.text_preprocessor import TextPreprocessor
+
+
+def test_token_counts_fall_back_to_an_estimate_when_the_encoding_cannot_load(monkeypatch):
+    if text_preprocessor.tiktoken is None:
+        pytest.skip("tiktoken is not installed")
+
+    def offline(*args, **kwargs):
+        raise ConnectionError("encoding file could not be downloaded")
+
+    monkeypatch.setattr(text_preprocessor.tiktoken, 'encoding_for_model', offline)
+    monkeypatch.setattr(text_preprocessor.tiktoken, 'get_encoding', offline)
+
+    preprocessor = TextPreprocessor(max_tokens=5)
+
+    assert preprocessor.count_tokens('a' * 40) == 10
+    assert preprocessor.count_tokens(preprocessor.truncate('one. two. three. ' * 20)) <= 5
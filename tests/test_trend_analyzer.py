@@ -0,0 +1,156 @@
+import pandas as pd
+import pytest
+
+from utils import trend_analyzer
+from utils.trend_analyzer import PAYLOAD_MAX_KEYWORDS, TrendAnalyzer
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping just moves the clock forward"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ThrottledResponse:
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+
+
+class ThrottledError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("The request failed: Google returned a response with code 429")
+        self.response = ThrottledResponse(retry_after)
+
+
+class StubTrends:
+    """Local stand-in for the pytrends client; ``failures`` are raised before answering"""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.trending_calls = 0
+        self.payloads = []
+        self._keywords = []
+
+    def _maybe_fail(self):
+        if self.failures:
+            raise self.failures.pop(0)
+
+    def trending_searches(self, pn):
+        self.trending_calls += 1
+        self._maybe_fail()
+        return pd.DataFrame({0: [f"{pn} topic 1", f"{pn} topic 2"]})
+
+    def build_payload(self, keywords, timeframe):
+        self.payloads.append(list(keywords))
+        self._keywords = list(keywords)
+
+    def related_topics(self):
+        self._maybe_fail()
+        return {keyword: {'rising': pd.DataFrame({'topic_title': [f"{keyword} rising"]}), 'top': None}
+                for keyword in self._keywords}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(trend_analyzer, 'time', fake)
+    return fake
+
+
+def test_trending_topics_are_cached_until_ttl_expires(clock):
+    stub = StubTrends()
+    analyzer = TrendAnalyzer(pytrends=stub, cache_ttl=60)
+
+    assert analyzer.get_trending_topics('All') == ['united_states topic 1', 'united_states topic 2']
+    analyzer.get_trending_topics('All')
+    assert stub.trending_calls == 1
+
+    clock.now += 61
+    analyzer.get_trending_topics('All')
+    assert stub.trending_calls == 2
+
+
+def test_cached_results_cannot_be_mutated_by_callers(clock):
+    analyzer = TrendAnalyzer(pytrends=StubTrends())
+
+    analyzer.get_trending_topics('All').append('injected')
+
+    assert 'injected' not in analyzer.get_trending_topics('All')
+
+
+def test_failures_are_cached_for_error_ttl(clock):
+    stub = StubTrends(failures=[ValueError("boom")])
+    analyzer = TrendAnalyzer(pytrends=stub, error_ttl=30)
+
+    assert analyzer.get_trending_topics('All') == []
+    assert analyzer.get_trending_topics('All') == []
+    assert stub.trending_calls == 1
+
+    clock.now += 31
+    assert analyzer.get_trending_topics('All') != []
+
+
+def test_related_topics_are_fetched_five_keywords_per_payload(clock):
+    stub = StubTrends()
+    analyzer = TrendAnalyzer(pytrends=stub)
+    keywords = [f"keyword {index}" for index in range(12)]
+
+    results = analyzer.get_related_topics_many(keywords + ['keyword 0'])
+
+    assert [len(payload) for payload in stub.payloads] == [PAYLOAD_MAX_KEYWORDS, PAYLOAD_MAX_KEYWORDS, 2]
+    assert results['keyword 11'] == ['keyword 11 rising']
+    assert list(results) == keywords
+
+    # Cached keywords are not requested again
+    analyzer.get_related_topics_many(['keyword 3', 'new keyword'])
+    assert stub.payloads[-1] == ['new keyword']
+
+
+def test_throttled_requests_honour_retry_after(clock):
+    stub = StubTrends(failures=[ThrottledError(retry_after='7')])
+    analyzer = TrendAnalyzer(pytrends=stub, min_request_interval=0)
+
+    assert analyzer.get_trending_topics('All')
+    assert stub.trending_calls == 2
+    assert clock.sleeps == [pytest.approx(7)]
+
+
+def test_throttled_requests_back_off_exponentially_and_give_up(clock):
+    stub = StubTrends(failures=[ThrottledError() for _ in range(4)])
+    analyzer = TrendAnalyzer(pytrends=stub, min_request_interval=0, max_retries=3, backoff_base=2.0)
+
+    assert analyzer.get_trending_topics('All') == []
+    assert stub.trending_calls == 4
+    assert len(clock.sleeps) == 3
+    for attempt, slept in enumerate(clock.sleeps):
+        assert 2.0 * 2 ** attempt <= slept <= 2.0 * 2 ** attempt + 1
+
+
+def test_retry_after_is_capped(clock):
+    stub = StubTrends(failures=[ThrottledError(retry_after='86400')])
+    analyzer = TrendAnalyzer(pytrends=stub, min_request_interval=0, max_retry_delay=30)
+
+    analyzer.get_trending_topics('All')
+
+    assert clock.sleeps == [pytest.approx(30)]
+
+
+def test_requests_are_spaced_by_min_request_interval(clock):
+    stub = StubTrends()
+    analyzer = TrendAnalyzer(pytrends=stub, min_request_interval=1.5)
+
+    analyzer.get_trending_topics('All')
+    analyzer.get_trending_topics('Business')
+
+    assert clock.sleeps == [pytest.approx(1.5)]
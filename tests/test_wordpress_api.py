@@ -0,0 +1,272 @@
+import threading
+import time
+
+import requests
+
+from utils.media_index import MediaIndex
+from utils.post_ledger import PostLedger
+from utils.wordpress_api import WordPressAPI
+
+ARTICLE = {'title': 'A title', 'content': '<p>Some content.</p>', 'link': 'https://example.com/source'}
+
+
+class StubResponse:
+    status_code = 201
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Records posted payloads and answers like the WordPress posts endpoint"""
+
+    def __init__(self):
+        self.posts = []
+        self.urls = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.posts.append(json)
+        self.urls.append(url)
+        return StubResponse({'id': len(self.posts), 'link': f"https://blog.example/?p={len(self.posts)}"})
+
+
+def test_create_post_marks_posts_skipped_by_the_ledger(tmp_path):
+    session = StubSession()
+    api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False,
+                       ledger=PostLedger(str(tmp_path / 'ledger.sqlite3')))
+
+    first = api.create_post(dict(ARTICLE), lookup_slug=False)
+    second = api.create_post(dict(ARTICLE), lookup_slug=False)
+
+    assert len(session.posts) == 1
+    assert not first.get('unchanged')
+    assert second['unchanged'] is True
+    assert second['id'] == first['id']
+
+
+def test_articles_sharing_a_generated_slug_get_their_own_posts(tmp_path):
+    session = StubSession()
+    api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False,
+                       ledger=PostLedger(str(tmp_path / 'ledger.sqlite3')))
+
+    first = api.create_post(dict(ARTICLE, slug='5-best-laptops', title='5 best laptops for students'),
+                            lookup_slug=False)
+    second = api.create_post(dict(ARTICLE, slug='5-best-laptops', title='5 best laptops for gaming'),
+                             lookup_slug=False)
+    third = api.create_post(dict(ARTICLE, slug='5-best-laptops', title='5 best laptops for students',
+                                 source_link='https://news.example/other-story'), lookup_slug=False)
+
+    assert len(session.posts) == 3
+    assert len({first['id'], second['id'], third['id']}) == 3
+    # Every publish created a post; none was sent as an update of another
+    assert session.urls == ['https://blog.example/wp-json/wp/v2/posts'] * 3
+
+
+def test_republishing_a_source_updates_its_post(tmp_path):
+    session = StubSession()
+    api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False,
+                       ledger=PostLedger(str(tmp_path / 'ledger.sqlite3')))
+    article = dict(ARTICLE, slug='a-title', source_link='https://news.example/story')
+
+    api.create_post(article, lookup_slug=False)
+    api.create_post(dict(article, title='A better title', slug='a-better-title'), lookup_slug=False)
+
+    assert session.urls == ['https://blog.example/wp-json/wp/v2/posts', 'https://blog.example/wp-json/wp/v2/posts/1']
+
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+
+
+class StubImageResponse:
+    headers = {'Content-Type': 'image/png'}
+
+    def __init__(self, body):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None):
+        # Slow enough that concurrent uploads overlap
+        time.sleep(0.01)
+        yield self.body
+
+
+class StubMediaSession:
+    """Serves the same image for every URL and answers like the media endpoint"""
+
+    def __init__(self):
+        self.downloads = []
+        self.uploads = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, stream=False):
+        with self._lock:
+            self.downloads.append(url)
+        return StubImageResponse(PNG)
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        data.read()
+        with self._lock:
+            self.uploads += 1
+            media_id = self.uploads
+        return StubResponse({'id': media_id, 'source_url': f"https://blog.example/uploads/{media_id}.png"})
+
+
+def media_api(tmp_path, session):
+    return WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False,
+                        media_index=MediaIndex(str(tmp_path / 'media.sqlite3')))
+
+
+def test_known_image_url_is_reused_without_downloading(tmp_path):
+    session = StubMediaSession()
+    api = media_api(tmp_path, session)
+
+    first = api.upload_media('https://images.example/a.png')
+    second = api.upload_media('https://images.example/a.png')
+    # Same bytes under another URL: downloaded once to hash, but not uploaded
+    third = api.upload_media('https://cdn.example/copy-of-a.png')
+    fourth = api.upload_media('https://cdn.example/copy-of-a.png')
+
+    assert first['id'] == second['id'] == third['id'] == fourth['id'] == 1
+    assert session.uploads == 1
+    assert session.downloads == ['https://images.example/a.png', 'https://cdn.example/copy-of-a.png']
+
+
+def test_concurrent_uploads_of_one_image_upload_it_once(tmp_path):
+    session = StubMediaSession()
+    api = media_api(tmp_path, session)
+    urls = ['https://images.example/a.png'] * 8 + [f"https://mirror{i}.example/a.png" for i in range(8)]
+
+    results = api.upload_media_many(urls, max_workers=16)
+
+    assert all(result['success'] for result in results)
+    assert {result['media']['id'] for result in results} == {1}
+    assert session.uploads == 1
+    assert session.downloads.count('https://images.example/a.png') == 1
+
+
+class StubErrorResponse(StubResponse):
+    def __init__(self, status_code, body):
+        super().__init__(body)
+        self.status_code = status_code
+        self.text = str(body)
+
+    def raise_for_status(self):
+        response = requests.Response()
+        response.status_code = self.status_code
+        raise requests.exceptions.HTTPError(f"{self.status_code} Client Error", response=response)
+
+
+class StubBatchSession:
+    """Answers discovery, single post and /batch/v1 requests like WordPress.
+
+    Batch sub-requests whose title is in ``fail`` get a 400; with ``limit``
+    at most that many sub-responses are returned per batch.
+    """
+
+    def __init__(self, batch=True, fail=(), limit=None):
+        self.namespaces = ['wp/v2', 'batch/v1'] if batch else ['wp/v2']
+        self.fail = set(fail)
+        self.limit = limit
+        self.batches = []
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, params=None):
+        return StubResponse({'namespaces': self.namespaces})
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        with self._lock:
+            if url.endswith('/batch/v1'):
+                self.batches.append(json['requests'])
+                responses = [self._answer(request['body']) for request in json['requests']]
+                return StubResponse({'responses': responses[:self.limit]})
+            self.posts.append(json)
+            answer = self._answer(json)
+        if answer['status'] != 201:
+            return StubErrorResponse(answer['status'], answer['body'])
+        return StubResponse(answer['body'])
+
+    def _answer(self, post_data):
+        if post_data['title'] in self.fail:
+            return {'status': 400, 'body': {'code': 'rest_invalid_param', 'message': 'Invalid title'}}
+        post_id = len(self.posts) + sum(len(batch) for batch in self.batches)
+        return {'status': 201, 'body': {'id': post_id, 'title': post_data['title']}}
+
+
+def articles(count):
+    return [dict(ARTICLE, title=f"Title {i}", source_link=f"https://news.example/{i}") for i in range(count)]
+
+
+def test_create_posts_uses_the_batch_endpoint_when_the_site_has_it(tmp_path):
+    session = StubBatchSession()
+    api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False)
+
+    results = api.create_posts(articles(30), lookup_slug=False)
+
+    assert [len(batch) for batch in session.batches] == [25, 5]
+    assert session.posts == []
+    assert all(result['success'] for result in results)
+    assert [result['post']['title'] for result in results] == [f"Title {i}" for i in range(30)]
+
+
+def test_create_posts_falls_back_to_parallel_requests(tmp_path):
+    session = StubBatchSession(batch=False)
+    api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False)
+
+    results = api.create_posts(articles(5), lookup_slug=False)
+
+    assert session.batches == []
+    assert sorted(post['title'] for post in session.posts) == [f"Title {i}" for i in range(5)]
+    assert [result['index'] for result in results] == list(range(5))
+    assert [result['post']['title'] for result in results] == [f"Title {i}" for i in range(5)]
+
+
+def test_create_posts_reports_failures_per_item(tmp_path):
+    for use_batch in (True, False):
+        session = StubBatchSession(fail={'Title 1'})
+        api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False,
+                           ledger=PostLedger(str(tmp_path / f"ledger-{use_batch}.sqlite3")))
+        contents = articles(3) + [{'content': 'No title'}]
+
+        results = api.create_posts(contents, use_batch=use_batch, lookup_slug=False)
+
+        assert [result['success'] for result in results] == [True, False, True, False]
+        assert 'Invalid post content' in results[3]['error']
+        if use_batch:
+            assert results[1]['error'] == 'HTTP 400: Invalid title'
+
+        # Only the failed post is sent again; the others are unchanged
+        session.fail.clear()
+        retried = api.create_posts(contents[:3], use_batch=use_batch, lookup_slug=False)
+        assert [result.get('unchanged', False) for result in retried] == [True, False, True]
+        assert all(result['success'] for result in retried)
+
+
+def test_batch_items_without_a_response_are_failed(tmp_path):
+    session = StubBatchSession(limit=2)
+    api = WordPressAPI('https://blog.example', 'user', 'password', session=session, verify=False,
+                       ledger=PostLedger(str(tmp_path / 'ledger.sqlite3')))
+
+    results = api.create_posts(articles(4), lookup_slug=False)
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    assert [result['success'] for result in results] == [True, True, False, False]
+    assert results[3]['error'] == 'No response in batch'
+
+    retried = api.create_posts(articles(4), lookup_slug=False)
+    assert session.batches[-1] == session.batches[0][2:]
+    assert [result['success'] for result in retried] == [True, True, True, True]
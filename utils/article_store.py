@@ -0,0 +1,175 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+ARTICLE_KINDS = ('source', 'generated')
+
+# Columns kept outside the JSON body so they can be filtered and indexed
+_COLUMNS = ('id', 'site', 'kind', 'status', 'title', 'slug', 'content_hash', 'date', 'wp_post_id')
+
+
+class ArticleStore:
+    """SQLite repository of fetched (``source``) and generated articles.
+
+    Replaces the session_state lists: ids come from the database and survive
+    deletes and restarts, and date/status/site filters plus pagination run
+    on indexes instead of scanning every article on each rerun. An article
+    is stored once per site and kind; adding the same content again returns
+    the existing id.
+    """
+
+    def __init__(self, path: str = os.path.join('.cache', 'articles.sqlite3')):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT NOT NULL DEFAULT '',
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                title TEXT NOT NULL,
+                slug TEXT,
+                content_hash TEXT NOT NULL,
+                date TEXT NOT NULL,
+                wp_post_id INTEGER,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_identity ON articles (site, kind, content_hash);
+            CREATE INDEX IF NOT EXISTS idx_articles_listing ON articles (kind, site, date, id);
+            CREATE INDEX IF NOT EXISTS idx_articles_status ON articles (kind, site, status, date);
+            CREATE INDEX IF NOT EXISTS idx_articles_slug ON articles (slug);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(article: Dict) -> str:
+        return hashlib.sha256(
+            f"{article.get('title', '')}\0{article.get('content', '')}".encode('utf-8')
+        ).hexdigest()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        article = json.loads(row['data'])
+        for column in _COLUMNS:
+            article[column] = row[column]
+        article['date'] = datetime.date.fromisoformat(row['date'])
+        return article
+
+    def add(self, article: Dict, site: str = '', kind: str = 'generated', status: Optional[str] = None,
+            date: Optional[datetime.date] = None) -> int:
+        """Store an article and return its id (the existing id if it is already stored)"""
+        if kind not in ARTICLE_KINDS:
+            raise ValueError(f"Unknown article kind: {kind}")
+        status = status or article.get('status') or ('draft' if kind == 'generated' else 'fetched')
+        date = date or article.get('date') or datetime.date.today()
+        content_hash = self.content_hash(article)
+        data = {key: value for key, value in article.items() if key not in _COLUMNS}
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO articles (site, kind, status, title, slug, content_hash, date, wp_post_id, "
+                "data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (site, kind, status, article.get('title', ''), article.get('slug'), content_hash,
+                 date.isoformat() if isinstance(date, datetime.date) else str(date), article.get('wp_post_id'),
+                 json.dumps(data, ensure_ascii=False, default=str), now, now)
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT id FROM articles WHERE site = ? AND kind = ? AND content_hash = ?", (site, kind, content_hash)
+            ).fetchone()
+        return row['id']
+
+    def add_many(self, articles: Iterable[Dict], site: str = '', kind: str = 'generated') -> List[int]:
+        return [self.add(article, site=site, kind=kind) for article in articles]
+
+    def get(self, article_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM articles WHERE id = ?", (article_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_many(self, article_ids: List[int]) -> List[Dict]:
+        """Articles by id, in the order given (missing ids are skipped)"""
+        if not article_ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM articles WHERE id IN ({','.join('?' * len(article_ids))})", list(article_ids)
+            ).fetchall()
+        by_id = {row['id']: self._to_dict(row) for row in rows}
+        return [by_id[article_id] for article_id in article_ids if article_id in by_id]
+
+    def _where(self, kind: str, site: Optional[str], status: Optional[str],
+               start_date: Optional[datetime.date], end_date: Optional[datetime.date]):
+        clauses = ["kind = ?"]
+        params: List = [kind]
+        if site is not None:
+            clauses.append("site = ?")
+            params.append(site)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(end_date.isoformat())
+        return ' AND '.join(clauses), params
+
+    def query(self, kind: str = 'generated', site: Optional[str] = None, status: Optional[str] = None,
+              start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None,
+              limit: Optional[int] = 50, offset: int = 0) -> List[Dict]:
+        """One page of articles matching the filters, newest first (``limit`` None for all)"""
+        where, params = self._where(kind, site, status, start_date, end_date)
+        params.extend([-1 if limit is None else limit, offset])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM articles WHERE {where} ORDER BY date DESC, id DESC LIMIT ? OFFSET ?", params
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def count(self, kind: str = 'generated', site: Optional[str] = None, status: Optional[str] = None,
+              start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None) -> int:
+        where, params = self._where(kind, site, status, start_date, end_date)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM articles WHERE {where}", params).fetchone()[0]
+
+    def find_by_slug(self, slug: str, site: Optional[str] = None) -> List[Dict]:
+        query = "SELECT * FROM articles WHERE slug = ?"
+        params: List = [slug]
+        if site is not None:
+            query += " AND site = ?"
+            params.append(site)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update_status(self, article_id: int, status: str, wp_post_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE articles SET status = ?, wp_post_id = COALESCE(?, wp_post_id), updated_at = ? WHERE id = ?",
+                (status, wp_post_id, time.time(), article_id)
+            )
+            self._conn.commit()
+
+    def delete(self, article_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+            self._conn.commit()
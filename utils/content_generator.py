@@ -1,30 +1,455 @@
 import os
-from openai import OpenAI
-from typing import Dict, List, Optional
+import asyncio
+import copy
+import json
+import random
+import time
+from openai import OpenAI, AsyncOpenAI, RateLimitError
+from typing import Dict, Iterator, List, Optional
+from utils.instrumentation import METRICS, increment, span
+from utils.rate_limiter import RateLimiter, retry_delay_from_headers
+from utils.response_cache import ResponseCache
+from utils.text_preprocessor import TextPreprocessor
+from utils.json_stream import JSONFieldStream
+
+# How the focus keyword is chosen when the caller doesn't supply one:
+#   inline   - the model picks it inside the generation call's JSON response
+#   local    - SEOOptimizer's noun-phrase extraction, no network round trip
+#   separate - a dedicated keyword-analysis completion before generating
+KEYWORD_MODES = ('inline', 'local', 'separate')
+
+# Bump whenever a prompt template changes so cached responses are not reused
+PROMPT_VERSION = 2
+
+# Completion caps for the short calls, which is also what the rate limiter
+# reserves for them instead of a full article's worth of tokens
+KEYWORD_MAX_TOKENS = 32
+IMAGE_PROMPT_MAX_TOKENS = 300
+
+class _StreamTimer:
+    """Times a streamed completion, excluding time its generator spends suspended at yields"""
 
-class ContentGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        self._start = time.perf_counter()
+        self._suspended_at = None
+        self._suspended = 0.0
+        self._first_token_recorded = False
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._start - self._suspended
+
+    def started(self) -> None:
+        # Only the successful attempt counts; rate-limit waits and 429 retries are left out
+        self._start = time.perf_counter()
+        self._suspended = 0.0
+
+    def first_token(self) -> None:
+        if not self._first_token_recorded:
+            self._first_token_recorded = True
+            METRICS.observe('openai_stream_first_token', self._elapsed(), operation='stream')
+
+    def suspend(self) -> None:
+        self._suspended_at = time.perf_counter()
+
+    def resume(self) -> None:
+        self._suspended += time.perf_counter() - self._suspended_at
+        self._suspended_at = None
+
+    def finished(self, error: bool = False) -> None:
+        METRICS.observe('openai_request', self._elapsed(), error=error, operation='stream')
+
+
+class ContentGenerator:
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: Optional[int] = 500,
+                 tokens_per_minute: Optional[int] = 30000, max_retries: int = 5,
+                 keyword_mode: str = 'inline', seo_optimizer=None, cache: Optional[ResponseCache] = None,
+                 max_source_tokens: int = 3000, base_url: Optional[str] = None):
+        if keyword_mode not in KEYWORD_MODES:
+            raise ValueError(f"keyword_mode must be one of: {', '.join(KEYWORD_MODES)}")
+
+        # base_url lets the clients talk to a local stand-in for the API
+        self.base_url = base_url
+        # Retries are ours (see _backoff), so 429s slow every caller down through the shared limiter
+        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=base_url, max_retries=0)
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024
         self.model = "gpt-4o"
+        self.keyword_mode = keyword_mode
+        self._seo_optimizer = seo_optimizer
+        self.cache = cache
+        # Source HTML is reduced to its main text and trimmed to this budget
+        self.preprocessor = TextPreprocessor(max_tokens=max_source_tokens, model=self.model)
+
+        # Async pipeline settings
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        # Completion size reserved against tokens-per-minute for calls without
+        # max_tokens (an article); corrected with the reported usage afterwards
+        self.expected_output_tokens = 2000
+        # Shared by every thread, event loop and with_options copy
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._async_loop = None
+        self._async_client = None
+        self._semaphore = None
+
+    def with_options(self, keyword_mode: Optional[str] = None) -> 'ContentGenerator':
+        """A shallow copy with its own settings, sharing clients, caches and limits with this one"""
+        if keyword_mode is not None and keyword_mode not in KEYWORD_MODES:
+            raise ValueError(f"keyword_mode must be one of: {', '.join(KEYWORD_MODES)}")
+        generator = copy.copy(self)
+        if keyword_mode is not None:
+            generator.keyword_mode = keyword_mode
+        return generator
 
     def generate_hindi_content(self, source_content: Dict, keywords: List[str] = None) -> Dict:
         """Generate Hindi content from source material"""
         try:
-            # Auto-generate focus keyword if none provided
-            if not keywords:
-                analysis_prompt = f"Analyze this content and suggest the most relevant Hindi keywords:\n{source_content['content']}"
-                keyword_response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": analysis_prompt}]
+            cache_key = self._cache_key(source_content, keywords, 'hi')
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+            source_content = self.preprocessor.prepare(source_content)
+            keywords = self._resolve_keywords(source_content, keywords, hindi=True)
+
+            response = self._create_completion(
+                'hindi',
+                messages=[{"role": "user", "content": self._hindi_prompt(source_content, keywords)}],
+                response_format={"type": "json_object"}
+            )
+
+            return self._cache_set(cache_key, response.choices[0].message.content)
+
+        except Exception as e:
+            raise Exception(f"Error generating Hindi content: {str(e)}")
+
+    def generate_content(self, source_content: Dict, keywords: List[str] = None) -> Dict:
+        """Generate unique content from source material"""
+        try:
+            cache_key = self._cache_key(source_content, keywords)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+            source_content = self.preprocessor.prepare(source_content)
+            keywords = self._resolve_keywords(source_content, keywords)
+
+            response = self._create_completion(
+                'generate',
+                messages=[{"role": "user", "content": self._content_prompt(source_content, keywords)}],
+                response_format={"type": "json_object"}
+            )
+
+            return self._cache_set(cache_key, response.choices[0].message.content)
+
+        except Exception as e:
+            raise Exception(f"Error generating content: {str(e)}")
+
+    async def agenerate_content(self, source_content: Dict, keywords: List[str] = None) -> Dict:
+        """Async variant of generate_content, sharing the concurrency and rate limits"""
+        try:
+            cache_key = self._cache_key(source_content, keywords)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+            source_content = self.preprocessor.prepare(source_content)
+            if not keywords and self.keyword_mode == 'separate':
+                keyword_response = await self._acreate_completion(
+                    messages=[{"role": "user", "content": self._keyword_prompt(source_content)}],
+                    max_tokens=KEYWORD_MAX_TOKENS
                 )
                 keywords = [keyword_response.choices[0].message.content.strip()]
+            else:
+                keywords = self._resolve_keywords(source_content, keywords)
 
-            prompt = f"""
+            response = await self._acreate_completion(
+                messages=[{"role": "user", "content": self._content_prompt(source_content, keywords)}],
+                response_format={"type": "json_object"}
+            )
+
+            return self._cache_set(cache_key, response.choices[0].message.content)
+
+        except Exception as e:
+            raise Exception(f"Error generating content: {str(e)}")
+
+    async def agenerate_batch(self, sources: List[Dict], keywords: List[str] = None) -> List:
+        """Generate content for many sources concurrently.
+
+        Results come back in the same order as ``sources``; a failed article
+        yields its exception instead of aborting the rest of the batch.
+        """
+        return await asyncio.gather(
+            *(self.agenerate_content(source, keywords) for source in sources),
+            return_exceptions=True
+        )
+
+    def stream_content(self, source_content: Dict, keywords: List[str] = None,
+                       partial_interval: float = 0.25) -> Iterator[Dict]:
+        """Stream generate_content output as it is produced.
+
+        Yields events as dicts:
+          {'type': 'token', 'text': ...}               raw model output chunk
+          {'type': 'partial', 'name': ..., 'value': ...} string field so far,
+                                                         at most every partial_interval seconds
+          {'type': 'field', 'name': ..., 'value': ...}   completed top-level JSON field
+          {'type': 'done', 'content': ...}               the full JSON string
+        """
+        try:
+            cache_key = self._cache_key(source_content, keywords)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                for name, value in json.loads(cached).items():
+                    yield {'type': 'field', 'name': name, 'value': value}
+                yield {'type': 'done', 'content': cached}
+                return
+
+            source_content = self.preprocessor.prepare(source_content)
+            keywords = self._resolve_keywords(source_content, keywords)
+
+            parser = JSONFieldStream()
+            last_partial = 0.0
+            # Timings leave out the time spent suspended at a yield (the
+            # consumer rendering or waiting), so they measure the API alone
+            timer = _StreamTimer()
+            try:
+                stream, reserved = self._create_stream(
+                    messages=[{"role": "user", "content": self._content_prompt(source_content, keywords)}],
+                    response_format={"type": "json_object"}
+                )
+                timer.started()
+
+                for chunk in stream:
+                    # With include_usage the final chunk carries only the token counts
+                    self._record_usage('stream', chunk, reserved)
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    timer.first_token()
+
+                    events = [{'type': 'token', 'text': text}]
+                    events.extend({'type': 'field', 'name': name, 'value': value} for name, value in parser.feed(text))
+                    now = time.monotonic()
+                    if now - last_partial >= partial_interval:
+                        partial = parser.partial()
+                        if partial:
+                            last_partial = now
+                            events.append({'type': 'partial', 'name': partial[0], 'value': partial[1]})
+
+                    timer.suspend()
+                    yield from events
+                    timer.resume()
+            except Exception:
+                timer.finished(error=True)
+                raise
+            timer.finished()
+
+            yield {'type': 'done', 'content': self._cache_set(cache_key, parser.text)}
+
+        except Exception as e:
+            raise Exception(f"Error generating content: {str(e)}")
+
+    def write_batch_file(self, sources: List[Dict], path: str, keywords: List[str] = None) -> Dict[str, str]:
+        """Write generate_content requests for every source to a Batch API JSONL file.
+
+        Returns a mapping of each request's custom_id (``article-<index>``) to
+        its response-cache key, for use with get_batch_results.
+        """
+        cache_keys = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Batch requests are single calls, so a separate keyword analysis
+        # call falls back to the model choosing inline; results are cached
+        # under the mode whose prompt was actually sent
+        generator = self.with_options(keyword_mode='inline') if self.keyword_mode == 'separate' else self
+
+        with open(path, 'w', encoding='utf-8') as f:
+            for index, source in enumerate(sources):
+                custom_id = f"article-{index}"
+                cache_keys[custom_id] = generator._cache_key(source, keywords)
+
+                prepared = self.preprocessor.prepare(source)
+                if keywords or generator.keyword_mode != 'local':
+                    article_keywords = keywords or []
+                else:
+                    article_keywords = self._resolve_keywords(prepared)
+
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": [{"role": "user", "content": self._content_prompt(prepared, article_keywords)}],
+                        "response_format": {"type": "json_object"}
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+        return cache_keys
+
+    def submit_batch(self, path: str, metadata: Optional[Dict] = None) -> str:
+        """Upload a JSONL batch file and start a batch job, returning its id"""
+        try:
+            with span('openai_request', operation='batch_submit'):
+                with open(path, 'rb') as f:
+                    batch_file = self.client.files.create(file=f, purpose="batch")
+
+                batch = self.client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h",
+                    metadata=metadata
+                )
+            return batch.id
+
+        except Exception as e:
+            raise Exception(f"Error submitting batch: {str(e)}")
+
+    def get_batch_status(self, batch_id: str):
+        """Return the current batch job object"""
+        try:
+            return self.client.batches.retrieve(batch_id)
+        except Exception as e:
+            raise Exception(f"Error checking batch status: {str(e)}")
+
+    def poll_batch(self, batch_id: str, interval: float = 60, timeout: Optional[float] = None):
+        """Wait for a batch job to reach a final state and return it"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            batch = self.get_batch_status(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                raise Exception(f"Batch {batch_id} still '{batch.status}' after {timeout} seconds")
+            time.sleep(interval)
+
+    def get_batch_results(self, batch, cache_keys: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+        """Download a finished batch's output and map it back by custom_id.
+
+        Each value holds the generated JSON string under ``content`` or an
+        ``error`` message. Successful responses are also stored in the
+        response cache when ``cache_keys`` from write_batch_file are given.
+        """
+        results = {}
+        try:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                for line in self.client.files.content(file_id).text.splitlines():
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    custom_id = record.get('custom_id')
+                    response = record.get('response') or {}
+                    body = response.get('body') or {}
+
+                    if record.get('error') or response.get('status_code') != 200:
+                        error = record.get('error') or body.get('error') or f"HTTP {response.get('status_code')}"
+                        results[custom_id] = {'content': None, 'error': str(error)}
+                        continue
+
+                    content = body['choices'][0]['message']['content']
+                    if cache_keys and custom_id in cache_keys:
+                        self._cache_set(cache_keys[custom_id], content)
+                    results[custom_id] = {'content': content, 'error': None}
+
+        except Exception as e:
+            raise Exception(f"Error reading batch results: {str(e)}")
+
+        # Requests the batch never got to (e.g. it expired) are reported too
+        for custom_id in (cache_keys or {}):
+            results.setdefault(custom_id, {'content': None, 'error': f"No result (batch {batch.status})"})
+
+        return results
+
+    def run_batch(self, sources: List[Dict], path: str, keywords: List[str] = None,
+                  poll_interval: float = 60, timeout: Optional[float] = None) -> List[Dict]:
+        """Write, submit and wait for a batch; results are aligned with sources"""
+        cache_keys = self.write_batch_file(sources, path, keywords)
+        batch = self.poll_batch(self.submit_batch(path), interval=poll_interval, timeout=timeout)
+        results = self.get_batch_results(batch, cache_keys)
+        return [results[f"article-{index}"] for index in range(len(sources))]
+
+    def _cache_key(self, source_content: Dict, keywords: List[str] = None, language: str = 'default') -> str:
+        return ResponseCache.make_key(
+            model=self.model,
+            prompt_version=PROMPT_VERSION,
+            title=source_content.get('title', ''),
+            content=source_content.get('content', ''),
+            keywords=list(keywords or []),
+            keyword_mode=self.keyword_mode if not keywords else None,
+            language=language
+        )
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        if not self.cache:
+            return None
+        value = self.cache.get(key)
+        increment('response_cache_hits' if value is not None else 'response_cache_misses')
+        return value
+
+    def _cache_set(self, key: str, value: str) -> str:
+        if self.cache and value:
+            self.cache.set(key, value)
+        return value
+
+    @property
+    def seo_optimizer(self):
+        if self._seo_optimizer is None:
+            from utils.seo_optimizer import SEOOptimizer
+            self._seo_optimizer = SEOOptimizer()
+        return self._seo_optimizer
+
+    def _resolve_keywords(self, source_content: Dict, keywords: List[str] = None, hindi: bool = False) -> List[str]:
+        """Pick the focus keyword according to keyword_mode.
+
+        An empty list means the model chooses the keyword itself as part of
+        the generation call (see _focus_keyword_line).
+        """
+        if keywords:
+            return keywords
+
+        if self.keyword_mode == 'local':
+            keyword = self.seo_optimizer.extract_focus_keyword(source_content['content'])
+            return [keyword] if keyword else []
+
+        if self.keyword_mode == 'separate':
+            keyword_response = self._create_completion(
+                'keyword',
+                messages=[{"role": "user", "content": self._keyword_prompt(source_content, hindi)}],
+                max_tokens=KEYWORD_MAX_TOKENS
+            )
+            return [keyword_response.choices[0].message.content.strip()]
+
+        return []
+
+    def _keyword_prompt(self, source_content: Dict, hindi: bool = False) -> str:
+        if hindi:
+            return f"Analyze this content and suggest the most relevant Hindi keywords:\n{source_content['content']}"
+        return f"Analyze this content and suggest the most relevant focus keyword:\n{source_content['content']}"
+
+    def _focus_keyword_line(self, keywords: List[str]) -> str:
+        if keywords:
+            return f"Focus Keyword: {keywords[0]}"
+        return "Focus Keyword: choose the single most relevant focus keyword for this content and return it as \"focus_keyword\""
+
+    def _focus_keyword_field(self, keywords: List[str]) -> str:
+        if keywords:
+            return ""
+        return ',\n                "focus_keyword": "the focus keyword you chose"'
+
+    def _hindi_prompt(self, source_content: Dict, keywords: List[str]) -> str:
+        return f"""
             Create a unique Hindi blog post based on this content:
             Title: {source_content['title']}
             Source Content: {source_content['content']}
-            Focus Keyword: {keywords[0]}
+            {self._focus_keyword_line(keywords)}
             
             Requirements:
             1. Write entirely in Hindi (use English for technical terms if needed)
@@ -40,38 +465,16 @@ class ContentGenerator:
                 "meta_description": "Hindi meta description with keywords",
                 "meta_keywords": "Hindi keywords",
                 "slug": "english-url-friendly-slug",
-                "estimated_keyword_density": "percentage"
+                "estimated_keyword_density": "percentage"{self._focus_keyword_field(keywords)}
             }}
             """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-
-            return response.choices[0].message.content
-
-        except Exception as e:
-            raise Exception(f"Error generating Hindi content: {str(e)}")
-
-    def generate_content(self, source_content: Dict, keywords: List[str] = None) -> Dict:
-        """Generate unique content from source material"""
-        try:
-            # Auto-generate focus keyword if none provided
-            if not keywords:
-                analysis_prompt = f"Analyze this content and suggest the most relevant focus keyword:\n{source_content['content']}"
-                keyword_response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": analysis_prompt}]
-                )
-                keywords = [keyword_response.choices[0].message.content.strip()]
-
-            prompt = f"""
+    def _content_prompt(self, source_content: Dict, keywords: List[str]) -> str:
+        return f"""
             Create an SEO-optimized blog post based on this content:
             Title: {source_content['title']}
             Source Content: {source_content['content']}
-            Focus Keyword: {keywords[0] if keywords else ''}
+            {self._focus_keyword_line(keywords)}
             
             Requirements:
             1. Title must:
@@ -124,7 +527,7 @@ class ContentGenerator:
                 "meta_description": "SEO-optimized meta description with focus keyword",
                 "keywords": "focus-keyword, related-keywords",
                 "slug": "seo-friendly-url-with-keyword",
-                "estimated_keyword_density": "percentage"
+                "estimated_keyword_density": "percentage"{self._focus_keyword_field(keywords)}
             }}
 
             Ensure the content is:
@@ -135,17 +538,6 @@ class ContentGenerator:
             5. Has image placeholders with keyword-optimized alt text
             """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-
-            return response.choices[0].message.content
-
-        except Exception as e:
-            raise Exception(f"Error generating content: {str(e)}")
-
     def generate_image_prompt(self, content: Dict) -> str:
         """Generate image prompt based on content"""
         try:
@@ -157,9 +549,8 @@ class ContentGenerator:
             Generate a creative and specific image description that would work well as a blog header image.
             """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}]
+            response = self._create_completion(
+                'image_prompt', messages=[{"role": "user", "content": prompt}], max_tokens=IMAGE_PROMPT_MAX_TOKENS
             )
 
             return response.choices[0].message.content
@@ -170,14 +561,123 @@ class ContentGenerator:
     def generate_image(self, prompt: str) -> Optional[str]:
         """Generate image using DALL-E"""
         try:
-            response = self.client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size="1024x1024",
-                n=1
-            )
+            with span('openai_request', operation='image'):
+                response = self.client.images.generate(
+                    model="dall-e-3",
+                    prompt=prompt,
+                    size="1024x1024",
+                    n=1
+                )
 
             return response.data[0].url
 
         except Exception as e:
-            raise Exception(f"Error generating image: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error generating image: {str(e)}")
+
+    def _async_resources(self):
+        """Return the async client and concurrency limit bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # asyncio primitives and httpx pools can't be shared across loops,
+            # and Streamlit starts a fresh loop for every asyncio.run()
+            self._async_loop = loop
+            self._async_client = AsyncOpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY"), base_url=self.base_url, max_retries=0
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client, self._semaphore
+
+    def _estimate_tokens(self, messages: List[Dict], max_tokens: Optional[int] = None) -> int:
+        """Tokens to reserve for a call: its prompt plus max_tokens, or a full article without a cap"""
+        prompt_tokens = sum(self.preprocessor.count_tokens(message['content']) for message in messages)
+        return prompt_tokens + (max_tokens or self.expected_output_tokens)
+
+    def _create_completion(self, operation: str, messages: List[Dict], **kwargs):
+        """Create a chat completion within the rate limits, recording its latency and token usage.
+
+        Safe to call from many threads at once (the CLI's rewrite workers do):
+        every call waits for RPM/TPM budget, and 429s are retried using the
+        rate-limit headers.
+        """
+        reserved = self._estimate_tokens(messages, kwargs.get('max_tokens'))
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(reserved)
+            try:
+                with span('openai_request', operation=operation):
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        **kwargs
+                    )
+            except RateLimitError as e:
+                self._backoff(e, attempt, reserved)
+                continue
+            self._record_usage(operation, response, reserved)
+            return response
+
+    def _create_stream(self, messages: List[Dict], **kwargs):
+        """Start a streamed chat completion within the rate limits; returns it with its reservation.
+
+        Like _create_completion, waits for RPM/TPM budget and retries 429s
+        (which arrive before the first chunk), so the UI's parallel streams
+        share the limits with every other call.
+        """
+        reserved = self._estimate_tokens(messages, kwargs.get('max_tokens'))
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(reserved)
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs
+                )
+            except RateLimitError as e:
+                self._backoff(e, attempt, reserved)
+                continue
+            return stream, reserved
+
+    def _record_usage(self, operation: str, response, reserved: Optional[int] = None) -> None:
+        """Count the call's tokens and settle its rate-limit reservation against them"""
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        increment('openai_prompt_tokens', prompt_tokens, operation=operation)
+        increment('openai_completion_tokens', completion_tokens, operation=operation)
+        if reserved is not None:
+            self.rate_limiter.reconcile(reserved, prompt_tokens + completion_tokens)
+
+    async def _acreate_completion(self, messages: List[Dict], **kwargs):
+        """Create a chat completion, backing off on 429s using the rate-limit headers"""
+        client, semaphore = self._async_resources()
+        reserved = self._estimate_tokens(messages, kwargs.get('max_tokens'))
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.aacquire(reserved)
+            try:
+                async with semaphore:
+                    with span('openai_request', operation='async'):
+                        response = await client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            **kwargs
+                        )
+                self._record_usage('async', response, reserved)
+                return response
+            except RateLimitError as e:
+                self._backoff(e, attempt, reserved)
+
+    def _backoff(self, error: RateLimitError, attempt: int, reserved: int) -> None:
+        """Pause every caller after a 429, or re-raise it once retries are used up"""
+        increment('openai_rate_limited')
+        # A rejected request used no tokens
+        self.rate_limiter.reconcile(reserved, 0)
+        if attempt >= self.max_retries:
+            raise error
+        headers = error.response.headers if getattr(error, 'response', None) is not None else None
+        delay = retry_delay_from_headers(headers, default=2 ** attempt)
+        # Jitter so the waiting calls don't all retry at the same instant
+        self.rate_limiter.pause(delay + random.uniform(0, 0.5))
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class FeedCache:
+    """Disk-backed cache of parsed feeds and their HTTP validators.
+
+    Each feed is stored as a small JSON file named after the hash of its URL,
+    holding the ``etag`` / ``modified`` validators sent by the server and the
+    parsed entries, so unchanged feeds can be served from a 304 response.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join('.cache', 'feeds')):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached record for a feed URL, if any"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Guard against hash collisions and hand-edited files
+        if record.get('url') != url:
+            return None
+        return record
+
+    def set(self, url: str, entries: List[Dict], etag: Optional[str] = None, modified: Optional[str] = None) -> None:
+        """Store parsed entries and validators for a feed URL"""
+        record = {
+            'url': url,
+            'etag': etag,
+            'modified': modified,
+            'entries': entries,
+            'updated_at': time.time()
+        }
+        path = self._path(url)
+        with self._lock:
+            # Write atomically so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(record, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def remove(self, url: str) -> None:
+        """Drop a feed from the cache"""
+        try:
+            os.remove(self._path(url))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        """Drop every cached feed"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -1,12 +1,25 @@
 import feedparser
-from typing import List, Dict
+from typing import List, Dict, Optional
 import datetime
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from urllib.parse import urlparse
+from utils.feed_cache import FeedCache
+from utils.instrumentation import increment, span
+
+# sy:updatePeriod values, in seconds
+UPDATE_PERIODS = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400,
+    'monthly': 30 * 86400,
+    'yearly': 365 * 86400
+}
 
 class FeedParser:
-    def __init__(self):
+    def __init__(self, cache: Optional[FeedCache] = None):
         self.feeds = {}
+        self.cache = cache
 
     def is_valid_url(self, url: str) -> bool:
         """Validate if the provided URL is well-formed"""
@@ -18,12 +31,51 @@ class FeedParser:
 
     def parse_feed(self, url: str) -> List[Dict]:
         """Parse RSS feed and return list of entries"""
+        return self.fetch_feed(url)['entries']
+
+    @staticmethod
+    def polling_hint(feed_info: Dict) -> Optional[float]:
+        """Shortest polling interval in seconds the feed asks for via ttl or sy:updatePeriod"""
+        hints = []
+        try:
+            if feed_info.get('ttl'):
+                hints.append(float(feed_info['ttl']) * 60)
+        except (TypeError, ValueError):
+            pass
+        period = UPDATE_PERIODS.get(str(feed_info.get('sy_updateperiod', '')).strip().lower())
+        if period:
+            try:
+                frequency = max(1, int(feed_info.get('sy_updatefrequency') or 1))
+            except (TypeError, ValueError):
+                frequency = 1
+            hints.append(period / frequency)
+        return max(hints) if hints else None
+
+    def fetch_feed(self, url: str) -> Dict:
+        """Parse RSS feed, also reporting whether it changed and its polling hint.
+
+        Returns ``entries``, ``changed`` (False when the server answered 304
+        Not Modified) and ``min_interval`` (seconds from ttl/sy:updatePeriod,
+        None if the feed gives none or wasn't re-sent).
+        """
         if not self.is_valid_url(url):
             raise Exception("Invalid URL format. Please provide a valid RSS feed URL.")
 
         try:
-            feed = feedparser.parse(url)
-            
+            # Send conditional request headers when we have cached validators
+            cached = self.cache.get(url) if self.cache else None
+            with span('feed_fetch'):
+                feed = feedparser.parse(
+                    url,
+                    etag=cached.get('etag') if cached else None,
+                    modified=cached.get('modified') if cached else None
+                )
+
+            # Feed unchanged since the last fetch, reuse the parsed entries
+            if cached and getattr(feed, 'status', None) == 304:
+                increment('feed_not_modified')
+                return {'entries': cached['entries'], 'changed': False, 'min_interval': None}
+
             # Check content type and version
             if hasattr(feed, 'headers'):
                 content_type = feed.headers.get('content-type', '').lower()
@@ -56,6 +108,7 @@ class FeedParser:
                     content = entry.description
 
                 parsed_entry = {
+                    'guid': entry.get('id') or entry.get('link', ''),
                     'title': entry.get('title', ''),
                     'link': entry.get('link', ''),
                     'published': entry.get('published', datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
@@ -65,11 +118,48 @@ class FeedParser:
                 }
                 entries.append(parsed_entry)
 
-            return entries
+            increment('feed_entries', len(entries))
+            if self.cache:
+                self.cache.set(url, entries, etag=feed.get('etag'), modified=feed.get('modified'))
+
+            return {'entries': entries, 'changed': True, 'min_interval': self.polling_hint(feed.feed)}
 
         except Exception as e:
             raise Exception(f"Error parsing feed: {str(e)}")
 
+    def parse_feeds(self, urls: List[str], max_workers: int = 8, timeout: Optional[float] = 60) -> Dict[str, Dict]:
+        """Parse several RSS feeds concurrently.
+
+        Returns a dict keyed by feed URL with ``entries`` and ``error`` for each
+        feed, so a single failing feed does not abort the whole batch. ``timeout``
+        bounds the wall time of the batch; feeds still pending after it are
+        reported as timed out.
+        """
+        # Keep order stable and skip duplicates / blank lines
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        results = {url: {'entries': [], 'error': None} for url in unique_urls}
+        if not unique_urls:
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_urls))))
+        futures = {executor.submit(self.parse_feed, url): url for url in unique_urls}
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                url = futures[future]
+                try:
+                    results[url]['entries'] = future.result()
+                except Exception as e:
+                    results[url]['error'] = str(e)
+        except FuturesTimeoutError:
+            for future, url in futures.items():
+                if not future.done():
+                    results[url]['error'] = f"Timed out after {timeout} seconds"
+        finally:
+            # Don't block on stragglers; they finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
     def add_feed(self, name: str, url: str) -> None:
         """Add feed to managed feeds"""
         if not name or not url:
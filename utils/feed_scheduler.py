@@ -0,0 +1,259 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from utils.feed_parser import FeedParser
+
+logger = logging.getLogger(__name__)
+
+
+class FeedScheduler:
+    """Polls feeds in the background on per-feed adaptive intervals.
+
+    Each feed's interval shrinks when a poll finds new entries and grows when
+    it doesn't, within ``min_interval``..``max_interval``, and never drops
+    below the feed's own ttl / sy:updatePeriod hint. Failing feeds back off
+    exponentially. Entries are deduplicated across feeds by GUID (or link) and
+    collected in a pool that ``take_new`` drains, so each entry is handed out
+    once.
+    """
+
+    def __init__(self, feed_parser: FeedParser, path: str = os.path.join('.cache', 'feed_scheduler.sqlite3'),
+                 min_interval: float = 300, max_interval: float = 6 * 3600, default_interval: float = 1800,
+                 max_workers: int = 8, on_entries: Optional[Callable[[str, List[Dict]], None]] = None):
+        self.feed_parser = feed_parser
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.max_workers = max_workers
+        self.on_entries = on_entries
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                site TEXT,
+                interval REAL NOT NULL,
+                hint REAL,
+                next_poll_at REAL NOT NULL,
+                last_polled_at REAL,
+                last_new_at REAL,
+                failures INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                entry_key TEXT PRIMARY KEY,
+                site TEXT,
+                feed_url TEXT NOT NULL,
+                entry TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                taken INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_feeds_next_poll ON feeds (next_poll_at);
+            CREATE INDEX IF NOT EXISTS idx_entries_pending ON entries (site, taken, first_seen);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def entry_key(entry: Dict) -> str:
+        identity = entry.get('guid') or entry.get('link') or entry.get('title', '')
+        return hashlib.sha1(identity.strip().encode('utf-8')).hexdigest()
+
+    def sync_sites(self, site_config: Dict[str, Dict]) -> None:
+        """Schedule the given sites' feed_urls, dropping feeds those sites no longer list.
+
+        Only the sites passed in are touched: the database is shared by every
+        session and process, so feeds of other sites are left scheduled.
+        """
+        wanted = {}
+        for site, config in site_config.items():
+            for url in config.get('feed_urls', []):
+                if url and self.feed_parser.is_valid_url(url):
+                    wanted.setdefault(url, site)
+
+        now = time.time()
+        with self._lock:
+            known = {row['url'] for row in self._conn.execute("SELECT url FROM feeds")}
+            for site in site_config:
+                for row in self._conn.execute("SELECT url FROM feeds WHERE site = ?", (site,)).fetchall():
+                    if row['url'] not in wanted:
+                        self._conn.execute("DELETE FROM feeds WHERE url = ?", (row['url'],))
+            for url, site in wanted.items():
+                if url in known:
+                    self._conn.execute("UPDATE feeds SET site = ? WHERE url = ?", (site, url))
+                else:
+                    self._conn.execute(
+                        "INSERT INTO feeds (url, site, interval, next_poll_at) VALUES (?, ?, ?, ?)",
+                        (url, site, self.default_interval, now)
+                    )
+            self._conn.commit()
+        self._wake.set()
+
+    def remove_sites(self, sites: List[str]) -> None:
+        """Stop polling the feeds of ``sites``; other sites' feeds keep being polled"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM feeds WHERE site = ?", [(site,) for site in sites])
+            self._conn.commit()
+
+    def scheduled_sites(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT site FROM feeds ORDER BY site")]
+
+    def _next_interval(self, feed: sqlite3.Row, found_new: bool, hint: Optional[float]) -> float:
+        interval = feed['interval'] / 2 if found_new else feed['interval'] * 1.5
+        interval = max(self.min_interval, min(self.max_interval, interval))
+        if hint:
+            # The publisher says the feed won't change more often than this
+            interval = max(interval, hint)
+        return interval
+
+    def _record_entries(self, feed: sqlite3.Row, entries: List[Dict]) -> List[Dict]:
+        """Add unseen entries to the pool and return them"""
+        new_entries = []
+        now = time.time()
+        with self._lock:
+            for entry in entries:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO entries (entry_key, site, feed_url, entry, first_seen) VALUES (?, ?, ?, ?, ?)",
+                    (self.entry_key(entry), feed['site'], feed['url'], json.dumps(entry, ensure_ascii=False), now)
+                )
+                if cursor.rowcount:
+                    new_entries.append(entry)
+            self._conn.commit()
+        return new_entries
+
+    def poll_feed(self, feed: sqlite3.Row) -> List[Dict]:
+        """Fetch one feed, reschedule it and return its new entries"""
+        now = time.time()
+        try:
+            result = self.feed_parser.fetch_feed(feed['url'])
+        except Exception as e:
+            failures = feed['failures'] + 1
+            delay = min(self.max_interval, feed['interval'] * 2 ** failures)
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE feeds SET failures = ?, last_error = ?, last_polled_at = ?, next_poll_at = ? WHERE url = ?",
+                    (failures, str(e), now, now + delay, feed['url'])
+                )
+                self._conn.commit()
+            return []
+
+        # Record entries even after a 304: the FeedCache validators are shared with
+        # every other fetch of the feed, so entries that arrived since this
+        # scheduler last polled may only ever come back as cached entries
+        new_entries = self._record_entries(feed, result['entries'])
+        hint = result['min_interval'] if result['min_interval'] is not None else feed['hint']
+        interval = self._next_interval(feed, bool(new_entries), hint)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE feeds SET interval = ?, hint = ?, failures = 0, last_error = NULL, last_polled_at = ?, "
+                "last_new_at = COALESCE(?, last_new_at), next_poll_at = ? WHERE url = ?",
+                (interval, hint, now, now if new_entries else None, now + interval, feed['url'])
+            )
+            self._conn.commit()
+
+        if new_entries and self.on_entries:
+            self.on_entries(feed['url'], new_entries)
+        return new_entries
+
+    def poll_due(self) -> Dict[str, List[Dict]]:
+        """Poll every feed whose time has come; returns feed URL -> new entries"""
+        with self._lock:
+            due = self._conn.execute(
+                "SELECT * FROM feeds WHERE next_poll_at <= ? ORDER BY next_poll_at", (time.time(),)
+            ).fetchall()
+        if not due:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(due)))) as executor:
+            return dict(zip((feed['url'] for feed in due), executor.map(self.poll_feed, due)))
+
+    def seconds_until_next_poll(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_poll_at) FROM feeds").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def take_new(self, site: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Hand out pooled entries not taken before, newest first"""
+        query = "SELECT entry_key, entry FROM entries WHERE taken = 0"
+        params: List = []
+        if site is not None:
+            query += " AND site = ?"
+            params.append(site)
+        query += " ORDER BY first_seen DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            self._conn.executemany(
+                "UPDATE entries SET taken = 1 WHERE entry_key = ?", [(row['entry_key'],) for row in rows]
+            )
+            self._conn.commit()
+        return [json.loads(row['entry']) for row in rows]
+
+    def pending_count(self, site: Optional[str] = None) -> int:
+        with self._lock:
+            if site is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM entries WHERE taken = 0").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM entries WHERE taken = 0 AND site = ?", (site,)
+                ).fetchone()
+        return row[0]
+
+    def feed_status(self) -> List[Dict]:
+        """Scheduling state of every feed, for display"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute("SELECT * FROM feeds ORDER BY next_poll_at")]
+
+    def prune(self, older_than: float = 30 * 86400) -> None:
+        """Forget entries first seen more than ``older_than`` seconds ago"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE first_seen < ?", (time.time() - older_than,))
+            self._conn.commit()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_due()
+            except Exception as e:
+                logger.exception("Feed scheduler error: %s", e)
+            wait = self.seconds_until_next_poll()
+            self._wake.clear()
+            self._wake.wait(self.min_interval if wait is None else max(1.0, wait))
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start polling in a daemon thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='feed-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,183 @@
+"""Timers and counters for the fetch -> rewrite -> score -> publish pipeline.
+
+Wrap external calls and hot functions in ``span(name, **labels)`` (or
+decorate them with ``timed(name)``) and count things with
+``increment(name, value, **labels)``. Totals are kept in memory per
+process and can be read back as a JSON-friendly ``snapshot()`` or as
+Prometheus text with ``to_prometheus()``.
+
+Set METRICS_ENABLED=0 to turn recording off; spans then return a shared
+no-op object and nothing is locked or timed.
+"""
+import functools
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+_METRIC_NAME = re.compile(r'[^a-zA-Z0-9_]')
+
+
+class _NullSpan:
+    """Stands in for a span while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, metrics: 'Metrics', name: str, labels: Dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A consumer abandoning a generator (GeneratorExit) is not a failure
+        failed = exc_type is not None and issubclass(exc_type, Exception)
+        self.metrics.observe(self.name, time.perf_counter() - self.started, error=failed, **self.labels)
+        return False
+
+
+class Metrics:
+    """Thread-safe registry of timers (count, errors, total and max seconds) and counters"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no', 'off')
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._timers: Dict[tuple, List[float]] = {}
+        self._counters: Dict[tuple, float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> tuple:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def span(self, name: str, **labels):
+        """Time the enclosed block; exceptions are counted as errors and re-raised"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def observe(self, name: str, seconds: float, error: bool = False, **labels) -> None:
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = [0, 0, 0.0, 0.0]
+            timer[0] += 1
+            timer[1] += 1 if error else 0
+            timer[2] += seconds
+            timer[3] = max(timer[3], seconds)
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        if not self.enabled or not value:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def timed(self, name: str, **labels) -> Callable:
+        """Decorator form of span()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+            self.started = time.time()
+
+    def snapshot(self) -> Dict:
+        """Current totals as plain dicts, ready for json.dumps or a dataframe"""
+        with self._lock:
+            timers = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': count,
+                    'errors': errors,
+                    'total_seconds': round(total, 6),
+                    'avg_seconds': round(total / count, 6) if count else 0.0,
+                    'max_seconds': round(longest, 6),
+                }
+                for (name, labels), (count, errors, total, longest) in sorted(self._timers.items())
+            ]
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {'enabled': self.enabled, 'since': self.started, 'timers': timers, 'counters': counters}
+
+    def to_prometheus(self, prefix: str = 'pipeline') -> str:
+        """Current totals in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+
+        def metric(name: str) -> str:
+            return _METRIC_NAME.sub('_', f"{prefix}_{name}" if prefix else name)
+
+        def declare(name: str, kind: str) -> None:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        def labelled(name: str, labels: Dict) -> str:
+            if not labels:
+                return name
+            pairs = ','.join(
+                '{}="{}"'.format(_METRIC_NAME.sub('_', key),
+                                 value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for key, value in labels.items()
+            )
+            return f"{name}{{{pairs}}}"
+
+        for timer in snapshot['timers']:
+            base = metric(f"{timer['name']}_seconds")
+            declare(base, 'summary')
+            lines.append(f"{labelled(base + '_count', timer['labels'])} {timer['count']}")
+            lines.append(f"{labelled(base + '_sum', timer['labels'])} {timer['total_seconds']}")
+        for timer in snapshot['timers']:
+            name = metric(f"{timer['name']}_seconds_max")
+            declare(name, 'gauge')
+            lines.append(f"{labelled(name, timer['labels'])} {timer['max_seconds']}")
+        for timer in snapshot['timers']:
+            name = metric(f"{timer['name']}_errors_total")
+            declare(name, 'counter')
+            lines.append(f"{labelled(name, timer['labels'])} {timer['errors']}")
+        for counter in snapshot['counters']:
+            name = metric(f"{counter['name']}_total")
+            declare(name, 'counter')
+            lines.append(f"{labelled(name, counter['labels'])} {counter['value']}")
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+# Process-wide registry used by the utils modules, main.py and cli.py
+METRICS = Metrics()
+span = METRICS.span
+increment = METRICS.increment
+timed = METRICS.timed
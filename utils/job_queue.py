@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+JOB_STATES = ('queued', 'running', 'succeeded', 'failed')
+
+
+class JobQueue:
+    """SQLite-backed queue of pipeline jobs (fetch, rewrite, score, publish).
+
+    Workers ``claim`` a job, which leases it to them for ``lease_seconds``.
+    Jobs whose worker died (lease expired while still running) are handed out
+    again, so a restart resumes in-flight work. Failed jobs are retried with
+    exponential backoff until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, path: str = os.path.join('.cache', 'jobs.sqlite3'), lease_seconds: float = 300,
+                 retry_base_delay: float = 30, retry_max_delay: float = 3600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._conn = None
+        self._pid = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                next_run_at REAL NOT NULL,
+                lease_expires REAL,
+                worker TEXT,
+                result TEXT,
+                error TEXT,
+                parent_id INTEGER,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_next_run ON jobs (status, next_run_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_parent ON jobs (parent_id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def submit(self, kind: str, payload: Dict, max_attempts: int = 3, parent_id: Optional[int] = None,
+               delay: float = 0) -> int:
+        """Add a job and return its id"""
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO jobs (kind, payload, max_attempts, next_run_at, parent_id, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload, ensure_ascii=False, default=str), max_attempts,
+             now + delay, parent_id, now, now)
+        )
+        return cursor.lastrowid
+
+    def claim(self, worker: str, kinds: Optional[Sequence[str]] = None) -> Optional[Dict]:
+        """Lease the next runnable job to ``worker``, or return None if there is none"""
+        conn = self._connection()
+        now = time.time()
+        kind_filter = ''
+        params: List = [now, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose worker vanished on their last allowed attempt are given up on
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker lost while running the job', updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE ((status = 'queued' AND next_run_at <= ?) "
+                "OR (status = 'running' AND lease_expires < ?))" + kind_filter +
+                " ORDER BY next_run_at, id LIMIT 1",
+                params
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row['id'])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return self.get(row['id'])
+
+    @staticmethod
+    def _owner_filter(worker: Optional[str]) -> Tuple[str, tuple]:
+        # With a worker, only the current lease holder may change the job
+        if worker is None:
+            return '', ()
+        return " AND status = 'running' AND worker = ?", (worker,)
+
+    def heartbeat(self, job_id: int, worker: Optional[str] = None) -> bool:
+        """Extend the lease of a long-running job; False if the lease was lost"""
+        now = time.time()
+        owner, params = self._owner_filter(worker)
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ?" + (owner or " AND status = 'running'"),
+            (now + self.lease_seconds, now, job_id) + params
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: int, result: Optional[Dict] = None, worker: Optional[str] = None) -> bool:
+        """Mark a job as succeeded and store its result; False if ``worker`` no longer holds it"""
+        owner, params = self._owner_filter(worker)
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ?" + owner,
+            (json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+             time.time(), job_id) + params
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: int, error: str, retry: bool = True, worker: Optional[str] = None) -> str:
+        """Record a failure; requeue with backoff while attempts remain. Returns the new status.
+
+        With ``worker``, a worker whose lease has passed to another leaves the
+        job alone and gets its current status back.
+        """
+        conn = self._connection()
+        row = conn.execute("SELECT status, worker, attempts, max_attempts FROM jobs WHERE id = ?",
+                           (job_id,)).fetchone()
+        if row is None:
+            raise Exception(f"Job {job_id} not found")
+        if worker is not None and (row['status'] != 'running' or row['worker'] != worker):
+            return row['status']
+
+        now = time.time()
+        if retry and row['attempts'] < row['max_attempts']:
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (row['attempts'] - 1))
+            status, next_run_at = 'queued', now + delay
+        else:
+            status, next_run_at = 'failed', now
+
+        owner, params = self._owner_filter(worker)
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, next_run_at = ?, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ?" + owner,
+            (status, error, next_run_at, now, job_id) + params
+        )
+        if not cursor.rowcount:
+            # Claimed by another worker between the read and the update
+            return self.get(job_id)['status']
+        return status
+
+    def defer(self, job_id: int, delay: float, worker: Optional[str] = None) -> bool:
+        """Requeue a running job to run again after ``delay`` without using up an attempt"""
+        now = time.time()
+        owner, params = self._owner_filter(worker)
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), next_run_at = ?, "
+            "lease_expires = NULL, updated_at = ? WHERE id = ?" + owner,
+            (now + delay, now, job_id) + params
+        )
+        return cursor.rowcount > 0
+
+    def retry(self, job_id: int) -> None:
+        """Put a failed job back in the queue with a fresh set of attempts"""
+        now = time.time()
+        self._connection().execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, next_run_at = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'failed'",
+            (now, now, job_id)
+        )
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100, offset: int = 0,
+                  kind: Optional[str] = None) -> List[Dict]:
+        """Return the most recently updated jobs, optionally filtered by status and kind"""
+        query = "SELECT * FROM jobs"
+        conditions = []
+        params: List = []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if kind:
+            conditions.append("kind = ?")
+            params.append(kind)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY updated_at DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        return [self._to_dict(row) for row in self._connection().execute(query, params)]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        counts = {state: 0 for state in JOB_STATES}
+        for row in self._connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row['status']] = row['n']
+        return counts
@@ -0,0 +1,356 @@
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from utils.job_queue import JobQueue
+from utils.site_config import SITES_CONFIG_ENV, env_key, resolve_credentials
+
+DEFAULT_PID_FILE = os.path.join('.cache', 'job_worker.pid')
+
+# How often a submitted OpenAI batch is checked for completion
+BATCH_POLL_SECONDS = 600
+
+
+class JobNotReady(Exception):
+    """Raised by a handler whose job should run again later, without counting as a failed attempt"""
+
+    def __init__(self, message: str, delay: float):
+        super().__init__(message)
+        self.delay = delay
+
+
+class JobHandlers:
+    """Runs each job kind with lazily created, per-process services.
+
+    A job's result is stored on the job; follow-up jobs (fetch -> rewrite ->
+    score -> publish) are submitted with the finished job as their parent.
+    """
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+        self._feed_parser = None
+        self._content_generator = None
+        self._seo_optimizer = None
+        self._wordpress_clients = None
+        self._near_duplicates = None
+        self._article_store = None
+
+    @property
+    def feed_parser(self):
+        if self._feed_parser is None:
+            from utils.feed_cache import FeedCache
+            from utils.feed_parser import FeedParser
+            self._feed_parser = FeedParser(cache=FeedCache())
+        return self._feed_parser
+
+    @property
+    def seo_optimizer(self):
+        if self._seo_optimizer is None:
+            from utils.seo_optimizer import SEOOptimizer
+            self._seo_optimizer = SEOOptimizer()
+        return self._seo_optimizer
+
+    @property
+    def content_generator(self):
+        if self._content_generator is None:
+            from utils.content_generator import ContentGenerator
+            from utils.response_cache import ResponseCache
+            self._content_generator = ContentGenerator(seo_optimizer=self.seo_optimizer, cache=ResponseCache())
+        return self._content_generator
+
+    @property
+    def article_store(self):
+        if self._article_store is None:
+            from utils.article_store import ArticleStore
+            self._article_store = ArticleStore()
+        return self._article_store
+
+    @property
+    def near_duplicates(self):
+        if self._near_duplicates is None:
+            from utils.near_duplicates import NearDuplicateIndex
+            self._near_duplicates = NearDuplicateIndex()
+        return self._near_duplicates
+
+    @property
+    def wordpress_clients(self):
+        if self._wordpress_clients is None:
+            from utils.media_index import MediaIndex
+            from utils.post_ledger import PostLedger
+            from utils.wordpress_registry import WordPressClientRegistry
+            self._wordpress_clients = WordPressClientRegistry(media_index=MediaIndex(), ledger=PostLedger())
+        return self._wordpress_clients
+
+    def handler_for(self, kind: str) -> Callable[[Dict], Dict]:
+        handler = getattr(self, f"handle_{kind}", None)
+        if handler is None:
+            raise Exception(f"Unknown job kind: {kind}")
+        return handler
+
+    def handle_fetch(self, job: Dict) -> Dict:
+        payload = job['payload']
+        results = self.feed_parser.parse_feeds(payload['feed_urls'])
+
+        entries = []
+        errors = {}
+        for feed_url, result in results.items():
+            if result['error']:
+                errors[feed_url] = result['error']
+            entries.extend(result['entries'])
+        if errors and not entries:
+            raise Exception(f"Every feed failed: {errors}")
+
+        # Drop copies of stories already fetched or generated before paying for a rewrite
+        entries, duplicates = self.near_duplicates.deduplicate(entries, site=payload.get('site') or '')
+        rewrite_jobs = []
+        for entry in entries[:payload.get('limit', len(entries))]:
+            rewrite_jobs.append(self.queue.submit('rewrite', {
+                'source': {'title': entry['title'], 'content': entry['content'], 'link': entry['link'],
+                           'guid': entry.get('guid', '')},
+                'language': payload.get('language', 'English'),
+                'site': payload.get('site'),
+                'wp_url': payload.get('wp_url'),
+                'publish': payload.get('publish', False),
+                'post_status': payload.get('post_status', 'draft')
+            }, parent_id=job['id']))
+
+        return {'entries': len(entries), 'duplicates': len(duplicates), 'rewrite_jobs': rewrite_jobs,
+                'feed_errors': errors}
+
+    def handle_rewrite(self, job: Dict) -> Dict:
+        payload = job['payload']
+        source = payload['source']
+        if payload.get('language') == 'Hindi':
+            generated = self.content_generator.generate_hindi_content(source)
+        else:
+            generated = self.content_generator.generate_content(source)
+        article = json.loads(generated) if isinstance(generated, str) else generated
+        article['source_link'] = source.get('link', '')
+        self.near_duplicates.mark_generated(source, payload.get('site') or '')
+        # Stored like articles generated in the UI, so they show up there too
+        article_id = self.article_store.add(
+            dict(article, word_count=len(article.get('content', '').split())), site=payload.get('site') or ''
+        )
+
+        score_job = self.queue.submit(
+            'score', dict(payload, article=article, article_id=article_id, source=None), parent_id=job['id']
+        )
+        return {'title': article.get('title', ''), 'article_id': article_id, 'score_job': score_job}
+
+    def handle_score(self, job: Dict) -> Dict:
+        payload = job['payload']
+        article = payload['article']
+        keyword = self.seo_optimizer.article_focus_keyword(article)
+        metrics = self.seo_optimizer.analyze_content(
+            article, [keyword] if keyword else None, language=payload.get('language')
+        )
+
+        result = {'title': article.get('title', ''), 'metrics': metrics}
+        if payload.get('publish'):
+            result['publish_job'] = self.queue.submit('publish', payload, parent_id=job['id'])
+        return result
+
+    def handle_batch(self, job: Dict) -> Dict:
+        """Import an overnight OpenAI batch into the article store once it has finished"""
+        payload = job['payload']
+        batch = self.content_generator.get_batch_status(payload['batch_id'])
+        if batch.status not in ("completed", "expired", "cancelled", "failed"):
+            raise JobNotReady(f"Batch {payload['batch_id']} is {batch.status}", BATCH_POLL_SECONDS)
+
+        results = self.content_generator.get_batch_results(batch, payload['cache_keys'])
+        article_ids = []
+        errors = {}
+        for index, title in enumerate(payload['titles']):
+            result = results[f"article-{index}"]
+            if result['error']:
+                errors[title] = result['error']
+                continue
+            try:
+                article = json.loads(result['content'])
+                article_ids.append(self.article_store.add(
+                    dict(article, word_count=len(article.get('content', '').split())), site=payload.get('site') or ''
+                ))
+            except (ValueError, TypeError) as e:
+                errors[title] = f"Invalid response: {str(e)}"
+        return {'batch_status': batch.status, 'imported': len(article_ids), 'article_ids': article_ids,
+                'errors': errors}
+
+    def handle_publish(self, job: Dict) -> Dict:
+        payload = job['payload']
+        site = payload.get('site') or ''
+        # Credentials never go into the queue; resolve them from config or the environment
+        credentials = resolve_credentials(site, payload.get('wp_url') or '')
+        if credentials is None:
+            raise Exception(
+                f"No WordPress credentials for site '{site}'. Set WP_USERNAME_{env_key(site)} and "
+                f"WP_PASSWORD_{env_key(site)}, or list the site in the file named by ${SITES_CONFIG_ENV}."
+            )
+        api = self.wordpress_clients.get_for_config(credentials, verify=True)
+        response = api.create_post(payload['article'], status=payload.get('post_status', 'draft'))
+        if payload.get('article_id'):
+            self.article_store.update_status(payload['article_id'], 'posted', response.get('id'))
+        return {'post_id': response.get('id'), 'link': response.get('link')}
+
+
+def run_worker(queue_path: str, poll_interval: float = 2.0, max_jobs: Optional[int] = None) -> None:
+    """Claim and run jobs until interrupted (or until max_jobs have run)"""
+    queue = JobQueue(queue_path)
+    handlers = JobHandlers(queue)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl+C reaches the whole process group; let the pool stop us via SIGTERM
+    # so the current job finishes instead of being interrupted halfway
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    processed = 0
+    while not stopping and (max_jobs is None or processed < max_jobs):
+        job = queue.claim(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        # Keep the lease alive while the handler runs, so a slow rewrite or
+        # publish isn't claimed (and run a second time) by another worker
+        done = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(queue, job['id'], worker_id, done), daemon=True)
+        beat.start()
+        try:
+            result = handlers.handler_for(job['kind'])(job)
+            done.set()
+            beat.join()
+            queue.complete(job['id'], result, worker=worker_id)
+        except JobNotReady as e:
+            done.set()
+            beat.join()
+            queue.defer(job['id'], e.delay, worker=worker_id)
+        except Exception as e:
+            done.set()
+            beat.join()
+            queue.fail(job['id'], str(e), worker=worker_id)
+        processed += 1
+
+
+def _heartbeat(queue: JobQueue, job_id: int, worker: str, done: threading.Event) -> None:
+    # Its own connection, so it never interleaves with the handler's statements
+    beats = JobQueue(queue.path, lease_seconds=queue.lease_seconds)
+    while not done.wait(queue.lease_seconds / 3):
+        if not beats.heartbeat(job_id, worker):
+            return
+
+
+class WorkerPool:
+    """A set of worker processes sharing one job queue"""
+
+    def __init__(self, queue_path: str = os.path.join('.cache', 'jobs.sqlite3'), processes: int = 4,
+                 poll_interval: float = 2.0):
+        self.queue_path = queue_path
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self._workers = []
+
+    def start(self) -> None:
+        # Make sure the schema exists before the workers race to create it
+        JobQueue(self.queue_path)
+        for _ in range(self.processes):
+            process = multiprocessing.Process(target=run_worker, args=(self.queue_path, self.poll_interval))
+            process.start()
+            self._workers.append(process)
+
+    def stop(self, timeout: float = 30) -> None:
+        for process in self._workers:
+            if process.is_alive():
+                process.terminate()
+        for process in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                # Its job's lease expires and another worker picks it up
+                process.kill()
+                process.join()
+        self._workers = []
+
+    def join(self) -> None:
+        for process in self._workers:
+            process.join()
+
+
+def is_worker_running(pid_file: str = DEFAULT_PID_FILE) -> bool:
+    """Check whether the background worker recorded in pid_file is alive"""
+    try:
+        with open(pid_file) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def ensure_worker_running(processes: int = 4, pid_file: str = DEFAULT_PID_FILE) -> bool:
+    """Start a detached worker pool unless one is already running.
+
+    The pool runs as its own process so it survives Streamlit reruns and
+    closed browser tabs. Returns True if a new pool was started.
+    """
+    if is_worker_running(pid_file):
+        return False
+
+    directory = os.path.dirname(pid_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'utils.job_worker', '--workers', str(processes), '--pid-file', pid_file],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    with open(pid_file, 'w') as f:
+        f.write(str(process.pid))
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background workers for the bulk generation job queue")
+    parser.add_argument('--workers', type=int, default=4, help="number of worker processes")
+    parser.add_argument('--queue', default=os.path.join('.cache', 'jobs.sqlite3'), help="job queue database path")
+    parser.add_argument('--poll-interval', type=float, default=2.0, help="seconds between polls when idle")
+    parser.add_argument('--pid-file', default=DEFAULT_PID_FILE, help="where to record this process's pid")
+    args = parser.parse_args()
+
+    pid_directory = os.path.dirname(args.pid_file)
+    if pid_directory:
+        os.makedirs(pid_directory, exist_ok=True)
+    with open(args.pid_file, 'w') as f:
+        f.write(str(os.getpid()))
+
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    pool = WorkerPool(args.queue, processes=args.workers, poll_interval=args.poll_interval)
+    signal.signal(signal.SIGTERM, interrupt)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        pool.stop()
+    finally:
+        if os.path.exists(args.pid_file):
+            os.remove(args.pid_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_INCOMPLETE_UNICODE_ESCAPE = re.compile(r'\\u[0-9a-fA-F]{0,3}$')
+
+
+class JSONFieldStream:
+    """Incrementally parse a streamed JSON object into its top-level fields.
+
+    Feed it chunks of model output as they arrive; ``feed`` returns every
+    top-level ``(name, value)`` pair that has been fully received so far, and
+    ``partial`` exposes the string field that is still being written.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._value_start = None
+        self._current_key = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the fields it completed"""
+        self.text += chunk
+        completed = []
+        text = self.text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._key_start is not None:
+                            self._current_key = json.loads(text[self._key_start:self._pos + 1])
+                            self._key_start = None
+                        elif self._value_start is not None:
+                            completed.append(self._complete(text[self._value_start:self._pos + 1]))
+
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._current_key is None:
+                        self._key_start = self._pos
+                    elif self._value_start is None:
+                        self._value_start = self._pos
+
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 2 and self._current_key is not None and self._value_start is None:
+                    self._value_start = self._pos
+
+            elif char in '}]':
+                if self._depth == 1 and self._value_start is not None:
+                    # A number / true / false / null ended by the closing brace
+                    completed.append(self._complete(text[self._value_start:self._pos].strip()))
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    completed.append(self._complete(text[self._value_start:self._pos + 1]))
+
+            elif self._depth == 1:
+                if char == ',' and self._value_start is not None:
+                    completed.append(self._complete(text[self._value_start:self._pos].strip()))
+                elif (self._current_key is not None and self._value_start is None
+                      and char not in ' \t\r\n:,'):
+                    self._value_start = self._pos
+
+            self._pos += 1
+
+        return completed
+
+    def _complete(self, raw_value: str) -> Tuple[str, Any]:
+        try:
+            value = json.loads(raw_value)
+        except ValueError:
+            value = raw_value
+        field = (self._current_key, value)
+        self._current_key = None
+        self._value_start = None
+        return field
+
+    def partial(self) -> Optional[Tuple[str, str]]:
+        """Return the name and decoded text so far of the string field being streamed"""
+        if not (self._in_string and self._depth == 1 and self._value_start is not None):
+            return None
+
+        raw = _INCOMPLETE_UNICODE_ESCAPE.sub('', self.text[self._value_start + 1:])
+        # An odd number of trailing backslashes means an escape was cut in half
+        if (len(raw) - len(raw.rstrip('\\'))) % 2:
+            raw = raw[:-1]
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            value = raw
+        return self._current_key, value
@@ -0,0 +1,103 @@
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# \w alone drops Devanagari vowel signs and viramas (they are combining
+# marks, not alphanumerics), which would split every Hindi word apart
+WORD_TOKEN_PATTERN = r'[\w\u0900-\u0963\u0966-\u097F\u0300-\u036F]+'
+_WORD_TOKEN = re.compile(WORD_TOKEN_PATTERN)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized (NFC, case-folded) word tokens"""
+    if not text:
+        return []
+    return _WORD_TOKEN.findall(unicodedata.normalize('NFC', text).casefold())
+
+
+def phrase_pattern(keyword: str) -> str:
+    """Regex counting a keyword in space-joined tokens the way KeywordMatcher does.
+
+    Matches are whole tokens and overlapping ones are all found (the match is
+    a lookahead). Returns '' for keywords without any word tokens.
+    """
+    tokens = tokenize(keyword)
+    if not tokens:
+        return ''
+    return rf"(?=(?<!\S){re.escape(' '.join(tokens))}(?!\S))"
+
+
+class KeywordMatcher:
+    """Count many keywords in one pass over a token stream.
+
+    Keywords (single words or phrases) are compiled into an Aho-Corasick
+    automaton whose transitions are whole tokens, so matches always respect
+    word boundaries and overlapping phrases are all counted, e.g. "coffee"
+    and "coffee beans" both match in "coffee beans".
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def count_tokens(self, tokens: Iterable[str]) -> Dict[str, int]:
+        """Count keyword occurrences in an already normalized token stream"""
+        counts = [0] * len(self.keywords)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in output[state]:
+                counts[index] += 1
+        return dict(zip(self.keywords, counts))
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Count keyword occurrences in raw text"""
+        return self.count_tokens(tokenize(text))
+
+
+@lru_cache(maxsize=128)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Return a (cached) matcher for a keyword list"""
+    return _cached_matcher(tuple(keywords))
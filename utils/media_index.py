@@ -0,0 +1,87 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class MediaIndex:
+    """Maps image content hashes to WordPress media attachments per site.
+
+    Lets WordPressAPI.upload_media reuse an attachment when the same image
+    bytes are uploaded again, whatever URL they came from. Source URLs are
+    recorded too, so an image URL seen before is reused without downloading it.
+    """
+
+    def __init__(self, path: str = os.path.join('.cache', 'media_index.sqlite3')):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS media (
+                site TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                media_id INTEGER NOT NULL,
+                media TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (site, content_hash)
+            );
+            CREATE TABLE IF NOT EXISTS sources (
+                site TEXT NOT NULL,
+                source_url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (site, source_url)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def get(self, site: str, content_hash: str) -> Optional[Dict]:
+        """Return the stored attachment for an image hash on a site, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT media FROM media WHERE site = ? AND content_hash = ?", (site, content_hash)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_source(self, site: str, source_url: str) -> Optional[Dict]:
+        """Return the attachment an image URL was uploaded as on a site, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT m.media FROM sources s JOIN media m ON m.site = s.site AND m.content_hash = s.content_hash "
+                "WHERE s.site = ? AND s.source_url = ?", (site, source_url)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_source(self, site: str, source_url: str, content_hash: str) -> None:
+        """Record which image hash a source URL served"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (site, source_url, content_hash, created_at) VALUES (?, ?, ?, ?)",
+                (site, source_url, content_hash, time.time())
+            )
+            self._conn.commit()
+
+    def set(self, site: str, content_hash: str, media: Dict) -> None:
+        """Record the attachment an image hash was uploaded as"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media (site, content_hash, media_id, media, created_at) VALUES (?, ?, ?, ?, ?)",
+                (site, content_hash, media['id'], json.dumps(media, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def remove(self, site: str, content_hash: str) -> None:
+        """Forget an attachment, e.g. after it was deleted in WordPress"""
+        with self._lock:
+            self._conn.execute("DELETE FROM media WHERE site = ? AND content_hash = ?", (site, content_hash))
+            self._conn.execute("DELETE FROM sources WHERE site = ? AND content_hash = ?", (site, content_hash))
+            self._conn.commit()
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.instrumentation import increment, timed
+from utils.keyword_matcher import tokenize
+
+_TAG = re.compile(r'<[^>]+>')
+
+# Universal hashing modulo a Mersenne prime, as in the original MinHash papers
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def document_id(article: Dict) -> str:
+    """Stable id of a source article: its GUID, else its link, else its title"""
+    identity = article.get('guid') or article.get('link') or article.get('title', '')
+    return hashlib.sha1(identity.strip().encode('utf-8')).hexdigest()
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """Overlapping word n-grams of a text (HTML stripped, normalized tokens)"""
+    tokens = tokenize(_TAG.sub(' ', text))
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    """Computes fixed-size MinHash signatures of shingle sets"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Set[str]) -> np.ndarray:
+        if not items:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=4).digest(), 'little')
+             for item in items),
+            dtype=np.uint64, count=len(items)
+        )
+        # One row per shingle, one column per permutation; uint64 wraps on overflow
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the sets behind two signatures"""
+        return float(np.mean(first == second))
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index for spotting near-duplicate articles.
+
+    Each article's shingle set is MinHashed and its signature cut into
+    ``bands`` bands; articles sharing any band bucket are candidates, which
+    are then confirmed against ``threshold`` with the full signature. With
+    32 bands of 4 rows a pair at 0.7 similarity shares a bucket >99.9% of
+    the time. Bucket
+    lookups hit an SQLite index, so a query costs the same with hundreds of
+    thousands of stored articles as with a few.
+
+    Stored articles are sources that were fetched; ``mark_generated`` flags
+    the ones that have been rewritten. Seeing the very same article again is
+    only a duplicate once it has been generated. Every site keeps its own
+    articles, so a story fetched or rewritten for one site is still new to
+    the others.
+    """
+
+    def __init__(self, path: str = os.path.join('.cache', 'near_duplicates.sqlite3'), threshold: float = 0.7,
+                 num_perm: int = 128, bands: int = 32, shingle_size: int = 5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                site TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                meta TEXT NOT NULL,
+                generated INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (site, doc_id)
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                site TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_buckets_lookup ON buckets (site, band, bucket);
+            CREATE INDEX IF NOT EXISTS idx_buckets_doc ON buckets (site, doc_id);
+            """
+        )
+        self._conn.commit()
+
+    def signature(self, article: Dict) -> np.ndarray:
+        text = f"{article.get('title', '')} {article.get('content') or article.get('summary', '')}"
+        return self.hasher.signature(shingles(text, self.shingle_size))
+
+    def _buckets(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            buckets.append((band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'little', signed=True)))
+        return buckets
+
+    def query(self, article: Dict, signature: Optional[np.ndarray] = None, site: str = '') -> List[Dict]:
+        """Articles stored for ``site`` that are similar to this one, most similar first"""
+        if signature is None:
+            signature = self.signature(article)
+        buckets = self._buckets(signature)
+        clause = ' OR '.join(['(band = ? AND bucket = ?)'] * len(buckets))
+        params = [site, site] + [value for bucket in buckets for value in bucket]
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT d.doc_id, d.signature, d.meta, d.generated FROM documents d WHERE d.site = ? AND d.doc_id IN "
+                f"(SELECT doc_id FROM buckets WHERE site = ? AND ({clause}))",
+                params
+            ).fetchall()
+
+        matches = []
+        for doc_id, stored, meta, generated in rows:
+            similarity = self.hasher.similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if similarity >= self.threshold:
+                matches.append({'doc_id': doc_id, 'similarity': similarity,
+                                'generated': bool(generated), **json.loads(meta)})
+        return sorted(matches, key=lambda match: match['similarity'], reverse=True)
+
+    def add(self, article: Dict, signature: Optional[np.ndarray] = None, site: str = '') -> str:
+        """Store an article for ``site`` (idempotent per document id) and return its id"""
+        doc_id = document_id(article)
+        if signature is None:
+            signature = self.signature(article)
+        meta = {'title': article.get('title', ''), 'link': article.get('link', '')}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO documents (site, doc_id, signature, meta, created_at) VALUES (?, ?, ?, ?, ?)",
+                (site, doc_id, signature.tobytes(), json.dumps(meta, ensure_ascii=False), time.time())
+            )
+            if cursor.rowcount:
+                self._conn.executemany(
+                    "INSERT INTO buckets (site, band, bucket, doc_id) VALUES (?, ?, ?, ?)",
+                    [(site, band, bucket, doc_id) for band, bucket in self._buckets(signature)]
+                )
+            self._conn.commit()
+        return doc_id
+
+    def mark_generated(self, article: Dict, site: str = '') -> None:
+        """Flag a source article stored for ``site`` as rewritten, so its copies are dropped from now on"""
+        with self._lock:
+            self._conn.execute("UPDATE documents SET generated = 1 WHERE site = ? AND doc_id = ?",
+                               (site, document_id(article)))
+            self._conn.commit()
+
+    @timed('near_duplicate_check')
+    def deduplicate(self, articles: List[Dict], add: bool = True, site: str = '') -> Tuple[List[Dict], List[Dict]]:
+        """Split articles into (unique, duplicates) against ``site``'s articles and each other.
+
+        Each duplicate is a copy of the article with ``duplicate_of`` set to
+        the best match. With ``add``, unique articles are stored.
+        """
+        unique, duplicates = [], []
+        batch = {}
+        for article in articles:
+            signature = self.signature(article)
+            doc_id = document_id(article)
+
+            match = None
+            if doc_id in batch:
+                match = {'doc_id': doc_id, 'similarity': 1.0, 'title': batch[doc_id][0].get('title', '')}
+            else:
+                matches = [match for match in self.query(article, signature, site)
+                           if match['doc_id'] != doc_id or match['generated']]
+                if not add:
+                    # Earlier articles of this batch aren't in the index; compare directly
+                    for kept_id, (kept, kept_signature) in batch.items():
+                        similarity = self.hasher.similarity(signature, kept_signature)
+                        if similarity >= self.threshold:
+                            matches.append({'doc_id': kept_id, 'similarity': similarity,
+                                            'title': kept.get('title', '')})
+                if matches:
+                    match = max(matches, key=lambda match: match['similarity'])
+
+            if match is not None:
+                duplicates.append(dict(article, duplicate_of=match))
+                continue
+            batch[doc_id] = (article, signature)
+            unique.append(article)
+            if add:
+                self.add(article, signature, site)
+        increment('near_duplicates_dropped', len(duplicates))
+        return unique, duplicates
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
@@ -0,0 +1,142 @@
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from utils.instrumentation import span
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class PipelineStage:
+    """One step of a Pipeline: ``func`` run by ``workers`` threads.
+
+    ``func`` takes an item and returns the item to pass on, or None to drop
+    it. With ``expand`` it returns an iterable and each element is passed on
+    separately (e.g. a feed URL expanding into its entries).
+    """
+
+    def __init__(self, name: str, func: Callable, workers: int = 1, expand: bool = False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.expand = expand
+        self.processed = 0
+        self.failed = 0
+
+
+class Pipeline:
+    """Runs stages concurrently, connected by bounded queues.
+
+    Every stage starts working as soon as its first input arrives, so stages
+    overlap (the first article can be published while later feeds are still
+    downloading). A full queue blocks the stage feeding it, which bounds
+    memory by ``queue_size`` items per stage no matter how much input there
+    is. An item whose stage raises is reported to ``on_error`` and dropped;
+    the rest keep flowing.
+    """
+
+    def __init__(self, queue_size: int = 32, poll_interval: float = 0.5):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.stages: List[PipelineStage] = []
+        self._stop = threading.Event()
+
+    def add_stage(self, name: str, func: Callable, workers: int = 1, expand: bool = False) -> 'Pipeline':
+        self.stages.append(PipelineStage(name, func, workers, expand))
+        return self
+
+    def stop(self) -> None:
+        """Ask every stage to finish early; run() then ends without the remaining items"""
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        # Blocks while the queue is full, but gives up once the pipeline is stopped
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, items: Iterable, target: queue.Queue) -> None:
+        try:
+            for item in items:
+                if not self._put(target, item):
+                    return
+        finally:
+            self._put(target, _DONE)
+
+    def _work(self, stage: PipelineStage, inbox: queue.Queue, outbox: queue.Queue, remaining: List[int],
+              lock: threading.Lock, on_error: Optional[Callable]) -> None:
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                # Let the stage's other workers see the end of input too
+                self._put(inbox, _DONE)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(outbox, _DONE)
+                return
+
+            try:
+                with span('pipeline_stage', stage=stage.name):
+                    result = stage.func(item)
+                results = (result or ()) if stage.expand else ([result] if result is not None else [])
+                for output in results:
+                    if not self._put(outbox, output):
+                        return
+                with lock:
+                    stage.processed += 1
+            except Exception as e:
+                with lock:
+                    stage.failed += 1
+                if on_error is not None:
+                    try:
+                        on_error(stage.name, item, e)
+                    except Exception:
+                        pass
+
+    def run(self, items: Iterable, on_error: Optional[Callable[[str, object, Exception], None]] = None) -> Iterator:
+        """Push ``items`` through every stage, yielding the last stage's outputs as they finish"""
+        if not self.stages:
+            raise ValueError("Pipeline has no stages")
+        self._stop.clear()
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], queues[index + 1], remaining, lock, on_error),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Reached on completion, stop(), or the caller abandoning the iterator
+            self._stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class PostLedger:
+    """Records which WordPress post each article was published as, per site.
+
+    Articles are identified by ``article_key`` (their source link, else their
+    slug and title) and the ledger keeps a hash of the last published post
+    data, so republishing can update the existing post instead of creating a
+    duplicate, and skip posts whose content hasn't changed.
+    """
+
+    def __init__(self, path: str = os.path.join('.cache', 'post_ledger.sqlite3')):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                site TEXT NOT NULL,
+                article_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                post_id INTEGER NOT NULL,
+                post TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (site, article_key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_site_post_id ON posts (site, post_id)")
+        self._conn.commit()
+
+    @staticmethod
+    def article_key(content: Dict) -> str:
+        """Stable identity of an article across edits.
+
+        Generated slugs collide easily ("5-best-..."), so a slug alone never
+        identifies an article: without a source link the title must match too.
+        """
+        if content.get('source_link'):
+            return f"source:{hashlib.sha256(content['source_link'].encode()).hexdigest()}"
+        title = hashlib.sha256(content.get('title', '').strip().encode()).hexdigest()
+        if content.get('slug'):
+            return f"slug:{content['slug'].strip().lower()}:{title}"
+        return f"title:{title}"
+
+    @staticmethod
+    def content_hash(post_data: Dict) -> str:
+        """Hash of the post data sent to WordPress, to detect changes"""
+        return hashlib.sha256(json.dumps(post_data, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+    def get(self, site: str, article_key: str) -> Optional[Dict]:
+        """Return ``{'post_id', 'content_hash', 'post'}`` for an article, if it was published"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT post_id, content_hash, post FROM posts WHERE site = ? AND article_key = ?",
+                (site, article_key)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'post_id': row[0], 'content_hash': row[1], 'post': json.loads(row[2])}
+
+    def record(self, site: str, article_key: str, content_hash: str, post: Dict) -> None:
+        """Remember the post an article was published as"""
+        summary = {field: post.get(field) for field in ('id', 'link', 'slug', 'status')}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (site, article_key, content_hash, post_id, post, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (site, article_key, content_hash, post['id'], json.dumps(summary, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def remove(self, site: str, article_key: str) -> None:
+        """Forget an article, e.g. after its post was deleted in WordPress"""
+        with self._lock:
+            self._conn.execute("DELETE FROM posts WHERE site = ? AND article_key = ?", (site, article_key))
+            self._conn.commit()
@@ -0,0 +1,142 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Mapping, Optional
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """Parse OpenAI reset durations such as "20ms", "1.5s" or "6m0s" into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_delay_from_headers(headers: Optional[Mapping[str, str]], default: float) -> float:
+    """Work out how long to wait after a 429 from the rate-limit response headers"""
+    if not headers:
+        return default
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    # Wait for whichever budget (requests or tokens) resets last
+    resets = [
+        parse_reset_duration(headers.get('x-ratelimit-reset-requests', '')),
+        parse_reset_duration(headers.get('x-ratelimit-reset-tokens', ''))
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else default
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests-per-minute and tokens-per-minute budgets.
+
+    ``acquire`` (threads) and ``aacquire`` (coroutines) wait until both
+    budgets can cover the call, so synchronous and async callers in any
+    thread or event loop draw on the same budget. ``pause`` blocks every
+    caller for a while, which is how a 429 from one request slows down all
+    the others instead of each of them hitting the limit in turn.
+    ``reconcile`` corrects a reservation once the real token usage is known.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60
+            )
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Take budget for one request using ``tokens`` tokens if there is enough now.
+
+        Returns 0 once reserved, otherwise the seconds to wait before trying again.
+        """
+        if self.tokens_per_minute:
+            # A single call larger than the whole budget would otherwise wait forever
+            tokens = min(tokens, self.tokens_per_minute)
+
+        with self._lock:
+            self._refill()
+            wait = max(0.0, self._paused_until - time.monotonic())
+
+            if self.requests_per_minute and self._request_allowance < 1:
+                wait = max(wait, (1 - self._request_allowance) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute and self._token_allowance < tokens:
+                wait = max(wait, (tokens - self._token_allowance) * 60 / self.tokens_per_minute)
+
+            if wait <= 0:
+                if self.requests_per_minute:
+                    self._request_allowance -= 1
+                if self.tokens_per_minute:
+                    self._token_allowance -= tokens
+            return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until there is budget for one request using ``tokens`` tokens"""
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Wait (without blocking the event loop) until there is budget for one request"""
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def reconcile(self, reserved: int, used: int) -> None:
+        """Return unused reserved tokens to the budget, or charge the overrun"""
+        if not self.tokens_per_minute:
+            return
+        with self._lock:
+            self._refill()
+            reserved = min(reserved, self.tokens_per_minute)
+            self._token_allowance = min(float(self.tokens_per_minute), self._token_allowance + reserved - used)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out budget for the next ``seconds`` seconds"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,161 @@
+import re
+from typing import Dict, Iterator, Optional, Sequence
+
+# Language names used in the UI map onto profile codes
+LANGUAGE_ALIASES = {
+    'english': 'en',
+    'spanish': 'es',
+    'español': 'es',
+    'hindi': 'hi',
+    'हिन्दी': 'hi',
+    'हिंदी': 'hi'
+}
+
+_DEVANAGARI = re.compile(r'[\u0900-\u097F]')
+_LATIN_LETTER = re.compile(r'[a-zA-Z\u00C0-\u017F]')
+_SPANISH_HINTS = re.compile(r'[ñ¿¡áéíóú]|\b(?:el|la|los|las|que|de|del|y|en|por|para|con|una|es)\b', re.I)
+_ENGLISH_HINTS = re.compile(r'\b(?:the|and|of|to|is|in|that|for|with|it|on|are)\b', re.I)
+_WORD = re.compile(r'\S+')
+
+
+class LanguageProfile:
+    """Readability table for one language.
+
+    The score is a Flesch-style formula:
+    ``base - sentence_weight * words/sentence - syllable_weight * syllables/word``.
+    Syllables are the summed match counts of ``syllable_patterns`` over the
+    lowercased text, sentences the non-empty pieces between ``sentence_end``
+    matches.
+    """
+
+    def __init__(self, name: str, syllable_patterns: Sequence[str], sentence_end: str,
+                 base: float, sentence_weight: float, syllable_weight: float):
+        self.name = name
+        self.syllable_patterns = [re.compile(pattern) for pattern in syllable_patterns]
+        self.sentence_end = re.compile(sentence_end)
+        self.base = base
+        self.sentence_weight = sentence_weight
+        self.syllable_weight = syllable_weight
+
+
+# Strong vowels next to each other, or an accented weak vowel next to any
+# vowel, form a hiatus: an extra syllable inside a single vowel run
+_SPANISH_HIATUS = r'(?=[aeoáéó][aeoáéó]|[íú][aeiouáéóü]|[aeiouáéóü][íú])'
+
+DEFAULT_PROFILES = {
+    # Flesch Reading Ease
+    'en': LanguageProfile(
+        'English',
+        syllable_patterns=[r'[aeiouy]+'],
+        sentence_end=r'[.!?]+',
+        base=206.835, sentence_weight=1.015, syllable_weight=84.6
+    ),
+    # Szigriszt-Pazos perspicuity (the Spanish adaptation of Flesch)
+    'es': LanguageProfile(
+        'Spanish',
+        syllable_patterns=[r'[aeiouáéíóúü]+', _SPANISH_HIATUS],
+        sentence_end=r'[.!?]+',
+        base=206.835, sentence_weight=1.0, syllable_weight=62.3
+    ),
+    # Devanagari aksharas: every independent vowel plus every consonant that
+    # isn't followed by a virama (conjuncts count once). Embedded English
+    # words count by vowel groups. The syllable weight is Flesch's rescaled
+    # for Hindi words carrying about 1.8x as many aksharas as English words
+    # carry syllables.
+    'hi': LanguageProfile(
+        'Hindi',
+        syllable_patterns=[r'[\u0904-\u0914\u0960\u0961]|[\u0915-\u0939\u0958-\u095F](?!\u093C?\u094D)', r'[aeiouy]+'],
+        sentence_end=r'[.!?\u0964\u0965]+',
+        base=206.835, sentence_weight=1.015, syllable_weight=47.0
+    )
+}
+
+
+def detect_language(text: str, sample_size: int = 5000) -> str:
+    """Guess the profile code of a text from a sample of it"""
+    sample = text[:sample_size]
+    devanagari = len(_DEVANAGARI.findall(sample))
+    latin = len(_LATIN_LETTER.findall(sample))
+    if devanagari and devanagari >= latin * 0.5:
+        return 'hi'
+    if len(_SPANISH_HINTS.findall(sample)) > len(_ENGLISH_HINTS.findall(sample)) * 1.5:
+        return 'es'
+    return 'en'
+
+
+class ReadabilityEngine:
+    """Pluggable, table-driven readability scoring.
+
+    Languages are looked up in a table of LanguageProfile objects (extend it
+    with ``register``). Long texts are processed in whitespace-aligned chunks
+    so each regex pass works on a bounded piece of text.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, LanguageProfile]] = None, chunk_size: int = 65536):
+        self.profiles = dict(DEFAULT_PROFILES if profiles is None else profiles)
+        self.chunk_size = chunk_size
+
+    def register(self, code: str, profile: LanguageProfile) -> None:
+        """Add or replace the profile for a language code"""
+        self.profiles[code] = profile
+
+    def resolve_language(self, language: Optional[str], text: str = '') -> str:
+        """Map a language name/code (or None, to auto-detect) to a profile code"""
+        if not language:
+            return detect_language(text)
+        code = LANGUAGE_ALIASES.get(language.lower(), language.lower())
+        if code not in self.profiles:
+            raise ValueError(f"No readability profile for language: {language}")
+        return code
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        start = 0
+        length = len(text)
+        while start < length:
+            end = min(start + self.chunk_size, length)
+            if end < length:
+                # Cut at whitespace so no word or sentence end is split
+                split_at = text.rfind(' ', start, end)
+                if split_at > start:
+                    end = split_at
+            yield text[start:end]
+            start = end
+
+    def count_syllables(self, text: str, language: Optional[str] = None) -> int:
+        profile = self.profiles[self.resolve_language(language, text)]
+        total = 0
+        for chunk in self._chunks(text.lower()):
+            for pattern in profile.syllable_patterns:
+                total += len(pattern.findall(chunk))
+        return total
+
+    def count_sentences(self, text: str, language: Optional[str] = None) -> int:
+        profile = self.profiles[self.resolve_language(language, text)]
+        total = 0
+        unfinished = False
+        for chunk in self._chunks(text):
+            pieces = profile.sentence_end.split(chunk)
+            total += sum(1 for sentence in pieces if sentence.strip())
+            # A sentence cut by the chunk boundary continues at the next chunk's start
+            if unfinished and pieces[0].strip():
+                total -= 1
+            unfinished = bool(pieces[-1].strip())
+        return total
+
+    def score(self, text: str, language: Optional[str] = None, words: Optional[int] = None) -> float:
+        """Readability score (0-100, higher is easier) of plain text"""
+        code = self.resolve_language(language, text)
+        profile = self.profiles[code]
+
+        if words is None:
+            words = sum(len(_WORD.findall(chunk)) for chunk in self._chunks(text))
+        sentences = self.count_sentences(text, code)
+        syllables = self.count_syllables(text, code)
+
+        if sentences == 0 or words == 0:
+            return 0
+
+        score = (profile.base
+                 - profile.sentence_weight * (words / sentences)
+                 - profile.syllable_weight * (syllables / words))
+        return max(0, min(100, score))
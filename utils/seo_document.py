@@ -0,0 +1,145 @@
+import html
+import re
+from typing import Dict, List, Tuple
+from utils.keyword_matcher import tokenize
+
+# One pass over the markup: a tag, a comment, a run of text, or a stray '<'
+_TOKEN = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)([^>]*)>|<!--.*?(?:-->|$)|([^<]+)|<', re.S)
+_ATTR = re.compile(r'''([a-zA-Z_:][-\w:.]*)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''')
+_BLANK_LINE = re.compile(r'\n\s*\n')
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+
+_HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_BLOCK_TAGS = frozenset([
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'blockquote', 'section', 'article',
+    'table', 'tr', 'td', 'th', 'pre', 'figure', 'figcaption', 'header', 'footer', 'nav'
+])
+_SKIP_TAGS = frozenset(['script', 'style', 'noscript'])
+
+# The parser's rules as regular expressions, for pandas .str methods in
+# SEOOptimizer.analyze_batch: drop comments and script/style blocks, then turn
+# block and heading tags into spaces and remove the remaining (inline) tags
+_END_OF_NAME = r'(?![a-zA-Z0-9])'
+_SKIP_NAMES = '|'.join(sorted(_SKIP_TAGS))
+_BREAK_NAMES = '|'.join(sorted(_BLOCK_TAGS | set(_HEADINGS)))
+BATCH_COMMENT = r'(?s)<!--.*?(?:-->|$)'
+BATCH_SKIPPED = rf'(?is)<(?:{_SKIP_NAMES}){_END_OF_NAME}[^>]*>.*?(?:</(?:{_SKIP_NAMES}){_END_OF_NAME}[^>]*>|\Z)'
+BATCH_BREAK_TAG = rf'(?i)</?(?:{_BREAK_NAMES}){_END_OF_NAME}[^>]*>'
+BATCH_TAG = r'</?[a-zA-Z][a-zA-Z0-9]*[^>]*>'
+BATCH_SUBHEADING = rf'(?is)<h[2-4]{_END_OF_NAME}[^>]*>.*?</h[1-6]{_END_OF_NAME}[^>]*>'
+BATCH_IMAGE = rf'(?i)<img{_END_OF_NAME}'
+_BATCH_HREF = rf'''(?i:<a){_END_OF_NAME}[^>]*?(?<![-\w:.])(?i:href)\s*=\s*["']?'''
+BATCH_EXTERNAL_LINK = _BATCH_HREF + r'https?://'
+BATCH_INTERNAL_LINK = _BATCH_HREF + r'/(?!/)'
+
+
+def _parse_attributes(raw: str) -> Dict[str, str]:
+    attributes = {}
+    for match in _ATTR.finditer(raw):
+        name, double, single, bare = match.groups()
+        value = double if double is not None else single if single is not None else bare
+        attributes[name.lower()] = html.unescape(value)
+    return attributes
+
+
+class SEODocument:
+    """Article HTML tokenized once into the parts SEO checks look at.
+
+    Exposes the visible ``text``, its whitespace ``words``, ``headings`` as
+    ``(level, text)`` pairs, link ``links`` (href values), ``images`` (dicts
+    with ``src`` and ``alt``, None when the attribute is missing), text ``paragraphs`` and ``sentences``. Plain
+    text without markup is split into paragraphs on blank lines.
+    """
+
+    def __init__(self, markup: str):
+        self.markup = markup or ''
+        self.headings: List[Tuple[int, str]] = []
+        self.links: List[str] = []
+        self.images: List[Dict[str, str]] = []
+        self.paragraphs: List[str] = []
+        self._blocks: List[str] = []
+
+        self._parse()
+
+        self.text = '\n\n'.join(self._blocks)
+        self.lower_text = self.text.lower()
+        self.words = self.text.split()
+        self.sentences = [sentence for sentence in _SENTENCE_SPLIT.split(self.text) if sentence.strip()]
+        self._tokens = None
+
+    def _parse(self) -> None:
+        parts: List[str] = []
+        heading_level = 0
+        heading_start = 0
+        skip_depth = 0
+
+        def flush(is_heading: bool = False) -> None:
+            block = ''.join(parts).strip()
+            parts.clear()
+            if block:
+                self._blocks.append(block)
+                if not is_heading:
+                    self.paragraphs.append(block)
+
+        for match in _TOKEN.finditer(self.markup):
+            closing, tag, attributes, text = match.groups()
+
+            if tag is None:
+                if skip_depth or (text is None and match.group(0) != '<'):
+                    continue  # comment, or text inside <script>/<style>
+                text = text if text is not None else '<'
+                if '&' in text:
+                    text = html.unescape(text)
+                # Blank lines separate paragraphs in plain-text content
+                pieces = _BLANK_LINE.split(text)
+                parts.append(pieces[0])
+                for piece in pieces[1:]:
+                    flush(heading_level > 0)
+                    parts.append(piece)
+                continue
+
+            tag = tag.lower()
+            if tag in _SKIP_TAGS:
+                skip_depth = max(0, skip_depth - 1) if closing else skip_depth + 1
+            elif skip_depth:
+                continue
+            elif tag == 'img':
+                attrs = _parse_attributes(attributes)
+                self.images.append({'src': attrs.get('src', ''), 'alt': attrs.get('alt')})
+            elif tag == 'a' and not closing:
+                href = _parse_attributes(attributes).get('href')
+                if href is not None:
+                    self.links.append(href)
+            elif tag in _HEADINGS:
+                if not closing:
+                    flush()
+                    heading_level = _HEADINGS[tag]
+                    heading_start = len(self._blocks)
+                elif heading_level:
+                    flush(is_heading=True)
+                    heading_text = ' '.join(self._blocks[heading_start:])
+                    self.headings.append((heading_level, heading_text))
+                    heading_level = 0
+            elif tag in _BLOCK_TAGS:
+                flush(heading_level > 0)
+
+        flush(heading_level > 0)
+
+    def heading_texts(self, min_level: int = 1, max_level: int = 6) -> List[str]:
+        """Return the text of headings within the given level range"""
+        return [text for level, text in self.headings if min_level <= level <= max_level]
+
+    @property
+    def tokens(self) -> List[str]:
+        """Normalized word tokens of the visible text, for keyword matching"""
+        if self._tokens is None:
+            self._tokens = tokenize(self.text)
+        return self._tokens
+
+    @property
+    def external_links(self) -> List[str]:
+        return [href for href in self.links if href.startswith(('http://', 'https://'))]
+
+    @property
+    def internal_links(self) -> List[str]:
+        return [href for href in self.links if href.startswith('/') and not href.startswith('//')]
@@ -1,7 +1,20 @@
-
 from typing import Dict, List
+import html
 import re
-from textblob import TextBlob
+import numpy as np
+import pandas as pd
+from utils.instrumentation import timed
+from utils.seo_document import (
+    BATCH_BREAK_TAG, BATCH_COMMENT, BATCH_EXTERNAL_LINK, BATCH_IMAGE, BATCH_INTERNAL_LINK, BATCH_SKIPPED,
+    BATCH_SUBHEADING, BATCH_TAG, SEODocument
+)
+from utils.keyword_matcher import WORD_TOKEN_PATTERN, get_matcher, phrase_pattern
+from utils.readability import ReadabilityEngine
+
+_TAG = re.compile(r'<[^>]+>')
+
+# Words as SEODocument splits them (str.split() whitespace)
+_BATCH_WORD = r'\S+'
 
 class SEOOptimizer:
     def __init__(self):
@@ -11,24 +24,38 @@ class SEOOptimizer:
         self.max_keyword_density = 0.03
         self.power_words = set(['amazing', 'exclusive', 'free', 'instant', 'new', 'proven', 'guaranteed', 'powerful'])
         self.sentiment_words = set(['best', 'great', 'awesome', 'terrible', 'worst', 'amazing', 'awful', 'excellent'])
+        self.readability = ReadabilityEngine()
 
-    def analyze_content(self, content: Dict, keywords: List[str] = None) -> Dict:
+    def analyze_content(self, content: Dict, keywords: List[str] = None, language: str = None) -> Dict:
         """Analyze content for SEO metrics"""
-        text = content['content']
-        title = content.get('title', '')
-        meta_description = content.get('meta_description', '')
-        
+        return self.analyze_document(
+            SEODocument(content['content']),
+            title=content.get('title', ''),
+            keywords=keywords,
+            language=language
+        )
+
+    @timed('seo_analysis', mode='document')
+    def analyze_document(self, document: SEODocument, title: str = '', keywords: List[str] = None,
+                         language: str = None) -> Dict:
+        """Analyze an already tokenized document for SEO metrics.
+
+        ``language`` ("English", "Hindi", "Spanish" or a profile code) picks the
+        readability profile; it is detected from the text when omitted.
+        """
         # Auto-generate focus keyword if none provided
         if not keywords:
-            blob = TextBlob(text)
-            keywords = [phrase.string for phrase in blob.noun_phrases[:1]]
-        
-        word_count = len(text.split())
+            keyword = self.extract_focus_keyword(document.text)
+            keywords = [keyword] if keyword else []
+
+        lower_keywords = [kw.lower() for kw in keywords]
+        focus_keyword = lower_keywords[0] if lower_keywords else ''
+        word_count = len(document.words)
         metrics = {
             'focus_keyword': keywords[0] if keywords else '',
             'word_count': word_count,
             'keyword_density': {},
-            'readability_score': self._calculate_readability(text),
+            'readability_score': self._calculate_readability(document, language),
             'suggestions': [],
             'title_analysis': {},
             'content_analysis': {},
@@ -36,40 +63,200 @@ class SEOOptimizer:
         }
 
         # Title analysis
-        title_words = title.lower().split()
+        title_lower = title.lower()
+        title_words = title_lower.split()
+        title_start = ' '.join(title_words[:3])
         metrics['title_analysis'].update({
-            'has_keyword': any(kw.lower() in title.lower() for kw in keywords),
-            'keyword_at_beginning': any(kw.lower() in ' '.join(title_words[:3]).lower() for kw in keywords),
-            'has_number': any(word.isdigit() for word in title_words),
-            'has_power_word': any(word.lower() in self.power_words for word in title_words),
-            'has_sentiment': any(word.lower() in self.sentiment_words for word in title_words)
+            'has_keyword': any(kw in title_lower for kw in lower_keywords),
+            'keyword_at_beginning': any(kw in title_start for kw in lower_keywords),
+            **self._title_word_flags(title_words)
         })
 
         # Content analysis
+        opening = ' '.join(document.words[:50]).lower()
+        subheadings = document.heading_texts(2, 4)
         metrics['content_analysis'].update({
-            'has_keyword_beginning': any(kw.lower() in ' '.join(text.split()[:50]).lower() for kw in keywords),
-            'has_subheadings': bool(re.findall(r'<h[2-4]>', text)),
-            'has_keyword_in_subheading': bool(re.findall(r'<h[2-4]>.*?' + re.escape(keywords[0] if keywords else '') + r'.*?</h[2-4]>', text, re.I)),
-            'has_images': bool(re.findall(r'<img.*?>', text)),
-            'has_keyword_in_alt': bool(re.findall(r'<img.*?alt=".*?' + re.escape(keywords[0] if keywords else '') + r'.*?".*?>', text, re.I)),
-            'has_external_links': bool(re.findall(r'<a.*?href="https?://.*?".*?>', text)),
-            'has_internal_links': bool(re.findall(r'<a.*?href="/".*?>', text)),
-            'paragraph_length': self._analyze_paragraphs(text)
+            'has_keyword_beginning': any(kw in opening for kw in lower_keywords),
+            'has_subheadings': bool(subheadings),
+            'has_keyword_in_subheading': any(focus_keyword in heading.lower() for heading in subheadings),
+            'has_images': bool(document.images),
+            # Without a focus keyword this only asks for alt text, as the old <img alt="..."> regex did
+            'has_keyword_in_alt': any(image['alt'] is not None and focus_keyword in image['alt'].lower()
+                                      for image in document.images),
+            'has_external_links': bool(document.external_links),
+            'has_internal_links': bool(document.internal_links),
+            'paragraph_length': self._analyze_paragraphs(document)
         })
 
-        # Calculate keyword density
-        for keyword in keywords:
-            count = len(re.findall(rf'\b{re.escape(keyword)}\b', text.lower()))
-            density = count / word_count if word_count > 0 else 0
-            metrics['keyword_density'][keyword] = density
+        # Calculate keyword density, counting every keyword in one pass
+        for keyword, count in self.count_keywords(document, keywords).items():
+            metrics['keyword_density'][keyword] = count / word_count if word_count > 0 else 0
 
         # Generate suggestions based on analysis
         self._generate_suggestions(metrics)
 
         return metrics
 
-    def _analyze_paragraphs(self, text: str) -> Dict:
-        paragraphs = re.split(r'\n\s*\n', text)
+    @timed('seo_analysis', mode='batch')
+    def analyze_batch(self, articles: List[Dict], keywords: List[str] = None, language: str = None) -> pd.DataFrame:
+        """Score many articles at once, returning one row of metrics per article.
+
+        Counting is done column-wise with pandas string methods and NumPy
+        arithmetic instead of one analyze_content call per article. The focus
+        keyword of each row is the first of ``keywords`` when given, otherwise
+        the article's own ``focus_keyword`` / first ``keywords`` entry. Every
+        keyword in ``keywords`` also gets a ``density_<keyword>`` column.
+        Readability uses ``language``'s profile, or each article's detected
+        language when it is omitted.
+        """
+        frame = pd.DataFrame({
+            'title': [article.get('title', '') or '' for article in articles],
+            'content': [article.get('content', '') or '' for article in articles]
+        }, dtype=object)  # Python re semantics (Unicode \s, lookarounds) on any pandas version
+
+        # The visible text as SEODocument extracts it, so both paths count the same words
+        markup = (frame['content']
+                  .str.replace(BATCH_COMMENT, '', regex=True)
+                  .str.replace(BATCH_SKIPPED, '', regex=True))
+        text = (markup
+                .str.replace(BATCH_BREAK_TAG, ' ', regex=True)
+                .str.replace(BATCH_TAG, '', regex=True)
+                .map(html.unescape).astype(object))
+        lower_text = text.str.lower()
+
+        word_count = text.str.count(_BATCH_WORD).to_numpy()
+        sentence_count = np.zeros(len(articles), dtype=int)
+        syllable_count = np.zeros(len(articles), dtype=int)
+
+        # Rows are grouped by language so each group's profile patterns run
+        # column-wise over that group only
+        languages = pd.Series(
+            [self.readability.resolve_language(language, article_text) for article_text in text]
+            if not language else [self.readability.resolve_language(language)] * len(articles),
+            index=text.index
+        )
+        base = np.zeros(len(articles))
+        sentence_weight = np.zeros(len(articles))
+        syllable_weight = np.zeros(len(articles))
+        for code, rows in languages.groupby(languages).groups.items():
+            profile = self.readability.profiles[code]
+            positions = text.index.get_indexer(rows)
+            group_text = text.loc[rows]
+            group_lower = lower_text.loc[rows]
+            # Count the non-empty pieces between sentence ends
+            sentence_count[positions] = (group_text.str.split(profile.sentence_end.pattern, regex=True)
+                                         .map(lambda pieces: sum(1 for piece in pieces if piece.strip())))
+            syllable_count[positions] = sum(
+                group_lower.str.count(pattern.pattern).to_numpy() for pattern in profile.syllable_patterns
+            )
+            base[positions] = profile.base
+            sentence_weight[positions] = profile.sentence_weight
+            syllable_weight[positions] = profile.syllable_weight
+
+        # Flesch-style readability, computed for the whole column at once
+        with np.errstate(divide='ignore', invalid='ignore'):
+            readability = (base
+                           - sentence_weight * (word_count / sentence_count)
+                           - syllable_weight * (syllable_count / word_count))
+        readability = np.where((word_count > 0) & (sentence_count > 0), np.clip(readability, 0, 100), 0)
+
+        if keywords:
+            focus_keywords = [keywords[0]] * len(articles)
+        else:
+            focus_keywords = [self.article_focus_keyword(article) for article in articles]
+
+        # An (articles x keywords) count matrix, one column-wise count per keyword
+        # over the normalized tokens; matches are whole tokens, as in count_keywords
+        all_keywords = list(dict.fromkeys([kw for kw in (keywords or []) + focus_keywords if kw]))
+        tokens = (text.str.normalize('NFC').str.casefold()
+                  .str.findall(WORD_TOKEN_PATTERN).str.join(' '))
+        counts = np.zeros((len(articles), len(all_keywords)))
+        for column, keyword in enumerate(all_keywords):
+            pattern = phrase_pattern(keyword)
+            if pattern and len(articles):
+                counts[:, column] = tokens.str.count(pattern).to_numpy()
+        keyword_index = {keyword: index for index, keyword in enumerate(all_keywords)}
+        safe_word_count = np.maximum(word_count, 1)
+
+        focus_columns = np.array([keyword_index.get(keyword, -1) for keyword in focus_keywords], dtype=int)
+        if counts.shape[1]:
+            focus_counts = np.where(focus_columns >= 0, counts[np.arange(len(articles)), focus_columns], 0)
+        else:
+            focus_counts = np.zeros(len(articles))
+        focus_density = np.where(word_count > 0, focus_counts / safe_word_count, 0)
+
+        title_lower = frame['title'].str.lower()
+        title_flags = title_lower.str.split().map(self._title_word_flags)
+        lower_keywords = [keyword.lower() for keyword in keywords or []]
+
+        result = pd.DataFrame({
+            'title': frame['title'],
+            'focus_keyword': focus_keywords,
+            'language': languages.to_numpy(),
+            'word_count': word_count,
+            'sentence_count': sentence_count,
+            'syllable_count': syllable_count,
+            'readability_score': readability,
+            'keyword_count': focus_counts.astype(int),
+            'keyword_density': focus_density,
+            # Like analyze_content: any of the keywords, else the row's focus keyword
+            'title_has_keyword': [any(kw in title for kw in lower_keywords or ([focus.lower()] if focus else []))
+                                  for focus, title in zip(focus_keywords, title_lower)],
+            'title_has_number': title_flags.map(lambda flags: flags['has_number']),
+            'title_has_power_word': title_flags.map(lambda flags: flags['has_power_word']),
+            'title_has_sentiment': title_flags.map(lambda flags: flags['has_sentiment']),
+            'has_subheadings': markup.str.contains(BATCH_SUBHEADING, regex=True),
+            'has_images': markup.str.contains(BATCH_IMAGE, regex=True),
+            'has_external_links': markup.str.contains(BATCH_EXTERNAL_LINK, regex=True),
+            'has_internal_links': markup.str.contains(BATCH_INTERNAL_LINK, regex=True)
+        })
+
+        result['meets_word_count'] = result['word_count'] >= self.min_word_count
+        result['keyword_density_ok'] = (
+            (result['keyword_density'] >= self.min_keyword_density)
+            & (result['keyword_density'] <= self.max_keyword_density)
+        )
+
+        for keyword in keywords or []:
+            column = keyword_index.get(keyword)
+            density = counts[:, column] / safe_word_count if column is not None else np.zeros(len(articles))
+            result[f'density_{keyword}'] = np.where(word_count > 0, density, 0)
+
+        return result
+
+    def article_focus_keyword(self, article: Dict) -> str:
+        """Focus keyword recorded on a generated article, if any"""
+        if article.get('focus_keyword'):
+            return article['focus_keyword']
+        article_keywords = article.get('keywords') or ''
+        if isinstance(article_keywords, list):
+            return article_keywords[0] if article_keywords else ''
+        return article_keywords.split(',')[0].strip()
+
+    def _title_word_flags(self, title_words: List[str]) -> Dict[str, bool]:
+        """Title checks shared by analyze_content and analyze_batch (lowercased title words)"""
+        return {
+            'has_number': any(word.isdigit() for word in title_words),
+            'has_power_word': any(word in self.power_words for word in title_words),
+            'has_sentiment': any(word in self.sentiment_words for word in title_words)
+        }
+
+    def count_keywords(self, document: SEODocument, keywords: List[str]) -> Dict[str, int]:
+        """Count whole-word occurrences of every keyword (or phrase) in the document"""
+        return get_matcher(keywords).count_tokens(document.tokens)
+
+    def extract_focus_keyword(self, text: str) -> str:
+        """Suggest a focus keyword locally from the first noun phrase in the text"""
+        # Feed content is usually HTML; tags would otherwise show up as phrases
+        plain_text = _TAG.sub(' ', text)
+        # Imported here: textblob pulls in nltk, which is slow to load and
+        # only needed for local keyword extraction
+        from textblob import TextBlob
+        noun_phrases = TextBlob(plain_text).noun_phrases
+        return noun_phrases[0] if noun_phrases else ''
+
+    def _analyze_paragraphs(self, document: SEODocument) -> Dict:
+        paragraphs = document.paragraphs
         return {
             'avg_length': sum(len(p.split()) for p in paragraphs) / len(paragraphs) if paragraphs else 0,
             'total_paragraphs': len(paragraphs)
@@ -98,30 +285,10 @@ class SEOOptimizer:
         if not metrics['content_analysis']['has_internal_links']:
             metrics['suggestions'].append("Add internal links to related content")
 
-    def _calculate_readability(self, text: str) -> float:
-        """Calculate basic readability score"""
-        sentences = len(re.split(r'[.!?]+', text))
-        words = len(text.split())
-        syllables = self._count_syllables(text)
-        
-        if sentences == 0 or words == 0:
-            return 0
-        
-        # Flesch Reading Ease score
-        score = 206.835 - 1.015 * (words / sentences) - 84.6 * (syllables / words)
-        return max(0, min(100, score))
-
-    def _count_syllables(self, text: str) -> int:
-        """Rough syllable count"""
-        text = text.lower()
-        count = 0
-        vowels = "aeiouy"
-        on_vowel = False
-        
-        for char in text:
-            is_vowel = char in vowels
-            if is_vowel and not on_vowel:
-                count += 1
-            on_vowel = is_vowel
-            
-        return count
+    def _calculate_readability(self, document: SEODocument, language: str = None) -> float:
+        """Calculate readability score with the language's profile"""
+        return self.readability.score(document.text, language, words=len(document.words))
+
+    def _count_syllables(self, text: str, language: str = None) -> int:
+        """Syllable (or Devanagari akshara) count"""
+        return self.readability.count_syllables(text, language)
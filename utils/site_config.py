@@ -0,0 +1,57 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+# Site config file read by background workers, same format as cli.py --config
+SITES_CONFIG_ENV = 'SITES_CONFIG'
+
+_ENV_KEY = re.compile(r'[^A-Z0-9]+')
+
+
+def load_sites(path: str, names: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Read a site config file: ``{"sites": {name: config}}`` or just ``{name: config}``"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    sites = config.get('sites', config)
+    if not isinstance(sites, dict):
+        raise ValueError("Site config must map site names to their settings")
+    if names:
+        missing = [name for name in names if name not in sites]
+        if missing:
+            raise ValueError(f"Unknown site(s) in {path}: {', '.join(missing)}")
+        sites = {name: sites[name] for name in names}
+    return sites
+
+
+def env_key(site: str) -> str:
+    """Suffix of a site's credential variables, e.g. "My Blog" -> MY_BLOG"""
+    return _ENV_KEY.sub('_', site.upper()).strip('_')
+
+
+def resolve_credentials(site: str, wp_url: str = '') -> Optional[Dict]:
+    """Look up a site's WordPress credentials outside the job queue.
+
+    Jobs only carry the site name and URL; the username and application
+    password come from the file named by $SITES_CONFIG, or from
+    WP_USERNAME_<SITE> / WP_PASSWORD_<SITE> (and optionally WP_URL_<SITE>).
+    Returns None when no complete set of credentials is found.
+    """
+    credentials = {}
+    path = os.environ.get(SITES_CONFIG_ENV)
+    if path and os.path.exists(path):
+        try:
+            credentials = dict(load_sites(path).get(site) or {})
+        except (OSError, ValueError):
+            credentials = {}
+
+    key = env_key(site)
+    for field, variable in (('wp_url', 'WP_URL'), ('wp_username', 'WP_USERNAME'), ('wp_password', 'WP_PASSWORD')):
+        value = os.environ.get(f"{variable}_{key}")
+        if value:
+            credentials[field] = value
+    credentials['wp_url'] = credentials.get('wp_url') or wp_url
+
+    if not all(credentials.get(field) for field in ('wp_url', 'wp_username', 'wp_password')):
+        return None
+    return credentials
@@ -0,0 +1,106 @@
+import html
+import re
+from typing import Dict, Optional
+
+import trafilatura
+
+from utils.instrumentation import timed
+
+try:
+    import tiktoken
+except ImportError:  # Optional; fall back to a character-based estimate
+    tiktoken = None
+
+_SCRIPT_STYLE = re.compile(r'<(script|style|noscript|iframe|form)\b.*?</\1\s*>', re.I | re.S)
+_BLOCK_TAG = re.compile(r'</?(p|div|br|li|h[1-6]|tr|blockquote|section|article)\b[^>]*>', re.I)
+_TAG = re.compile(r'<[^>]+>')
+_SPACES = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+_SENTENCE_END = re.compile(r'[.!?।]\s')
+
+
+class TextPreprocessor:
+    """Turn feed HTML into plain main text trimmed to a token budget.
+
+    Tokens are counted with tiktoken when it is installed, otherwise with a
+    conservative character-based estimate, so prompt sizes stay predictable.
+    """
+
+    def __init__(self, max_tokens: int = 3000, model: str = "gpt-4o"):
+        self.max_tokens = max_tokens
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                # The encoding file is downloaded on first use; offline hosts
+                # fall back to the estimate rather than failing to start
+                self._encoding = None
+
+    def count_tokens(self, text: str) -> int:
+        """Count (or estimate) the number of tokens in text"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        # ~4 characters per token for ASCII text; scripts such as Devanagari
+        # tokenize far less efficiently, so count those at ~2 per token
+        non_ascii = sum(1 for char in text if ord(char) > 127)
+        return (len(text) - non_ascii + 3) // 4 + (non_ascii + 1) // 2
+
+    def extract_text(self, content: str) -> str:
+        """Extract the main text from an HTML fragment or page"""
+        if not content or '<' not in content:
+            return (content or '').strip()
+
+        extracted = None
+        try:
+            extracted = trafilatura.extract(content, include_comments=False, favor_recall=True)
+        except Exception:
+            extracted = None
+
+        # trafilatura gives up on short fragments such as feed summaries
+        if not extracted:
+            text = _SCRIPT_STYLE.sub(' ', content)
+            text = _BLOCK_TAG.sub('\n', text)
+            text = html.unescape(_TAG.sub(' ', text))
+            text = _SPACES.sub(' ', text)
+            extracted = _BLANK_LINES.sub('\n\n', text)
+
+        return extracted.strip()
+
+    def truncate(self, text: str, max_tokens: Optional[int] = None) -> str:
+        """Trim text to at most max_tokens, preferring to cut at a sentence end"""
+        max_tokens = self.max_tokens if max_tokens is None else max_tokens
+        if self.count_tokens(text) <= max_tokens:
+            return text
+
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            truncated = self._encoding.decode(tokens[:max_tokens])
+        else:
+            # Binary search the longest prefix that fits the estimated budget
+            low, high = 0, len(text)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self.count_tokens(text[:middle]) <= max_tokens:
+                    low = middle
+                else:
+                    high = middle - 1
+            truncated = text[:low]
+
+        # Don't leave half a sentence behind if a boundary is reasonably close
+        boundaries = list(_SENTENCE_END.finditer(truncated))
+        if boundaries and boundaries[-1].end() > len(truncated) * 0.8:
+            return truncated[:boundaries[-1].end()].strip()
+        return truncated.rsplit(' ', 1)[0].strip() if ' ' in truncated else truncated
+
+    @timed('preprocess')
+    def prepare(self, source_content: Dict) -> Dict:
+        """Return a copy of source_content with clean, budgeted 'content'"""
+        prepared = dict(source_content)
+        prepared['content'] = self.truncate(self.extract_text(source_content.get('content', '')))
+        return prepared
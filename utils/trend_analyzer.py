@@ -1,11 +1,39 @@
-
-from pytrends.request import TrendReq
+import copy
+import logging
 import pandas as pd
-from typing import List
+import random
+import threading
+import time
+from typing import Dict, List
+from utils.instrumentation import increment, span
+
+logger = logging.getLogger(__name__)
+
+# Google Trends compares at most this many keywords per payload
+PAYLOAD_MAX_KEYWORDS = 5
 
 class TrendAnalyzer:
-    def __init__(self):
-        self.pytrends = TrendReq(hl='en-US', tz=360)
+    def __init__(self, pytrends=None, region: str = 'united_states', cache_ttl: float = 3600,
+                 error_ttl: float = 60, min_request_interval: float = 1.0, max_retries: int = 3,
+                 backoff_base: float = 2.0, max_retry_delay: float = 60):
+        """Set up the trends client.
+
+        Pass ``pytrends`` to use another client (e.g. one pointed at a local
+        stub of the trends endpoint); otherwise a TrendReq is built on first
+        use, since constructing one already makes a request to Google.
+        Results are cached per query for ``cache_ttl`` seconds (failures for
+        ``error_ttl``), requests are spaced at least ``min_request_interval``
+        apart, and 429 responses are retried with exponential backoff (or
+        the server's Retry-After), waiting at most ``max_retry_delay`` each time.
+        """
+        self._pytrends = pytrends
+        self.region = region
+        self.cache_ttl = cache_ttl
+        self.error_ttl = error_ttl
+        self.min_request_interval = min_request_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_retry_delay = max_retry_delay
         self.categories = {
             "All": "",
             "Business": "/Business",
@@ -14,28 +42,146 @@ class TrendAnalyzer:
             "Sports": "/Sports",
             "Health": "/Health",
         }
-        
+
+        self._cache: Dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
+        # pytrends keeps payload state on the client, so requests go one at a time.
+        # Reentrant, since requests made under it build the client on first use
+        self._request_lock = threading.RLock()
+        self._last_request = 0.0
+        # Set after a 429; no request is sent before this time
+        self._resume_at = 0.0
+
+    @property
+    def pytrends(self):
+        with self._request_lock:
+            if self._pytrends is None:
+                from pytrends.request import TrendReq
+                self._pytrends = TrendReq(hl='en-US', tz=360)
+            return self._pytrends
+
     def get_categories(self) -> List[str]:
         return list(self.categories.keys())
-        
+
+    def _cache_get(self, key: tuple):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._cache[key]
+                entry = None
+        increment('trends_cache_hits' if entry is not None else 'trends_cache_misses')
+        # A copy, so callers can't change what later lookups get
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def _cache_set(self, key: tuple, value, ttl: float) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.time() + ttl, copy.deepcopy(value))
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache = {}
+
+    @staticmethod
+    def _is_throttled(error: Exception) -> bool:
+        response = getattr(error, 'response', None)
+        return (getattr(response, 'status_code', None) == 429
+                or type(error).__name__ == 'TooManyRequestsError'
+                or '429' in str(error))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        response = getattr(error, 'response', None)
+        retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+        delay = None
+        try:
+            if retry_after:
+                delay = float(retry_after)
+        except ValueError:
+            pass
+        if delay is None or delay < 0:
+            delay = self.backoff_base * 2 ** attempt + random.uniform(0, 1)
+        return min(delay, self.max_retry_delay)
+
+    def _request(self, func):
+        """Run one trends request, spaced from the previous one and retried on 429.
+
+        Waits happen outside the request lock, so a backoff doesn't block
+        threads that only need cached results; every request still honours
+        the shared backoff through ``_resume_at``.
+        """
+        attempt = 0
+        while True:
+            with self._request_lock:
+                wait = max(self._last_request + self.min_request_interval, self._resume_at) - time.time()
+                if wait <= 0:
+                    try:
+                        with span('trends_request'):
+                            return func()
+                    except Exception as e:
+                        if not self._is_throttled(e) or attempt >= self.max_retries:
+                            raise
+                        increment('trends_throttled')
+                        self._resume_at = time.time() + self._retry_delay(e, attempt)
+                        attempt += 1
+                        continue
+                    finally:
+                        self._last_request = time.time()
+            time.sleep(wait)
+
     def get_trending_topics(self, category: str) -> List[str]:
+        key = ('trending', self.region, category)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         try:
-            trending_searches_df = self.pytrends.trending_searches(
-                pn='united_states' if category == "All" else f'united_states{self.categories[category]}'
-            )
-            return trending_searches_df[0].tolist()
+            trending_searches_df = self._request(lambda: self.pytrends.trending_searches(
+                pn=self.region if category == "All" else f'{self.region}{self.categories[category]}'
+            ))
+            topics = trending_searches_df[0].tolist()
+            self._cache_set(key, topics, self.cache_ttl)
+            return topics
         except Exception as e:
-            print(f"Error fetching trends: {str(e)}")
+            logger.warning("Error fetching trends: %s", e)
+            # Remember the failure briefly so reruns don't hammer a throttled endpoint
+            self._cache_set(key, [], self.error_ttl)
             return []
-            
+
     def get_related_topics(self, keyword: str) -> List[str]:
-        try:
-            self.pytrends.build_payload([keyword], timeframe='today 1-m')
-            related_topics = self.pytrends.related_topics()
-            if keyword in related_topics:
-                rising = related_topics[keyword]['rising']
-                return rising['topic_title'].tolist()[:10]
-            return []
-        except Exception as e:
-            print(f"Error fetching related topics: {str(e)}")
-            return []
+        return self.get_related_topics_many([keyword])[keyword]
+
+    def get_related_topics_many(self, keywords: List[str], timeframe: str = 'today 1-m') -> Dict[str, List[str]]:
+        """Rising related topics for many keywords, querying up to 5 keywords per payload"""
+        results = {}
+        pending = []
+        for keyword in dict.fromkeys(keywords):
+            cached = self._cache_get(('related', keyword, timeframe))
+            if cached is not None:
+                results[keyword] = cached
+            else:
+                pending.append(keyword)
+
+        for start in range(0, len(pending), PAYLOAD_MAX_KEYWORDS):
+            chunk = pending[start:start + PAYLOAD_MAX_KEYWORDS]
+
+            def fetch():
+                self.pytrends.build_payload(chunk, timeframe=timeframe)
+                return self.pytrends.related_topics()
+
+            try:
+                related_topics = self._request(fetch)
+            except Exception as e:
+                logger.warning("Error fetching related topics: %s", e)
+                for keyword in chunk:
+                    results[keyword] = []
+                    self._cache_set(('related', keyword, timeframe), [], self.error_ttl)
+                continue
+
+            for keyword in chunk:
+                rising = (related_topics.get(keyword) or {}).get('rising')
+                topics = []
+                if isinstance(rising, pd.DataFrame) and 'topic_title' in rising:
+                    topics = rising['topic_title'].tolist()[:10]
+                results[keyword] = topics
+                self._cache_set(('related', keyword, timeframe), topics, self.cache_ttl)
+
+        return {keyword: results[keyword] for keyword in dict.fromkeys(keywords)}
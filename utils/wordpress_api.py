@@ -1,14 +1,83 @@
 import requests
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import base64
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, unquote
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import time
 import json
+import logging
+from utils.instrumentation import increment, span
+from utils.media_index import MediaIndex
+from utils.post_ledger import PostLedger
+
+logger = logging.getLogger(__name__)
+
+# Response bodies are logged only up to this many characters
+LOG_BODY_LIMIT = 500
+
+# WordPress rejects batch requests with more than this many sub-requests
+BATCH_MAX_REQUESTS = 25
+
+# Largest per_page the REST API allows, used for slug lookups
+SLUG_LOOKUP_PAGE_SIZE = 100
+
+# Images are streamed through a spooled temp file: kept in memory up to
+# this size, then on disk, so memory per upload stays flat
+MEDIA_SPOOL_SIZE = 1024 * 1024
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+# Concurrent uploads are serialized through a fixed set of locks picked by
+# hash, so the lock table stays the same size however many images go through
+MEDIA_LOCK_STRIPES = 64
+
+# Leading bytes of common image formats, for servers that send a wrong or
+# generic Content-Type
+_IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+]
+
+def build_session(pool_size: int = 16) -> requests.Session:
+    """Create a requests session with retries and a keep-alive pool of ``pool_size`` per host"""
+    # Configure retry strategy
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[408, 429, 500, 502, 503, 504]
+    )
+    # Size the keep-alive pool for parallel publishing; the default of 10
+    # connections per host would make extra workers reconnect every call
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class WordPressAPI:
-    def __init__(self, wp_url: str, username: str, app_password: str):
-        """Initialize WordPress API with proper URL formatting and authentication"""
+    def __init__(self, wp_url: str, username: str, app_password: str, pool_size: int = 16,
+                 media_index: Optional[MediaIndex] = None, session: Optional[requests.Session] = None,
+                 verify: bool = True, ledger: Optional[PostLedger] = None):
+        """Initialize WordPress API with proper URL formatting and authentication.
+
+        Pass a ``session`` to share its connection pool with other clients, and
+        ``verify=False`` to skip the credential check request (see
+        WordPressClientRegistry, which verifies lazily). With a ``ledger``,
+        publishing updates previously published posts instead of duplicating
+        them.
+        """
         # Clean and validate WordPress URL
         self.wp_url = wp_url.rstrip('/')
         if not self.wp_url.startswith(('http://', 'https://')):
@@ -27,38 +96,36 @@ class WordPressAPI:
             'Accept': 'application/json'
         }
 
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[408, 429, 500, 502, 503, 504]
-        )
-        self.session = requests.Session()
-        self.session.mount("https://", HTTPAdapter(max_retries=retry_strategy))
-        self.session.mount("http://", HTTPAdapter(max_retries=retry_strategy))
+        self.pool_size = pool_size
+        self.session = session if session is not None else build_session(pool_size)
+        self._supports_batch = None
+
+        # Content hash -> attachment index, so repeated images are uploaded once
+        self.media_index = media_index
+        self._source_locks = [threading.Lock() for _ in range(MEDIA_LOCK_STRIPES)]
+        self._content_locks = [threading.Lock() for _ in range(MEDIA_LOCK_STRIPES)]
+
+        # Article -> published post, so retries and republishing are idempotent
+        self.ledger = ledger
 
         # Verify credentials by making a test request
-        self._verify_credentials()
+        if verify:
+            self._verify_credentials()
 
     def _verify_credentials(self):
         """Verify WordPress credentials by making a test request"""
         try:
-            print(f"Testing WordPress connection to: {self.wp_url}")
-            print(f"Request headers: {self.headers}")
+            logger.debug("Testing WordPress connection to %s", self.wp_url)
 
-            response = self.session.get(
-                f"{self.wp_url}/wp-json/wp/v2/users/me",
-                headers=self.headers,
-                timeout=10
-            )
+            with span('wordpress_request', operation='verify'):
+                response = self.session.get(
+                    f"{self.wp_url}/wp-json/wp/v2/users/me",
+                    headers=self.headers,
+                    timeout=10
+                )
 
             if response.status_code != 200:
-                print(f"WordPress API response: {response.status_code}")
-                print(f"Response headers: {response.headers}")
-                try:
-                    print(f"Response body: {response.json()}")
-                except:
-                    print(f"Response text: {response.text}")
+                self._log_failure("Credential check", response)
 
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
@@ -71,129 +138,247 @@ class WordPressAPI:
         except requests.exceptions.RequestException as e:
             raise Exception(f"Connection error: {str(e)}")
 
-    def upload_media(self, image_url: str) -> Dict:
-        """Upload media to WordPress with retries"""
+    def _log_failure(self, action: str, response: requests.Response) -> None:
+        # Status and a trimmed body only; request and response headers carry credentials and cookies
+        logger.warning("%s failed for %s: HTTP %s %s", action, self.wp_url, response.status_code,
+                       (response.text or '')[:LOG_BODY_LIMIT])
+
+    def upload_media(self, image_url: str, filename: Optional[str] = None) -> Dict:
+        """Upload media to WordPress with retries.
+
+        The image is streamed from its URL into a spooled temp file while its
+        SHA-256 is computed, then streamed on to WordPress. If the same URL or
+        the same bytes were uploaded to this site before (per media_index),
+        the existing attachment is returned; a known URL isn't even downloaded.
+        """
         try:
             # Validate image URL
             if not image_url:
                 raise ValueError("Image URL is required")
 
-            # Download image from URL with retries
-            max_retries = 3
-            retry_count = 0
-            while retry_count < max_retries:
+            # Lock the URL first, then the content; always in that order
+            with self._media_lock(self._source_locks, image_url):
+                if self.media_index:
+                    existing = self.media_index.get_by_source(self.wp_url, image_url)
+                    if existing:
+                        increment('wordpress_media_reused')
+                        return existing
+
+                max_retries = 3
+                spool, content_hash, content_type = self._download_media(image_url, max_retries)
                 try:
-                    image_response = self.session.get(image_url, timeout=30)
-                    image_response.raise_for_status()
-                    break
-                except requests.exceptions.RequestException as e:
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        raise Exception(f"Failed to download image after {max_retries} attempts: {str(e)}")
-                    time.sleep(retry_count)  # Exponential backoff
-
-            # Upload to WordPress
-            upload_endpoint = f"{self.wp_url}/wp-json/wp/v2/media"
-
-            # Special headers for media upload
-            headers = {
-                'Authorization': f'Basic {self.auth}',
-                'Content-Disposition': 'attachment; filename=image.jpg',
-                'Content-Type': 'image/jpeg',
-            }
+                    with self._media_lock(self._content_locks, content_hash):
+                        if self.media_index:
+                            existing = self.media_index.get(self.wp_url, content_hash)
+                            if existing:
+                                self.media_index.set_source(self.wp_url, image_url, content_hash)
+                                increment('wordpress_media_reused')
+                                return existing
 
-            files = {
-                'file': ('image.jpg', image_response.content, 'image/jpeg'),
-            }
+                        media = self._upload_media_file(
+                            spool, content_type, filename or self._media_filename(image_url, content_type), max_retries
+                        )
+                        if self.media_index and media.get('id'):
+                            self.media_index.set(self.wp_url, content_hash, {
+                                'id': media['id'],
+                                'source_url': media.get('source_url', ''),
+                                'mime_type': media.get('mime_type', content_type),
+                                'link': media.get('link', '')
+                            })
+                            self.media_index.set_source(self.wp_url, image_url, content_hash)
+                        return media
+                finally:
+                    spool.close()
 
-            # Upload with retries
-            retry_count = 0
-            while retry_count < max_retries:
-                try:
-                    print(f"Uploading media to: {upload_endpoint}")
-                    print(f"Upload headers: {headers}")
+        except ValueError as e:
+            raise Exception(f"Invalid input: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error uploading media: {str(e)}")
+
+    def upload_media_many(self, image_urls: List[str], max_workers: int = 4) -> List[Dict]:
+        """Upload several images concurrently, reporting success or failure per URL"""
+        def upload(image_url: str) -> Dict:
+            try:
+                return {'url': image_url, 'success': True, 'media': self.upload_media(image_url)}
+            except Exception as e:
+                return {'url': image_url, 'success': False, 'error': str(e)}
+
+        if not image_urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, self.pool_size, len(image_urls)))) as executor:
+            return list(executor.map(upload, image_urls))
+
+    @staticmethod
+    def _media_lock(stripes: List[threading.Lock], key: str) -> threading.Lock:
+        # Serializes concurrent uploads of the same URL or bytes so only one happens
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=4).digest()
+        return stripes[int.from_bytes(digest, 'little') % len(stripes)]
+
+    def _download_media(self, image_url: str, max_retries: int) -> Tuple[tempfile.SpooledTemporaryFile, str, str]:
+        """Stream an image into a spooled temp file; return it with its hash and content type"""
+        retry_count = 0
+        while True:
+            spool = tempfile.SpooledTemporaryFile(max_size=MEDIA_SPOOL_SIZE)
+            try:
+                with span('media_download'):
+                    with self.session.get(image_url, timeout=30, stream=True) as image_response:
+                        image_response.raise_for_status()
+                        digest = hashlib.sha256()
+                        head = b''
+                        for chunk in image_response.iter_content(chunk_size=MEDIA_CHUNK_SIZE):
+                            if not chunk:
+                                continue
+                            if len(head) < 32:
+                                head += chunk[:32]
+                            digest.update(chunk)
+                            spool.write(chunk)
+                        header_type = image_response.headers.get('Content-Type', '')
+                increment('media_download_bytes', spool.tell())
+
+                if spool.tell() == 0:
+                    raise ValueError("Downloaded image is empty")
+                spool.seek(0)
+                return spool, digest.hexdigest(), self._detect_content_type(head, header_type, image_url)
+            except requests.exceptions.RequestException as e:
+                spool.close()
+                retry_count += 1
+                if retry_count == max_retries:
+                    raise Exception(f"Failed to download image after {max_retries} attempts: {str(e)}")
+                time.sleep(retry_count)  # Exponential backoff
+            except Exception:
+                spool.close()
+                raise
+
+    @staticmethod
+    def _detect_content_type(head: bytes, header_type: str, image_url: str) -> str:
+        """Pick the image MIME type from magic bytes, the response header or the URL"""
+        for signature, mime_type in _IMAGE_SIGNATURES:
+            if head.startswith(signature):
+                return mime_type
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return 'image/webp'
+        if head[4:8] == b'ftyp' and head[8:12] in (b'avif', b'avis'):
+            return 'image/avif'
+        if b'<svg' in head or head.lstrip().startswith(b'<?xml'):
+            return 'image/svg+xml'
+
+        header_type = header_type.split(';')[0].strip().lower()
+        if header_type.startswith('image/'):
+            return header_type
+
+        guessed, _ = mimetypes.guess_type(urlparse(image_url).path)
+        return guessed if guessed and guessed.startswith('image/') else 'image/jpeg'
+
+    @staticmethod
+    def _media_filename(image_url: str, content_type: str) -> str:
+        name = os.path.basename(unquote(urlparse(image_url).path)) or 'image'
+        stem, extension = os.path.splitext(name)
+        expected = mimetypes.guess_extension(content_type) or '.jpg'
+        if expected == '.jpe':
+            expected = '.jpg'
+        if extension.lower() not in (mimetypes.guess_all_extensions(content_type) or [expected]):
+            name = f"{stem or 'image'}{expected}"
+        # Keep the header value simple; WordPress sanitizes the name anyway
+        return name.replace('"', '').replace('\r', '').replace('\n', '')
+
+    def _upload_media_file(self, spool, content_type: str, filename: str, max_retries: int) -> Dict:
+        """Stream a spooled image to the WordPress media endpoint with retries"""
+        upload_endpoint = f"{self.wp_url}/wp-json/wp/v2/media"
+
+        # Raw-body upload: the file object is streamed rather than built into
+        # an in-memory multipart body
+        spool.seek(0, os.SEEK_END)
+        headers = {
+            'Authorization': f'Basic {self.auth}',
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Content-Type': content_type,
+            'Content-Length': str(spool.tell())
+        }
 
+        retry_count = 0
+        while True:
+            try:
+                spool.seek(0)
+                with span('wordpress_request', operation='media_upload'):
                     response = self.session.post(
                         upload_endpoint,
                         headers=headers,
-                        files=files,
+                        data=spool,
                         timeout=60  # Longer timeout for uploads
                     )
 
-                    if response.status_code != 201:
-                        print(f"Media upload response: {response.status_code}")
-                        print(f"Response headers: {response.headers}")
-                        try:
-                            print(f"Response body: {response.json()}")
-                        except:
-                            print(f"Response text: {response.text}")
-
-                    response.raise_for_status()
-                    return response.json()
-                except requests.exceptions.HTTPError as e:
-                    if e.response.status_code == 401:
-                        print(f"Authentication failed. Response: {e.response.text}")
+                if response.status_code != 201:
+                    self._log_failure("Media upload", response)
+
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 401:
+                    raise Exception(
+                        "WordPress authentication failed. Please verify your credentials. "
+                        "Error details: " + str(e.response.text)
+                    )
+                elif e.response.status_code == 500:
+                    error_msg = str(e.response.text)
+                    if "file type" in error_msg.lower():
                         raise Exception(
-                            "WordPress authentication failed. Please verify your credentials. "
-                            "Error details: " + str(e.response.text)
+                            "WordPress rejected the image upload. This might be due to: \n"
+                            "1. File type restrictions on your WordPress site\n"
+                            "2. Insufficient permissions for media uploads\n"
+                            "3. File size limitations\n"
+                            "Please check your WordPress media settings and user permissions."
                         )
-                    elif e.response.status_code == 500:
-                        error_msg = str(e.response.text)
-                        if "file type" in error_msg.lower():
-                            raise Exception(
-                                "WordPress rejected the image upload. This might be due to: \n"
-                                "1. File type restrictions on your WordPress site\n"
-                                "2. Insufficient permissions for media uploads\n"
-                                "3. File size limitations\n"
-                                "Please check your WordPress media settings and user permissions."
-                            )
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        raise Exception(f"Failed to upload media after {max_retries} attempts: {str(e)}")
-                    time.sleep(retry_count)
-                except requests.exceptions.RequestException as e:
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        raise Exception(f"Failed to upload media after {max_retries} attempts: {str(e)}")
-                    time.sleep(retry_count)
+                retry_count += 1
+                if retry_count == max_retries:
+                    raise Exception(f"Failed to upload media after {max_retries} attempts: {str(e)}")
+                time.sleep(retry_count)
+            except requests.exceptions.RequestException as e:
+                retry_count += 1
+                if retry_count == max_retries:
+                    raise Exception(f"Failed to upload media after {max_retries} attempts: {str(e)}")
+                time.sleep(retry_count)
 
-        except ValueError as e:
-            raise Exception(f"Invalid input: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error uploading media: {str(e)}")
+    def create_post(self, content: Dict, status: str = 'draft', lookup_slug: bool = True) -> Dict:
+        """Create a new WordPress post with SEO metadata, or update the one already published.
+
+        The post ledger is checked first and, with ``lookup_slug``, WordPress
+        itself for a post with the same slug and title (which catches posts
+        created by a request that timed out). Content that is unchanged since
+        it was last published is returned from the ledger without a request,
+        marked ``unchanged``.
+        """
+        plan = self._plan_posts([content], status, lookup_slug)[0]
+        if 'error' in plan:
+            raise Exception(plan['error'])
+        if 'unchanged' in plan:
+            increment('wordpress_posts_unchanged')
+            return dict(plan['unchanged'], unchanged=True)
+
+        post = self._send_post(plan['post_data'], plan['post_id'])
+        self._record_post(plan, post)
+        return post
 
-    def create_post(self, content: Dict, status: str = 'draft') -> Dict:
-        """Create a new WordPress post with SEO metadata"""
+    def _send_post(self, post_data: Dict, post_id: Optional[int] = None) -> Dict:
+        """POST a new post, or an update to ``post_id``"""
         try:
             endpoint = f"{self.wp_url}/wp-json/wp/v2/posts"
+            if post_id:
+                endpoint = f"{endpoint}/{post_id}"
 
-            post_data = {
-                'title': content['title'],
-                'content': content['content'],
-                'status': status,
-                'slug': content.get('slug', ''),
-                'meta': {
-                    '_yoast_wpseo_metadesc': content.get('meta_description', ''),
-                    '_yoast_wpseo_focuskw': content.get('keywords', '').split(',')[0],
-                    '_yoast_wpseo_meta-robots-noindex': '0',
-                    '_yoast_wpseo_meta-robots-nofollow': '0'
-                }
-            }
+            with span('wordpress_request', operation='update_post' if post_id else 'create_post'):
+                response = self.session.post(
+                    endpoint,
+                    headers=self.headers,
+                    json=post_data,
+                    timeout=30
+                )
 
-            response = self.session.post(
-                endpoint,
-                headers=self.headers,
-                json=post_data,
-                timeout=30
-            )
+            if post_id and response.status_code == 404:
+                # The post was deleted in WordPress since; publish it afresh
+                return self._send_post(post_data)
 
-            if response.status_code != 201:
-                print(f"Post creation response: {response.status_code}")
-                print(f"Response headers: {response.headers}")
-                try:
-                    print(f"Response body: {response.json()}")
-                except:
-                    print(f"Response text: {response.text}")
+            if response.status_code not in (200, 201):
+                self._log_failure("Post update" if post_id else "Post creation", response)
 
             response.raise_for_status()
 
@@ -206,4 +391,185 @@ class WordPressAPI:
         except requests.exceptions.Timeout:
             raise Exception("Request timed out while creating post. Please try again.")
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Error creating WordPress post: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error creating WordPress post: {str(e)}")
+
+    def find_posts_by_slug(self, slugs: List[str]) -> Dict[str, Dict]:
+        """Look up existing posts (any status) by slug; returns slug -> post in edit context"""
+        found = {}
+        slugs = sorted(set(slug for slug in slugs if slug))
+        for start in range(0, len(slugs), SLUG_LOOKUP_PAGE_SIZE):
+            with span('wordpress_request', operation='slug_lookup'):
+                response = self.session.get(
+                    f"{self.wp_url}/wp-json/wp/v2/posts",
+                    headers=self.headers,
+                    params={
+                        'slug': ','.join(slugs[start:start + SLUG_LOOKUP_PAGE_SIZE]),
+                        'status': 'any',
+                        'context': 'edit',
+                        'per_page': SLUG_LOOKUP_PAGE_SIZE,
+                        '_fields': 'id,slug,link,status,title'
+                    },
+                    timeout=30
+                )
+            response.raise_for_status()
+            for post in response.json():
+                found[post['slug']] = post
+        return found
+
+    def _plan_posts(self, contents: List[Dict], status: str, lookup_slug: bool) -> List[Dict]:
+        """Decide per content whether to create, update (``post_id``) or skip (``unchanged``)"""
+        plans = []
+        for index, content in enumerate(contents):
+            try:
+                post_data = self._build_post_data(content, status)
+            except Exception as e:
+                plans.append({'index': index, 'error': f"Invalid post content: {str(e)}"})
+                continue
+
+            plan = {'index': index, 'post_data': post_data, 'post_id': None}
+            if self.ledger:
+                plan['article_key'] = self.ledger.article_key(content)
+                plan['content_hash'] = self.ledger.content_hash(post_data)
+                entry = self.ledger.get(self.wp_url, plan['article_key'])
+                if entry and entry['content_hash'] == plan['content_hash']:
+                    plan['unchanged'] = entry['post']
+                elif entry:
+                    plan['post_id'] = entry['post_id']
+            plans.append(plan)
+
+        pending = [plan for plan in plans if 'post_data' in plan and 'unchanged' not in plan
+                   and plan['post_id'] is None and plan['post_data']['slug']]
+        if lookup_slug and pending:
+            try:
+                existing = self.find_posts_by_slug([plan['post_data']['slug'] for plan in pending])
+            except (requests.exceptions.RequestException, ValueError):
+                # Lookups are best effort; the ledger still prevents most duplicates
+                existing = {}
+            for plan in pending:
+                post = existing.get(plan['post_data']['slug'])
+                # A matching slug alone could be an unrelated post; require the same title
+                if post and (post.get('title') or {}).get('raw', '').strip() == plan['post_data']['title'].strip():
+                    plan['post_id'] = post['id']
+        return plans
+
+    def _record_post(self, plan: Dict, post: Dict) -> None:
+        if self.ledger and post.get('id'):
+            self.ledger.record(self.wp_url, plan['article_key'], plan['content_hash'], post)
+
+    def _build_post_data(self, content: Dict, status: str) -> Dict:
+        return {
+            'title': content['title'],
+            'content': content['content'],
+            'status': status,
+            'slug': content.get('slug', ''),
+            'meta': {
+                '_yoast_wpseo_metadesc': content.get('meta_description', ''),
+                '_yoast_wpseo_focuskw': content.get('keywords', '').split(',')[0],
+                '_yoast_wpseo_meta-robots-noindex': '0',
+                '_yoast_wpseo_meta-robots-nofollow': '0'
+            }
+        }
+
+    def supports_batch(self) -> bool:
+        """Check (once) whether the site exposes the REST batch endpoint (WP 5.6+)"""
+        if self._supports_batch is None:
+            try:
+                with span('wordpress_request', operation='discover'):
+                    response = self.session.get(f"{self.wp_url}/wp-json/", headers=self.headers, timeout=10)
+                response.raise_for_status()
+                self._supports_batch = 'batch/v1' in response.json().get('namespaces', [])
+            except (requests.exceptions.RequestException, ValueError):
+                self._supports_batch = False
+        return self._supports_batch
+
+    def create_posts(self, contents: List[Dict], status: str = 'draft', max_workers: int = 8,
+                     use_batch: Optional[bool] = None, lookup_slug: bool = True) -> List[Dict]:
+        """Create (or update) many posts, reporting success or failure per post.
+
+        Uses the /batch/v1 endpoint when the site supports it (``use_batch``
+        None means detect), otherwise parallel requests over the pooled
+        session. Like create_post, articles already published are updated and
+        unchanged ones skipped. Returns one dict per content, in order, with
+        ``success`` and either ``post`` or ``error``.
+        """
+        if not contents:
+            return []
+
+        results = []
+        plans = []
+        for plan in self._plan_posts(contents, status, lookup_slug):
+            if 'error' in plan:
+                results.append({'index': plan['index'], 'success': False, 'error': plan['error']})
+            elif 'unchanged' in plan:
+                increment('wordpress_posts_unchanged')
+                results.append({'index': plan['index'], 'success': True, 'post': plan['unchanged'], 'unchanged': True})
+            else:
+                plans.append(plan)
+        if not plans:
+            return sorted(results, key=lambda result: result['index'])
+
+        if use_batch is None:
+            use_batch = self.supports_batch()
+
+        max_workers = max(1, min(max_workers, self.pool_size))
+        if use_batch:
+            chunks = [plans[start:start + BATCH_MAX_REQUESTS] for start in range(0, len(plans), BATCH_MAX_REQUESTS)]
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                for chunk_results in executor.map(self._create_posts_batch, chunks):
+                    results.extend(chunk_results)
+            return sorted(results, key=lambda result: result['index'])
+
+        def publish(plan: Dict) -> Dict:
+            try:
+                post = self._send_post(plan['post_data'], plan['post_id'])
+                self._record_post(plan, post)
+                return {'index': plan['index'], 'success': True, 'post': post}
+            except Exception as e:
+                return {'index': plan['index'], 'success': False, 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(plans))) as executor:
+            results.extend(executor.map(publish, plans))
+        return sorted(results, key=lambda result: result['index'])
+
+    def _create_posts_batch(self, plans: List[Dict]) -> List[Dict]:
+        """Create or update up to BATCH_MAX_REQUESTS posts in one /batch/v1 request"""
+        requests_payload = []
+        for plan in plans:
+            path = f"/wp/v2/posts/{plan['post_id']}" if plan['post_id'] else '/wp/v2/posts'
+            requests_payload.append({'method': 'POST', 'path': path, 'body': plan['post_data']})
+
+        try:
+            with span('wordpress_request', operation='batch'):
+                response = self.session.post(
+                    f"{self.wp_url}/wp-json/batch/v1",
+                    headers=self.headers,
+                    json={'validation': 'normal', 'requests': requests_payload},
+                    timeout=120
+                )
+            response.raise_for_status()
+            responses = response.json().get('responses', [])
+        except requests.exceptions.RequestException as e:
+            error = f"Error creating WordPress posts in batch: {str(e)}"
+            return [{'index': plan['index'], 'success': False, 'error': error} for plan in plans]
+
+        results = []
+        for plan, item in zip(plans, responses):
+            body = item.get('body', {})
+            if item.get('status') in (200, 201):
+                self._record_post(plan, body)
+                results.append({'index': plan['index'], 'success': True, 'post': body})
+            else:
+                if item.get('status') == 404 and self.ledger and plan['post_id']:
+                    # The post was deleted in WordPress; the next attempt creates it again
+                    self.ledger.remove(self.wp_url, plan['article_key'])
+                message = body.get('message') if isinstance(body, dict) else None
+                results.append({
+                    'index': plan['index'],
+                    'success': False,
+                    'error': f"HTTP {item.get('status')}: {message or body}"
+                })
+        # A short responses list means WordPress never got to the rest
+        for plan in plans[len(responses):]:
+            results.append({'index': plan['index'], 'success': False, 'error': "No response in batch"})
+
+        return results
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from utils.media_index import MediaIndex
+from utils.post_ledger import PostLedger
+from utils.wordpress_api import WordPressAPI, build_session
+
+
+class WordPressClientRegistry:
+    """Caches one WordPressAPI client per site and shares sessions by host.
+
+    ``get`` never touches the network: clients are built with verification
+    off, and credentials are only checked by ``verify`` (or ``get(...,
+    verify=True)``), at most once per ``verify_ttl`` seconds per client.
+    Sites on the same host reuse one session, so its keep-alive connections
+    and TLS sessions survive switching between sites.
+    """
+
+    def __init__(self, verify_ttl: float = 3600, pool_size: int = 16, media_index: Optional[MediaIndex] = None,
+                 ledger: Optional[PostLedger] = None):
+        self.verify_ttl = verify_ttl
+        self.pool_size = pool_size
+        self.media_index = media_index
+        self.ledger = ledger
+        self._clients: Dict[Tuple[str, str, str], WordPressAPI] = {}
+        self._verified_at: Dict[Tuple[str, str, str], float] = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(wp_url: str, username: str, app_password: str) -> Tuple[str, str, str]:
+        # Keep only a digest of the password around as part of the cache key
+        return (wp_url.rstrip('/'), username, hashlib.sha256(app_password.encode()).hexdigest())
+
+    def session_for(self, wp_url: str) -> requests.Session:
+        """Return the shared session for a URL's scheme and host"""
+        parsed = urlparse(wp_url)
+        host = f"{parsed.scheme}://{parsed.netloc}".lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = build_session(self.pool_size)
+                self._sessions[host] = session
+            return session
+
+    def get(self, wp_url: str, username: str, app_password: str, verify: bool = False) -> WordPressAPI:
+        """Return the cached client for these credentials, creating it if needed"""
+        key = self._key(wp_url, username, app_password)
+        with self._lock:
+            api = self._clients.get(key)
+        if api is None:
+            api = WordPressAPI(wp_url, username, app_password, pool_size=self.pool_size,
+                               media_index=self.media_index, session=self.session_for(wp_url), verify=False,
+                               ledger=self.ledger)
+            with self._lock:
+                api = self._clients.setdefault(key, api)
+        if verify:
+            self.verify(api, key)
+        return api
+
+    def get_for_config(self, config: Dict, verify: bool = False) -> Optional[WordPressAPI]:
+        """Client for a site config dict, or None if the site isn't configured"""
+        if not (config.get('wp_url') and config.get('wp_username') and config.get('wp_password')):
+            return None
+        return self.get(config['wp_url'], config['wp_username'], config['wp_password'], verify=verify)
+
+    def verify(self, api: WordPressAPI, key: Optional[Tuple[str, str, str]] = None, force: bool = False) -> None:
+        """Check a client's credentials unless they were verified within the TTL"""
+        if key is None:
+            key = next((k for k, client in self._clients.items() if client is api), None)
+        verified_at = self._verified_at.get(key)
+        if not force and verified_at is not None and time.time() - verified_at < self.verify_ttl:
+            return
+        api._verify_credentials()
+        if key is not None:
+            self._verified_at[key] = time.time()
+
+    def invalidate(self, wp_url: str) -> None:
+        """Drop cached clients (and their verification) for a site, e.g. after its credentials change"""
+        wp_url = wp_url.rstrip('/')
+        with self._lock:
+            for key in [k for k in self._clients if k[0] == wp_url]:
+                del self._clients[key]
+                self._verified_at.pop(key, None)
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            self._clients = {}
+            self._verified_at = {}